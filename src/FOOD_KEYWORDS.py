@@ -0,0 +1,93 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+# Per-language table of the food keywords sent to the Nearby Search.
+# Each canonical keyword is mapped to the other ways users commonly type it (plurals, venue names, spelling variants).
+# The keywords are compared after normalization: case, accents, punctuation and extra whitespace are ignored.
+
+FOOD_KEYWORDS = {
+    "it": {
+        "pizza": ["pizze", "pizzeria", "pizzerie", "pizza al taglio"],
+        "sushi": ["sushi bar", "all you can eat"],
+        "giapponese": ["cucina giapponese", "ristorante giapponese"],
+        "cinese": ["cucina cinese", "ristorante cinese"],
+        "indiano": ["cucina indiana", "ristorante indiano"],
+        "messicano": ["cucina messicana", "ristorante messicano"],
+        "thailandese": ["cucina thailandese", "thai"],
+        "ramen": [],
+        "poke": ["poke bowl", "pokè"],
+        "hamburger": ["burger", "hamburgeria", "hamburgherie", "hamburgerie"],
+        "kebab": ["kebap", "kebabbaro"],
+        "piadina": ["piadine", "piadineria"],
+        "pasta": ["primi", "primi piatti"],
+        "carne": ["bistecca", "braceria", "steakhouse"],
+        "pesce": ["frutti di mare", "crudo"],
+        "vegano": ["vegana", "vegani", "vegan"],
+        "vegetariano": ["vegetariana", "vegetariani", "vegetarian"],
+        "gelato": ["gelati", "gelateria", "gelaterie"],
+        "pasticceria": ["dolci", "pasticcerie"],
+        "panino": ["panini", "paninoteca"],
+        "trattoria": ["osteria", "cucina tipica", "cucina casalinga"],
+        "colazione": ["brioche", "cornetto"],
+        "brunch": [],
+        "aperitivo": ["apericena"],
+        "tapas": [],
+        "greco": ["cucina greca", "ristorante greco", "gyros"],
+        "coreano": ["cucina coreana", "ristorante coreano"],
+        "libanese": ["cucina libanese", "falafel"],
+        "fritto": ["fritti", "friggitoria"],
+        "focaccia": ["focacce", "focacceria"],
+        "senza glutine": ["gluten free", "celiaci"],
+    },
+    "en": {
+        "pizza": ["pizzas", "pizzeria", "pizzerias", "pizza place"],
+        "sushi": ["sushi bar"],
+        "japanese": ["japanese food", "japanese restaurant"],
+        "chinese": ["chinese food", "chinese restaurant"],
+        "indian": ["indian food", "indian restaurant"],
+        "mexican": ["mexican food", "mexican restaurant", "tacos", "burrito"],
+        "thai": ["thai food", "thai restaurant"],
+        "ramen": [],
+        "poke": ["poke bowl", "pokè"],
+        "burger": ["burgers", "hamburger", "hamburgers"],
+        "kebab": ["kebap", "kebabs", "doner"],
+        "pasta": [],
+        "italian": ["italian food", "italian restaurant"],
+        "steak": ["steaks", "steakhouse"],
+        "seafood": ["fish", "sea food"],
+        "vegan": ["plant based"],
+        "vegetarian": ["veggie"],
+        "ice cream": ["gelato", "icecream"],
+        "bakery": ["pastry", "pastries", "cakes"],
+        "sandwich": ["sandwiches", "deli"],
+        "breakfast": [],
+        "brunch": [],
+        "tapas": [],
+        "greek": ["greek food", "greek restaurant", "gyros"],
+        "korean": ["korean food", "korean restaurant", "korean bbq"],
+        "lebanese": ["lebanese food", "falafel"],
+        "barbecue": ["bbq", "barbeque"],
+        "fish and chips": ["fish n chips", "fish & chips"],
+        "gluten free": ["celiac", "gluten-free"],
+    },
+}
@@ -104,6 +104,10 @@ GENERAL_STRINGS = {
         "it": """🍣 <b>TasteIt - Risultati</b> 🍝\n Ristorante - <b>{}</b>\n{}\n🕙 - {} minuti\n{}\n{} recensioni totali.""",
         "en": """🍣 <b>TasteIt - Results</b> 🍝\n Restaurant - <b>{}</b>\n{}\n🕙 - {} minutes\n{}\n{} total reviews.""",
     },
+    "GENERAL_EstimatedReachingParameters": {
+        "it": """ <i>(stima)</i>""",
+        "en": """ <i>(estimated)</i>""",
+    },
     "GENERAL_MoreInfos": {
         "it": """💡 Maggiori informazioni 💡""",
         "en": """💡 More infos 💡""",
@@ -236,6 +240,22 @@ ERROR_STRINGS = {
                  A critical error has occured. Please contact the developer (@paolino_x), notifing GOOGLE_ERROR.
               """,
     },
+    "ERROR_GoogleUnavailable": {
+        "it": """
+                 Il servizio di ricerca è momentaneamente non disponibile. Riprova tra qualche minuto.
+              """,
+        "en": """
+                 The search service is temporarily unavailable. Please try again in a few minutes.
+              """,
+    },
+    "ERROR_SearchTimeout": {
+        "it": """
+                 La ricerca sta impiegando troppo tempo. Riprova tra qualche istante.
+              """,
+        "en": """
+                 The search is taking too long. Please try again in a few moments.
+              """,
+    },
     "ERROR_NoPlacesFound": {
         "it": """
                  Nessun posto trovato. Riprova inviandomi un nuovo nome di località o la tua posizione attuale.
@@ -244,6 +264,14 @@ ERROR_STRINGS = {
                  No places found. Please, send me back another location name or your current position.
               """,
     },
+    "ERROR_RestaurantDetailsNotFound": {
+        "it": """
+                 Non sono riuscito a trovare i dettagli di questo ristorante. Prova con un altro ristorante della lista.
+              """,
+        "en": """
+                 I could not find the details of this restaurant. Please try another restaurant of the list.
+              """,
+    },
     "ERROR_NoRestaurantsFound": {
         "it": """
                  Nessun ristorante trovato con i parametri specificati. Modificali utilizzando la tastiera qui sotto.
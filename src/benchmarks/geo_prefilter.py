@@ -0,0 +1,105 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+"""Micro-benchmark of the straight-line prefilter applied to the Places results.
+
+It compares the previous approach (one geopy geodesic per result) with `utils.geo.filterWithinRadius`.
+
+Usage (from the src folder):
+    python -m benchmarks.geo_prefilter
+"""
+
+from random import Random
+from timeit import repeat
+
+from geopy.distance import geodesic
+
+import utils.geo
+from utils.geo import filterWithinRadius
+
+# Milan city centre, with the default walking radius.
+ORIGIN = (45.4642, 9.1900)
+RADIUS_IN_METERS = 1500
+CANDIDATES_COUNTS = (20, 60, 1000)
+
+
+def geodesicLoop(origin: tuple, coordinates: list, radius: float) -> list:
+    """The prefilter as it was performed before, one geodesic per result."""
+    return [
+        index
+        for index, coordinate in enumerate(coordinates)
+        if geodesic(coordinate, origin).meters <= radius
+    ]
+
+
+def randomCandidates(count: int, seed: int = 42) -> list:
+    """Returns `count` points scattered in a square of ~6 km around the origin, like the results of a Nearby Search."""
+    generator = Random(seed)
+
+    return [
+        (
+            ORIGIN[0] + generator.uniform(-0.027, 0.027),
+            ORIGIN[1] + generator.uniform(-0.038, 0.038),
+        )
+        for _ in range(count)
+    ]
+
+
+def main() -> None:
+    print(f"NumPy available: {utils.geo.numpy != None}")
+    print(f"{'candidates':>10} {'geodesic loop':>16} {'prefilter':>16} {'speedup':>8}")
+
+    for count in CANDIDATES_COUNTS:
+        coordinates = randomCandidates(count)
+        expected = geodesicLoop(ORIGIN, coordinates, RADIUS_IN_METERS)
+        assert filterWithinRadius(ORIGIN, coordinates, RADIUS_IN_METERS) == expected
+
+        number = max(1, 2000 // count)
+        loopTime = (
+            min(
+                repeat(
+                    lambda: geodesicLoop(ORIGIN, coordinates, RADIUS_IN_METERS),
+                    number=number,
+                    repeat=5,
+                )
+            )
+            / number
+        )
+        prefilterTime = (
+            min(
+                repeat(
+                    lambda: filterWithinRadius(ORIGIN, coordinates, RADIUS_IN_METERS),
+                    number=number,
+                    repeat=5,
+                )
+            )
+            / number
+        )
+
+        print(
+            f"{count:>10} {loopTime * 1e6:>13.1f} us {prefilterTime * 1e6:>13.1f} us {loopTime / prefilterTime:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
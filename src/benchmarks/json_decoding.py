@@ -0,0 +1,241 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+"""Micro-benchmark of the decoding of the upstream responses.
+
+It compares the previous approach (`json.loads(response.text)`, keeping the whole document) with
+`upstream.decodeJson(response.content)` followed by the projection on the fields read by the bot. The payloads mimic
+recorded Places and Mapbox responses: a full Nearby Search page, a Place Details response with five reviews and a
+Mapbox Directions response.
+
+Usage (from the src folder):
+    python -m benchmarks.json_decoding
+"""
+
+import json
+import tracemalloc
+from random import Random
+from timeit import repeat
+
+import upstream.json_decoding
+from places import nearbySearchProjection, placeDetailsProjection
+from routing import RoutingBackend
+from upstream import decodeJson
+
+
+def nearbySearchPayload(generator: Random) -> bytes:
+    """Returns a Nearby Search page of 20 restaurants, with all the fields returned by Google."""
+    return json.dumps(
+        {
+            "html_attributions": [],
+            "next_page_token": "Aap_uE" + "x" * 400,
+            "results": [
+                {
+                    "business_status": "OPERATIONAL",
+                    "geometry": {
+                        "location": {
+                            "lat": 45.46 + generator.random() / 100,
+                            "lng": 9.19 + generator.random() / 100,
+                        },
+                        "viewport": {
+                            "northeast": {"lat": 45.47, "lng": 9.2},
+                            "southwest": {"lat": 45.46, "lng": 9.19},
+                        },
+                    },
+                    "icon": "https://maps.gstatic.com/mapfiles/place_api/icons/v1/png_71/restaurant-71.png",
+                    "icon_background_color": "#FF9E67",
+                    "icon_mask_base_uri": "https://maps.gstatic.com/mapfiles/place_api/icons/v2/restaurant_pinlet",
+                    "name": f"Trattoria {index}",
+                    "opening_hours": {"open_now": True},
+                    "photos": [
+                        {
+                            "height": 3024,
+                            "html_attributions": [
+                                f'<a href="https://maps.google.com/maps/contrib/{generator.getrandbits(64)}">Someone</a>'
+                            ],
+                            "photo_reference": "AUjq9j" + "y" * 600,
+                            "width": 4032,
+                        }
+                    ],
+                    "place_id": f"ChIJ{generator.getrandbits(64):x}",
+                    "plus_code": {
+                        "compound_code": "F6M9+2X Milan, Italy",
+                        "global_code": "8FQFF6M9+2X",
+                    },
+                    "price_level": generator.randint(1, 4),
+                    "rating": round(generator.uniform(3, 5), 1),
+                    "reference": f"ChIJ{generator.getrandbits(64):x}",
+                    "scope": "GOOGLE",
+                    "types": [
+                        "restaurant",
+                        "food",
+                        "point_of_interest",
+                        "establishment",
+                    ],
+                    "user_ratings_total": generator.randint(10, 5000),
+                    "vicinity": "Via Roma, 1, Milano",
+                }
+                for index in range(20)
+            ],
+            "status": "OK",
+        }
+    ).encode()
+
+
+def placeDetailsPayload(generator: Random) -> bytes:
+    """Returns a Place Details response with five reviews, with all the fields returned by Google."""
+    return json.dumps(
+        {
+            "html_attributions": [],
+            "result": {
+                "formatted_address": "Via Roma, 1, 20121 Milano MI, Italy",
+                "formatted_phone_number": "02 1234 5678",
+                "opening_hours": {
+                    "open_now": True,
+                    "periods": [
+                        {
+                            "close": {"day": day, "time": "2300"},
+                            "open": {"day": day, "time": "1200"},
+                        }
+                        for day in range(7)
+                    ],
+                    "weekday_text": [f"Day {day}: 12:00 – 23:00" for day in range(7)],
+                },
+                "reviews": [
+                    {
+                        "author_name": f"Reviewer {index}",
+                        "author_url": f"https://www.google.com/maps/contrib/{generator.getrandbits(64)}/reviews",
+                        "language": "it",
+                        "original_language": "it",
+                        "profile_photo_url": "https://lh3.googleusercontent.com/a/"
+                        + "z" * 80,
+                        "rating": generator.randint(1, 5),
+                        "relative_time_description": "a month ago",
+                        "text": "Ottimo ristorante. " * generator.randint(5, 40),
+                        "time": 1650000000 + index,
+                        "translated": False,
+                    }
+                    for index in range(5)
+                ],
+                "url": "https://maps.google.com/?cid=1234567890",
+                "website": "https://www.example.com/",
+            },
+            "status": "OK",
+        }
+    ).encode()
+
+
+def directionsPayload(generator: Random, overview: bool = True) -> bytes:
+    """Returns a Mapbox Directions response, with the default overview geometry unless `overview` is False (as the bot
+    requests it)."""
+    response = {
+        "routes": [
+            {
+                "weight_name": "pedestrian",
+                "weight": 1200.5,
+                "duration": 1100.2,
+                "distance": 1450.7,
+                "legs": [
+                    {
+                        "via_waypoints": [],
+                        "admins": [{"iso_3166_1_alpha3": "ITA", "iso_3166_1": "IT"}],
+                        "weight": 1200.5,
+                        "duration": 1100.2,
+                        "steps": [],
+                        "distance": 1450.7,
+                        "summary": "Via Roma, Corso Magenta",
+                    }
+                ],
+                "geometry": "".join(
+                    chr(generator.randint(63, 126)) for _ in range(800)
+                ),
+            }
+        ],
+        "waypoints": [
+            {"distance": 3.1, "name": "Via Roma", "location": [9.19, 45.46]},
+            {"distance": 1.2, "name": "Corso Magenta", "location": [9.18, 45.465]},
+        ],
+        "code": "Ok",
+        "uuid": "x" * 56,
+    }
+    if not overview:
+        del response["routes"][0]["geometry"]
+
+    return json.dumps(response).encode()
+
+
+def previousDecoding(content: bytes, projection):
+    """The decoding as it was performed before: the bytes are decoded to str, and the whole document is kept."""
+    return json.loads(content.decode("utf-8"))
+
+
+def currentDecoding(content: bytes, projection):
+    return projection(decodeJson(content))
+
+
+def allocations(decoding, content: bytes, projection) -> tuple:
+    """Returns (peak, retained) bytes allocated while decoding the content."""
+    tracemalloc.start()
+    decoded = decoding(content, projection)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del decoded
+
+    return (peak, retained)
+
+
+def main() -> None:
+    generator = Random(42)
+    payloads = (
+        ("nearby search", nearbySearchPayload(generator), nearbySearchProjection),
+        ("place details", placeDetailsPayload(generator), placeDetailsProjection),
+        ("directions", directionsPayload(generator), RoutingBackend.routesProjection),
+        (
+            "no overview",
+            directionsPayload(generator, overview=False),
+            RoutingBackend.routesProjection,
+        ),
+    )
+
+    print(f"orjson available: {upstream.json_decoding.orjson != None}")
+    print(
+        f"{'payload':>14} {'size':>8} {'previous':>10} {'current':>10} {'speedup':>8} {'prev. peak':>11} {'curr. peak':>11} {'prev. kept':>11} {'curr. kept':>11}"
+    )
+    for name, content, projection in payloads:
+        times = []
+        for decoding in (previousDecoding, currentDecoding):
+            times.append(
+                min(repeat(lambda: decoding(content, projection), number=200, repeat=5))
+                / 200
+            )
+        previousMemory = allocations(previousDecoding, content, projection)
+        currentMemory = allocations(currentDecoding, content, projection)
+
+        print(
+            f"{name:>14} {len(content):>7}B {times[0] * 1e6:>8.1f}us {times[1] * 1e6:>8.1f}us {times[0] / times[1]:>7.1f}x "
+            f"{previousMemory[0]:>10}B {currentMemory[0]:>10}B {previousMemory[1]:>10}B {currentMemory[1]:>10}B"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -22,8 +22,6 @@
 ####################################################################################
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import CallbackContext
-from requests import get
-from json import loads
 
 import utils
 from STRINGS_LIST import getString
@@ -34,10 +32,10 @@ from data import (
     removeRestaurantFromListDb,
     removeFavoriteListFromDb,
 )
-from utils.api_key import Service, ApiKey
 from utils.favorite_list import FavoriteList
 from utils.rating import Rating, RatingsList
 from utils.restaurant import Restaurant, RestaurantList
+from places import placeDetailsStore
 
 FAV_LIST_DISPLAYED, RESTAURANT_INFOS_DISPLAY, NAVIGATE_REVIEWS = range(3)
 
@@ -560,16 +558,8 @@ def __fetchRestaurantReviews(restaurantId: str, lang: str) -> RatingsList:
     """
     result: RatingsList = RatingsList()
 
-    googleKey = ApiKey(Service.GOOGLE_PLACES).value
-    # Fetching detailed information of a restaurant
-    googleResult = get(
-        f"https://maps.googleapis.com/maps/api/place/details/json?fields=reviews&language={lang}&place_id={restaurantId}&key={googleKey}"
-    )
-    googleResult.raise_for_status()
-
-    googleResult = loads(googleResult.text)
-
-    for review in googleResult.get("result").get("reviews"):
+    # Fetching detailed information of a restaurant (from google, if they have not been stored yet or are too old)
+    for review in placeDetailsStore().details(restaurantId, lang).get("reviews"):
         result.add(
             Rating(
                 review.get("author_name"),
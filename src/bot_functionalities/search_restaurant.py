@@ -28,12 +28,18 @@ from telegram import (
     InlineKeyboardMarkup,
 )
 from telegram.ext import CallbackContext, ConversationHandler
-from requests import get
 from string import capwords
-from json import loads
 from sys import path
-from geopy.distance import geodesic
-from time import strftime, gmtime
+from time import strftime, gmtime, time
+import asyncio
+from concurrent.futures import (
+    CancelledError,
+    Future,
+    TimeoutError as FutureTimeoutError,
+)
+from logging import getLogger
+from requests import RequestException
+from sqlite3 import OperationalError
 
 from data import (
     fetchCategories,
@@ -41,17 +47,51 @@ from data import (
     insertRestaurantInfos,
     insertRestaurantIntoList,
     fetchResearchRadius,
+    insertPlaceLocations,
 )
 from tools import verifyChatData
 import utils
 from utils import research_info
+from utils.deadline import Deadline
 from utils.general_place import GeneralPlace
-from utils.rating import Rating
+from utils.geo import filterWithinPolygon, filterWithinRadius
+from utils.rating import Rating, RatingsList
 from utils.research_info import ResearchInfo
 from utils.restaurant import Restaurant, RestaurantList
-from custom_exceptions import GoogleCriticalErrorException, NoPlaceFoundException
+from routing import (
+    UNREACHABLE,
+    EstimateRouter,
+    MapboxRouter,
+    TravelMode,
+    reachableAreaAsync,
+    routingBackend,
+    routingExecutor,
+    routeCache,
+    travelTimeGrid,
+)
+from places import (
+    detailsPrefetcher,
+    findPlaceProjection,
+    foodKeywordCanonicalizer,
+    nearbySearchProjection,
+    geocodingCache,
+    googlePlacesClient,
+    nearbySearchCache,
+    placeDetailsStore,
+    restaurantCatalog,
+)
+from upstream import asyncUpstreamClient
+from custom_exceptions import (
+    DeadlineExceededException,
+    GoogleCriticalErrorException,
+    GoogleUnavailableException,
+    NoPlaceFoundException,
+    RoutingErrorException,
+)
 from STRINGS_LIST import getString
 
+logger = getLogger(__name__)
+
 path.append("..")
 
 
@@ -86,6 +126,7 @@ def startSearch(update: Update, context: CallbackContext) -> int:
 
 def searchLocationByName(update: Update, context: CallbackContext) -> int:
     """Based on the input given by the user, it search for a location which match."""
+    deadline = Deadline(utils.configValue("SEARCH_DEADLINE_SECONDS", 10.0))
     verifyChatData(update=update, context=context)
 
     # Fetching the user input and deleting his message to keep the chat clear
@@ -93,8 +134,8 @@ def searchLocationByName(update: Update, context: CallbackContext) -> int:
     context.bot.delete_message(update.message.chat_id, update.message.message_id)
 
     try:
-        # Fetching from google the places with the given name
-        placesFound = __getPlaces(inputUserText)
+        # Fetching the place with the given name (from google, if it has not been cached yet)
+        location = __getLocation(inputUserText, deadline)
     except NoPlaceFoundException:
         # Thrown if there are no location with the given name
         context.bot.edit_message_text(
@@ -104,6 +145,24 @@ def searchLocationByName(update: Update, context: CallbackContext) -> int:
         )
 
         # The user can retry to insert a new location or send his position
+        return SELECT_STARTING_POSITION
+    except GoogleUnavailableException:
+        # Thrown when google is temporarily unavailable: the user can retry shortly.
+        context.bot.edit_message_text(
+            chat_id=update.effective_chat.id,
+            message_id=context.chat_data.get("search_message_id"),
+            text=getString("ERROR_GoogleUnavailable", context.chat_data.get("lang")),
+        )
+
+        return SELECT_STARTING_POSITION
+    except DeadlineExceededException:
+        # Thrown when google has not answered in time: the user can retry.
+        context.bot.edit_message_text(
+            chat_id=update.effective_chat.id,
+            message_id=context.chat_data.get("search_message_id"),
+            text=getString("ERROR_SearchTimeout", context.chat_data.get("lang")),
+        )
+
         return SELECT_STARTING_POSITION
     except GoogleCriticalErrorException:
         # Thrown when an error from google internal apis occours.
@@ -116,13 +175,8 @@ def searchLocationByName(update: Update, context: CallbackContext) -> int:
         return endSearchConversation(update=update, context=context)
     else:
         # Setting up the research info. This object will be used to store useful informations of the parameters used for the restaurant research.
-        # We take the first candidate since it is most likely the one preferred by the user.
         searchInfos = utils.ResearchInfo()
-        searchInfos.location = utils.GeneralPlace(
-            placesFound.get("candidates")[0].get("name"),
-            placesFound.get("candidates")[0].get("geometry").get("location").get("lat"),
-            placesFound.get("candidates")[0].get("geometry").get("location").get("lng"),
-        )
+        searchInfos.location = location
 
         # Putting the fetched location in the chat_data dictionary in order to access it for future uses.
         context.chat_data.update({"research_info": searchInfos})
@@ -199,6 +253,11 @@ def selectFood(update: Update, context: CallbackContext) -> int:
     # Updating the research infos with the food selected by the user
     searchInfo: ResearchInfo = context.chat_data.get("research_info")
     searchInfo.food = selectedFood
+    # The research is performed with the canonical keyword, so that the different ways of typing the same food share
+    # the cached responses. The text typed is only displayed.
+    searchInfo.keyword = foodKeywordCanonicalizer().canonical(
+        selectedFood, context.chat_data.get("lang")
+    )
 
     return showRecapMessage(update, context)
 
@@ -399,6 +458,8 @@ def priceChanged(update: Update, context: CallbackContext):
 
 def searchRestaurant(update: Update, context: CallbackContext) -> int:
     """Given the research parameters (stored in `chat_data`), it fetches the list of restaurants and display it to the user."""
+    # The whole research has to fit in this time: the stages which run out of it use the cached or partial results.
+    deadline = Deadline(utils.configValue("SEARCH_DEADLINE_SECONDS", 10.0))
     verifyChatData(update=update, context=context)
 
     query = update.callback_query
@@ -408,33 +469,38 @@ def searchRestaurant(update: Update, context: CallbackContext) -> int:
     searchInfo: ResearchInfo = context.chat_data.get("research_info")
 
     try:
-        # Fetch the restaurants.
-        placesFound = __fetchRestaurant(
-            update.effective_chat.id, searchInfo, context.chat_data.get("lang")
+        maxRadius = fetchResearchRadius(
+            update.effective_chat.id, searchInfo.walkingdistance, deadline
+        )[0]
+
+        # Fetch the restaurants and keep the reachable ones. The whole research runs on the upstream event loop.
+        (placesFound, restaurants, lazyRouting) = asyncUpstreamClient().run(
+            __searchRestaurantsAsync(
+                searchInfo, context.chat_data.get("lang"), maxRadius, deadline
+            ),
+            deadline,
         )
     except NoPlaceFoundException:
         # Thrown when no restaurants were found with the specfied research informations.
         # In this case the recap will pop back.
+        return __showNoRestaurantsFound(update, context)
+    except GoogleUnavailableException:
+        # Thrown when google is temporarily unavailable and the research has not been cached.
         context.bot.send_message(
             chat_id=update.effective_chat.id,
-            text=getString("ERROR_NoRestaurantsFound", context.chat_data.get("lang")),
+            text=getString("ERROR_GoogleUnavailable", context.chat_data.get("lang")),
         )
 
-        context.bot.delete_message(
+        return endSearchConversation(update=update, context=context)
+    except (DeadlineExceededException, OperationalError):
+        # Thrown when google has not answered in time and the research has not been cached, or when the database has
+        # stayed locked by the background writes. The recap message is still there, so the user can retry.
+        context.bot.send_message(
             chat_id=update.effective_chat.id,
-            message_id=context.chat_data.get("search_message_id"),
+            text=getString("ERROR_SearchTimeout", context.chat_data.get("lang")),
         )
-        # Creating a new "empty" message. It will be immediately overridden by showRecapMessage method.
-        newMessage = context.bot.send_message(
-            chat_id=update.effective_chat.id, text="_"
-        )
-        context.chat_data.update({"search_message_id": newMessage.message_id})
-
-        # Since no restaurant matched with the given specs, then we reset them to their default value.
-        searchInfo.opennow = False
-        searchInfo.cost = 3
 
-        return showRecapMessage(update, context)
+        return CHECK_SEARCH_INFO
     except GoogleCriticalErrorException:
         # Thrown when an internal google apis error occur.
         # Also in this case an error message is sent and the conversation immediately ends.
@@ -446,87 +512,81 @@ def searchRestaurant(update: Update, context: CallbackContext) -> int:
         return endSearchConversation(update=update, context=context)
     else:
         # If everything has gone fine, a restaurants' list is compiled and stored in chat_data
-        fetchedRestaurants = RestaurantList()
         filteredRestaurants = RestaurantList()
-        maxRadius = fetchResearchRadius(
-            update.effective_chat.id, searchInfo.walkingdistance
-        )[0]
-        # outOfRangeRestaurants: list = []
-        for result in placesFound.get("results"):
-            if (
-                geodesic(
-                    (
-                        result.get("geometry").get("location").get("lat"),
-                        result.get("geometry").get("location").get("lng"),
-                    ),
-                    (searchInfo.latitude, searchInfo.longitude),
-                ).meters
-                <= maxRadius
-            ):
-                restaurant = Restaurant(
-                    result.get("name"),
-                    result.get("geometry").get("location").get("lat"),
-                    result.get("geometry").get("location").get("lng"),
-                    result.get("place_id"),
-                    result.get("price_level"),
-                    result.get("rating"),
-                    result.get("user_ratings_total"),
-                )
-
-                # Than we measure the walking or driving distance between the starting position and the destination
-                (
-                    restaurant.distance,
-                    restaurant.reachtime,
-                ) = __compileRestaurantReachingParameters(
-                    searchInfo.latitude,
-                    searchInfo.longitude,
-                    restaurant.latitude,
-                    restaurant.longitude,
-                    "mapbox/walking"
-                    if searchInfo.walkingdistance
-                    else "mapbox/driving",
-                )
-                if restaurant.distance <= maxRadius:
-                    filteredRestaurants.add(restaurant)
+        for restaurant in restaurants:
+            filteredRestaurants.add(restaurant)
+        if lazyRouting:
+            context.chat_data.update({"lazy_routing_radius": maxRadius})
+
+        # The further pages of results are fetched only when the user gets close to the end of the list.
+        __discardNextPage(context)
+        __discardDetailsPrefetches(context)
+        __discardBackgroundRouting(context)
+        context.chat_data.update(
+            {
+                "next_page_token": placesFound.get("next_page_token"),
+                "next_page_issued_at": time(),
+            }
+        )
 
         if filteredRestaurants.size == 0:
             # Thrown when no restaurants were found with the specfied research informations.
             # In this case the recap will pop back.
-            context.bot.send_message(
-                chat_id=update.effective_chat.id,
-                text=getString(
-                    "ERROR_NoRestaurantsFound", context.chat_data.get("lang")
-                ),
-            )
-
-            context.bot.delete_message(
-                chat_id=update.effective_chat.id,
-                message_id=context.chat_data.get("search_message_id"),
-            )
-            # Creating a new "empty" message. It will be immediately overridden by showRecapMessage method.
-            newMessage = context.bot.send_message(
-                chat_id=update.effective_chat.id, text="_"
-            )
-            context.chat_data.update({"search_message_id": newMessage.message_id})
-
-            # Since no restaurant matched with the given specs, then we reset them to their default value.
-            searchInfo.opennow = False
-            searchInfo.cost = 3
-
-            return showRecapMessage(update, context)
+            return __showNoRestaurantsFound(update, context)
         else:
             context.chat_data.update({"restaurants_list": filteredRestaurants})
+            __prefetchNextPage(update, context)
 
             return showCurrentRestaurant(update, context)
 
 
-def showCurrentRestaurant(update: Update, context: CallbackContext) -> int:
-    """Display the current restaurant name and ratings and set up some possible actions."""
+def __showNoRestaurantsFound(update: Update, context: CallbackContext) -> int:
+    """Notifies the user that no restaurant matched the research, and shows back the recap message with the default research parameters."""
+    searchInfo: ResearchInfo = context.chat_data.get("research_info")
+
+    context.bot.send_message(
+        chat_id=update.effective_chat.id,
+        text=getString("ERROR_NoRestaurantsFound", context.chat_data.get("lang")),
+    )
+
+    context.bot.delete_message(
+        chat_id=update.effective_chat.id,
+        message_id=context.chat_data.get("search_message_id"),
+    )
+    # Creating a new "empty" message. It will be immediately overridden by showRecapMessage method.
+    newMessage = context.bot.send_message(chat_id=update.effective_chat.id, text="_")
+    context.chat_data.update({"search_message_id": newMessage.message_id})
+
+    # Since no restaurant matched with the given specs, then we reset them to their default value.
+    searchInfo.opennow = False
+    searchInfo.cost = 3
+
+    return showRecapMessage(update, context)
+
+
+def showCurrentRestaurant(
+    update: Update, context: CallbackContext, backwards: bool = False
+) -> int:
+    """Display the current restaurant name and ratings and set up some possible actions.
+
+    With lazy routing, the restaurants are routed here only: `backwards` tells whether the user is browsing the list
+    backwards, so that the restaurants preceding the current one are routed in advance.
+    """
     verifyChatData(update=update, context=context)
 
     # Fetching the list of restaurants
     listOfRestaurants = context.chat_data.get("restaurants_list")
 
+    # With lazy routing the current restaurant may turn out to be out of range: in this case it is dropped.
+    if context.chat_data.get("lazy_routing_radius") != None:
+        __routeAroundCurrentRestaurant(context, backwards)
+        if listOfRestaurants.size == 0:
+            return __showNoRestaurantsFound(update, context)
+
+    # The details of the restaurants the user is about to open are fetched in the background.
+    if utils.configValue("DETAILS_PREFETCH", True):
+        __prefetchDetails(context)
+
     # Creating the keyboard to attach to the display restaurants message:
     #   by clicking ⬅️                 the user will move to the previous restaurant of the list;
     #   by clicking ➡️                 the user will move to the next restaurant of the list;
@@ -590,6 +650,7 @@ def showCurrentRestaurant(update: Update, context: CallbackContext) -> int:
                     if (context.chat_data.get("research_info").walkingdistance)
                     else "🚙 - "
                 )
+                + ("~" if listOfRestaurants.current.reachestimated else "")
                 + (
                     (
                         (
@@ -600,13 +661,23 @@ def showCurrentRestaurant(update: Update, context: CallbackContext) -> int:
                         else str(round(listOfRestaurants.current.distance))
                         + getString("GENERAL_Meters", context.chat_data.get("lang"))
                     )
-                    if listOfRestaurants.current.distance < 100000
+                    if listOfRestaurants.current.distance < UNREACHABLE
                     else "N.A."
                 )
+                + (
+                    getString(
+                        "GENERAL_EstimatedReachingParameters",
+                        context.chat_data.get("lang"),
+                    )
+                    if listOfRestaurants.current.reachestimated
+                    else ""
+                )
             ),
-            strftime("%M:%S", gmtime(listOfRestaurants.current.reachtime))
+            ("~" if listOfRestaurants.current.reachestimated else "")
+            + strftime("%M:%S", gmtime(listOfRestaurants.current.reachtime))
             # str(round(listOfRestaurants.current.reachtime / 60, 2))
-            if listOfRestaurants.current.reachtime < 100000 else "N.A.",
+            if listOfRestaurants.current.reachtime < UNREACHABLE
+            else "N.A.",
             "⭐️" * round(listOfRestaurants.current.rating)
             + " <b><i>{}</i></b>/5".format(str(listOfRestaurants.current.rating)),
             "<i>{}</i>".format(str(listOfRestaurants.current.ratingsnumber)),
@@ -626,10 +697,19 @@ def showNextRestaurant(update: Update, context: CallbackContext) -> int:
     query = update.callback_query
     query.answer()
 
+    # The next page of results is appended as soon as it has been fetched. If the user reached the last restaurant,
+    # the page is awaited instead of starting again from the first restaurant.
+    __appendNextPage(
+        update,
+        context,
+        wait=context.chat_data.get("restaurants_list").remaining == 0,
+    )
+
     # Fetching the list of restaurants and picking the next
     # If there is only one element there is no reason to move from the current state
     if context.chat_data.get("restaurants_list").size > 1:
         context.chat_data.get("restaurants_list").setCurrentElementWithHisNext()
+        __prefetchNextPage(update, context)
 
         return showCurrentRestaurant(update, context)
 
@@ -641,12 +721,14 @@ def showPrevRestaurant(update: Update, context: CallbackContext) -> int:
     query = update.callback_query
     query.answer()
 
+    __appendNextPage(update, context)
+
     # Fetching the list of restaurants and picking the next
     # If there is only one element there is no reason to move from the current state
     if context.chat_data.get("restaurants_list").size > 1:
         context.chat_data.get("restaurants_list").setCurrentElementWithHisPrev()
 
-        return showCurrentRestaurant(update, context)
+        return showCurrentRestaurant(update, context, backwards=True)
 
 
 def startPollWithCurrentRestaurant(update: Update, context: CallbackContext):
@@ -709,6 +791,8 @@ def startPollWithCurrentRestaurant(update: Update, context: CallbackContext):
 
 def getMoreInfoOfCurrentRestaurant(update: Update, context: CallbackContext) -> int:
     """Fetches in-depth details of the current restaurant and shows them to the user."""
+    # The wait for the prefetch and the fetch of the details have to fit in this time.
+    deadline = Deadline(utils.configValue("DETAILS_DEADLINE_SECONDS", 10.0))
     verifyChatData(update=update, context=context)
 
     query = update.callback_query
@@ -716,8 +800,75 @@ def getMoreInfoOfCurrentRestaurant(update: Update, context: CallbackContext) ->
 
     # Getting the current restaurant and updating his attributes with datailed infos.
     currentPlace: Restaurant = context.chat_data.get("restaurants_list").current
+    prefetch: Future = context.chat_data.get("details_prefetches", {}).pop(
+        currentPlace.id, None
+    )
+    if prefetch != None:
+        # The details being prefetched are awaited rather than fetched again. If the prefetch failed, they are fetched below.
+        detailsPrefetcher().viewed(prefetch)
+        try:
+            prefetch.result(
+                timeout=deadline.budget(
+                    utils.configValue("DETAILS_PREFETCH_WAIT_SECONDS", 5.0)
+                )
+            )
+        except (
+            FutureTimeoutError,
+            CancelledError,
+            DeadlineExceededException,
+            GoogleCriticalErrorException,
+            GoogleUnavailableException,
+            NoPlaceFoundException,
+            OperationalError,
+            RequestException,
+        ):
+            pass
     if not currentPlace.isdetailed:
-        __fetchDetailedInfosOfRestaurant(currentPlace, context.chat_data.get("lang"))
+        try:
+            __fetchDetailedInfosOfRestaurant(
+                currentPlace, context.chat_data.get("lang"), deadline
+            )
+        except GoogleUnavailableException:
+            # Thrown when google is temporarily unavailable and the details have not been stored.
+            # The restaurant is still shown in the list, so the user can retry later.
+            context.bot.send_message(
+                chat_id=update.effective_chat.id,
+                text=getString(
+                    "ERROR_GoogleUnavailable", context.chat_data.get("lang")
+                ),
+            )
+
+            return VIEW_SEARCH_RESULTS
+        except (DeadlineExceededException, OperationalError):
+            # Thrown when google has not answered in time and the details have not been stored, or when the database has
+            # stayed locked by the background writes.
+            context.bot.send_message(
+                chat_id=update.effective_chat.id,
+                text=getString("ERROR_SearchTimeout", context.chat_data.get("lang")),
+            )
+
+            return VIEW_SEARCH_RESULTS
+        except NoPlaceFoundException:
+            # Thrown when google does not know the restaurant anymore: the other restaurants of the list can be viewed.
+            context.bot.send_message(
+                chat_id=update.effective_chat.id,
+                text=getString(
+                    "ERROR_RestaurantDetailsNotFound", context.chat_data.get("lang")
+                ),
+            )
+
+            return VIEW_SEARCH_RESULTS
+        except (GoogleCriticalErrorException, RequestException):
+            # Thrown when an internal google apis error occur.
+            # Also in this case an error message is sent and the conversation immediately ends.
+            context.bot.send_message(
+                chat_id=update.effective_chat.id,
+                text=getString(
+                    "ERROR_GoogleCriticalError", context.chat_data.get("lang")
+                ),
+            )
+
+            return endSearchConversation(update=update, context=context)
 
     # Creating the keyboard to attach to the display restaurants message:
     #   by clicking 🌐                 the user will open the restaurant's website if present, otherwise it links google.com;
@@ -996,21 +1147,63 @@ def endSearchConversation(update: Update, context: CallbackContext) -> int:
         context.chat_data.pop("research_info")
     if context.chat_data.get("restaurants_list") != None:
         context.chat_data.pop("restaurants_list")
+    if context.chat_data.get("lazy_routing_radius") != None:
+        context.chat_data.pop("lazy_routing_radius")
+    __discardNextPage(context)
+    __discardBackgroundRouting(context)
+    __discardDetailsPrefetches(context)
 
     return utils.cancelConversation(update=update, context=context)
 
 
-def __getPlaces(textQuery: str) -> list:
+def __getLocation(textQuery: str, deadline: Deadline = None) -> GeneralPlace:
+    """Returns the location matching the given name. Google is queried only if the name has not been cached yet.
+
+    Args:
+        textQuery (str): the name typed by the user
+        deadline (Deadline, optional): the deadline of the update being served. Defaults to None.
+
+    Raises:
+        NoPlaceFoundException: raised when no location matches the name.
+        GoogleCriticalErrorException: raised when Google fails to answer.
+        DeadlineExceededException: raised when Google does not answer before the deadline.
+
+    Returns:
+        GeneralPlace: the location found
+    """
+    location = geocodingCache().get(textQuery, deadline)
+
+    if location == None:
+        try:
+            placesFound = __getPlaces(textQuery, deadline)
+        except NoPlaceFoundException:
+            geocodingCache().put(textQuery)
+            raise
+
+        # We take the first candidate since it is most likely the one preferred by the user.
+        candidate = placesFound.get("candidates")[0]
+        location = (
+            candidate.get("name"),
+            candidate.get("geometry").get("location").get("lat"),
+            candidate.get("geometry").get("location").get("lng"),
+        )
+        geocodingCache().put(textQuery, *location)
+
+    if location[0] == None:
+        raise NoPlaceFoundException(textQuery, "Place not found")
+
+    return GeneralPlace(*location)
+
+
+def __getPlaces(textQuery: str, deadline: Deadline) -> list:
     formattedText = __formatInputText(textQuery)
 
-    googleKey = utils.ApiKey(utils.Service.GOOGLE_PLACES).value
-    googleResult = get(
-        f"https://maps.googleapis.com/maps/api/place/findplacefromtext/json?fields=name%2Cgeometry&input={formattedText}&inputtype=textquery&key={googleKey}"
+    googleResult = googlePlacesClient().request(
+        "findplace",
+        f"https://maps.googleapis.com/maps/api/place/findplacefromtext/json?fields=name%2Cgeometry/location&input={formattedText}&inputtype=textquery",
+        projection=findPlaceProjection,
+        deadline=deadline,
     )
-    googleResult.raise_for_status()
-
-    # Parsing google response (json) to dictionary
-    googleResult = loads(googleResult.text)
 
     if googleResult.get("status") == "OK":
         return googleResult
@@ -1026,25 +1219,99 @@ def __formatInputText(textToFormat: str) -> str:
     return textToFormat.replace(" ", "%20")
 
 
-def __fetchRestaurant(chatId: str, researchInfo: ResearchInfo, lang: str):
-    googleKey = utils.ApiKey(utils.Service.GOOGLE_PLACES).value
+async def __searchRestaurantsAsync(
+    researchInfo: ResearchInfo, lang: str, maxRadius: int, deadline: Deadline
+) -> tuple:
+    """The research pipeline: fetches the restaurants matching the research and keeps the ones which can be reached.
+
+    Every stage uses only the time left before the deadline. The routes which are not computed in time are estimated.
+
+    Args:
+        researchInfo (ResearchInfo): the research parameters
+        lang (str): the language of the results
+        maxRadius (int): the maximum distance travelled, in meters
+        deadline (Deadline): the deadline of the research
+
+    Raises:
+        NoPlaceFoundException: raised when no restaurant matches the research.
+        GoogleCriticalErrorException: raised when Google fails to answer.
+        DeadlineExceededException: raised when Google does not answer in time and the research has not been cached.
 
-    radiusInMeters: int = int(
-        fetchResearchRadius(chatId, researchInfo.walkingdistance)[0]
+    Returns:
+        tuple: (the Nearby Search response, the restaurants kept, whether they still have to be routed lazily)
+    """
+    placesFound = await __fetchRestaurantAsync(
+        researchInfo, lang, int(maxRadius), deadline
+    )
+    (restaurants, lazyRouting) = await __filterReachableRestaurantsAsync(
+        researchInfo, placesFound.get("results"), maxRadius, deadline
     )
 
-    if researchInfo.opennow:
-        googleResult = get(
-            f"https://maps.googleapis.com/maps/api/place/nearbysearch/json?keyword={researchInfo.food}&maxprice={researchInfo.cost-1}&opennow&language={lang}&location={researchInfo.latitude}%2C{researchInfo.longitude}&radius={radiusInMeters}&type=restaurant&key={googleKey}"
-        )
-    else:
-        googleResult = get(
-            f"https://maps.googleapis.com/maps/api/place/nearbysearch/json?keyword={researchInfo.food}&maxprice={researchInfo.cost-1}&language={lang}&location={researchInfo.latitude}%2C{researchInfo.longitude}&radius={radiusInMeters}&type=restaurant&key={googleKey}"
+    return (placesFound, restaurants, lazyRouting)
+
+
+async def __fetchRestaurantAsync(
+    researchInfo: ResearchInfo, lang: str, radiusInMeters: int, deadline: Deadline
+):
+    # The same research performed close by shortly before is served from the cache. The places found are checked
+    # against the exact research location and radius by the caller.
+    cacheKey = nearbySearchCache().key(
+        (researchInfo.latitude, researchInfo.longitude),
+        researchInfo.keyword,
+        researchInfo.cost - 1,
+        researchInfo.opennow,
+        radiusInMeters,
+        lang,
+    )
+    googleResult = nearbySearchCache().get(cacheKey)
+
+    if googleResult == None and not researchInfo.opennow:
+        # An area already researched completely is answered from the local catalog of the restaurants.
+        googleResult = await asyncio.to_thread(
+            restaurantCatalog().search,
+            (researchInfo.latitude, researchInfo.longitude),
+            radiusInMeters,
+            researchInfo.keyword,
+            researchInfo.cost - 1,
+            lang,
+            deadline,
         )
-    googleResult.raise_for_status()
 
-    # Parsing google response (json) to dictionary
-    googleResult = loads(googleResult.text)
+    if googleResult == None:
+        searchRadius = nearbySearchCache().searchRadius(radiusInMeters)
+
+        try:
+            if researchInfo.opennow:
+                googleResult = await googlePlacesClient().requestAsync(
+                    "nearby",
+                    f"https://maps.googleapis.com/maps/api/place/nearbysearch/json?keyword={researchInfo.keyword}&maxprice={researchInfo.cost-1}&opennow&language={lang}&location={researchInfo.latitude}%2C{researchInfo.longitude}&radius={searchRadius}&type=restaurant",
+                    projection=nearbySearchProjection,
+                    deadline=deadline,
+                )
+            else:
+                googleResult = await googlePlacesClient().requestAsync(
+                    "nearby",
+                    f"https://maps.googleapis.com/maps/api/place/nearbysearch/json?keyword={researchInfo.keyword}&maxprice={researchInfo.cost-1}&language={lang}&location={researchInfo.latitude}%2C{researchInfo.longitude}&radius={searchRadius}&type=restaurant",
+                    projection=nearbySearchProjection,
+                    deadline=deadline,
+                )
+        except (GoogleUnavailableException, DeadlineExceededException):
+            # While Google is unavailable or slow, an expired response of the same research is better than no response.
+            googleResult = nearbySearchCache().getExpired(cacheKey)
+            if googleResult == None:
+                raise
+        else:
+            if googleResult.get("status") in ("OK", "ZERO_RESULTS"):
+                nearbySearchCache().put(cacheKey, googleResult)
+                routingExecutor().runInBackground(
+                    restaurantCatalog().record,
+                    googleResult,
+                    researchInfo.keyword,
+                    researchInfo.cost - 1,
+                    lang,
+                    ((researchInfo.latitude, researchInfo.longitude), searchRadius),
+                    researchInfo.opennow,
+                )
 
     if googleResult.get("status") == "OK":
         return googleResult
@@ -1056,89 +1323,643 @@ def __fetchRestaurant(chatId: str, researchInfo: ResearchInfo, lang: str):
         )
 
 
-def __fetchDetailedInfosOfRestaurant(restaurant: Restaurant, lang: str) -> None:
-    # Utils
-    placeId: str = restaurant.id
-    googleKey = utils.ApiKey(utils.Service.GOOGLE_PLACES).value
+async def __fetchNextPageAsync(
+    pageToken: str,
+    issuedAt: float,
+    researchInfo: ResearchInfo,
+    lang: str,
+    maxRadius: int,
+    deadline: Deadline,
+) -> tuple:
+    """Fetches the next page of Nearby Search results and keeps the restaurants which can be reached. Runs in the background.
+
+    Args:
+        pageToken (str): the `next_page_token` of the previous page
+        issuedAt (float): the timestamp at which the previous page was received
+        researchInfo (ResearchInfo): the research parameters
+        lang (str): the language of the results
+        maxRadius (int): the maximum distance travelled, in meters
+        deadline (Deadline): the deadline of the page
+
+    Raises:
+        GoogleCriticalErrorException: raised when Google fails to answer.
+        GoogleUnavailableException: raised when Google is temporarily unavailable.
+        DeadlineExceededException: raised when the page token does not become valid, or Google does not answer, before
+                                   the deadline.
+
+    Returns:
+        tuple: (the restaurants kept, whether they still have to be routed lazily, the token of the following page)
+    """
+    tokenDelay = utils.configValue("NEARBY_PAGE_TOKEN_DELAY_SECONDS", 2.0)
+
+    # A page token becomes valid a couple of seconds after it has been issued: until then INVALID_REQUEST is returned.
+    for attempt in range(utils.configValue("NEARBY_PAGE_TOKEN_ATTEMPTS", 3)):
+        wait = tokenDelay if attempt > 0 else max(0.0, issuedAt + tokenDelay - time())
+        if wait >= deadline.remaining:
+            raise DeadlineExceededException(
+                "The deadline expired before the page token became valid."
+            )
+        await asyncio.sleep(wait)
 
-    # Fetching detailed information of a restaurant
-    googleResult = get(
-        f"https://maps.googleapis.com/maps/api/place/details/json?fields=formatted_address%2Cformatted_phone_number%2Copening_hours/weekday_text%2Creviews%2Cwebsite%2Curl&language={lang}&place_id={placeId}&key={googleKey}"
+        googleResult = await googlePlacesClient().requestAsync(
+            "nearby",
+            f"https://maps.googleapis.com/maps/api/place/nearbysearch/json?pagetoken={pageToken}",
+            projection=nearbySearchProjection,
+            deadline=deadline,
+        )
+        if googleResult.get("status") != "INVALID_REQUEST":
+            break
+
+    if googleResult.get("status") == "ZERO_RESULTS":
+        return ([], False, None)
+    elif googleResult.get("status") != "OK":
+        raise GoogleCriticalErrorException(
+            "Google critical error; check the google key status."
+        )
+
+    # The following pages feed the catalog too, but they never cover an area on their own.
+    routingExecutor().runInBackground(
+        restaurantCatalog().record,
+        googleResult,
+        researchInfo.keyword,
+        researchInfo.cost - 1,
+        lang,
+    )
+    (restaurants, lazyRouting) = await __filterReachableRestaurantsAsync(
+        researchInfo, googleResult.get("results"), maxRadius, deadline
     )
-    googleResult.raise_for_status()
+    return (restaurants, lazyRouting, googleResult.get("next_page_token"))
 
-    googleResult = loads(googleResult.text)
 
-    if googleResult.get("status") == "OK":
-        weekTimeTable = ""
+def __fetchDetailedInfosOfRestaurant(
+    restaurant: Restaurant, lang: str, deadline: Deadline = None
+) -> None:
+    # Fetching detailed information of a restaurant (from google, if they have not been stored yet or are too old)
+    __compileDetailedInfosOfRestaurant(
+        placeDetailsStore().details(restaurant.id, lang, deadline), restaurant, lang
+    )
 
-        # Compiling a formatted timetable for the week if provided
-        try:
-            for dayTimeTable in (
-                googleResult.get("result").get("opening_hours").get("weekday_text")
-            ):
-                weekTimeTable += dayTimeTable + "\n"
-        except:
-            weekTimeTable = getString("ERROR_TimetableNotAvailable", language=lang)
-
-        # Updating restaurant's infos
-        restaurant.address = (
-            googleResult.get("result").get("formatted_address")
-            if googleResult.get("result").get("formatted_address") != None
-            else "https://maps.google.com/"
+
+def __compileDetailedInfosOfRestaurant(
+    details: dict, restaurant: Restaurant, lang: str
+) -> None:
+    """Updates the restaurant with the details given. It may run in the background, see __prefetchDetails."""
+    weekTimeTable = ""
+
+    # Compiling a formatted timetable for the week if provided
+    try:
+        for dayTimeTable in details.get("opening_hours").get("weekday_text"):
+            weekTimeTable += dayTimeTable + "\n"
+    except:
+        weekTimeTable = getString("ERROR_TimetableNotAvailable", language=lang)
+
+    # Updating restaurant's infos
+    restaurant.address = (
+        details.get("formatted_address")
+        if details.get("formatted_address") != None
+        else "https://maps.google.com/"
+    )
+    restaurant.timetable = weekTimeTable
+    restaurant.website = (
+        details.get("website")
+        if details.get("website") != None
+        else "https://www.google.com/"
+    )
+    restaurant.maps = details.get("url")
+    restaurant.phone = (
+        details.get("formatted_phone_number")
+        if details.get("formatted_phone_number") != None
+        else getString("ERROR_PhoneNumberNotAvailable", lang)
+    )
+
+    # The reviews are replaced at once, since the user may be reading them while they are prefetched again.
+    reviews = RatingsList()
+    for review in details.get("reviews"):
+        reviews.add(
+            Rating(
+                review.get("author_name"),
+                review.get("rating"),
+                review.get("text"),
+                review.get("time"),
+            )
         )
-        restaurant.timetable = weekTimeTable
-        restaurant.website = (
-            googleResult.get("result").get("website")
-            if googleResult.get("result").get("website") != None
-            else "https://www.google.com/"
+    restaurant.reviews = reviews
+
+    # The restaurant now has complete informations stored
+    restaurant.isdetailed = True
+
+
+async def __filterReachableRestaurantsAsync(
+    researchInfo: ResearchInfo,
+    results: list,
+    maxRadius: int,
+    deadline: Deadline = None,
+) -> tuple:
+    """Builds the restaurants of a page of Nearby Search results which can be reached within `maxRadius` meters.
+
+    Args:
+        researchInfo (ResearchInfo): the research parameters
+        results (list): the `results` of a Nearby Search response
+        maxRadius (int): the maximum distance travelled, in meters
+        deadline (Deadline, optional): the deadline of the research. Defaults to None.
+
+    Returns:
+        tuple: (the restaurants kept, whether they still have to be routed while the user browses them)
+    """
+    # The positions of the restaurants found feed the offline travel time grid (see build_travel_time_grid.py).
+    routingExecutor().runInBackground(
+        insertPlaceLocations,
+        [
+            (
+                result.get("place_id"),
+                result.get("geometry").get("location").get("lat"),
+                result.get("geometry").get("location").get("lng"),
+            )
+            for result in results
+        ],
+        time(),
+    )
+
+    # All the results are checked at once against the straight-line distance from the starting position.
+    candidateRestaurants: list = []
+    for resultIndex in filterWithinRadius(
+        (researchInfo.latitude, researchInfo.longitude),
+        [
+            (
+                result.get("geometry").get("location").get("lat"),
+                result.get("geometry").get("location").get("lng"),
+            )
+            for result in results
+        ],
+        maxRadius,
+    ):
+        result = results[resultIndex]
+        candidateRestaurants.append(
+            Restaurant(
+                result.get("name"),
+                result.get("geometry").get("location").get("lat"),
+                result.get("geometry").get("location").get("lng"),
+                result.get("place_id"),
+                result.get("price_level"),
+                result.get("rating"),
+                result.get("user_ratings_total"),
+            )
+        )
+
+    # With the isochrone filter a single request tells which candidates are reachable. If the area cannot be
+    # computed the usual route-based filter is applied instead.
+    reachableRestaurants = await __filterWithinReachableAreaAsync(
+        researchInfo, candidateRestaurants, maxRadius, deadline
+    )
+
+    if reachableRestaurants != None:
+        # Distances and times are only displayed, so they are taken from the cache or estimated locally.
+        await __compileRestaurantsReachingParametersAsync(
+            researchInfo,
+            reachableRestaurants,
+            computeMissingRoutes=False,
+            deadline=deadline,
+        )
+        return (reachableRestaurants, False)
+    elif utils.configValue("ROUTING_LAZY", False):
+        # Lazy routing: only the straight-line check is performed now. The restaurants are routed while the user
+        # browses the list (see __routeAroundCurrentRestaurant), and the unreachable ones are dropped on the fly.
+        return (candidateRestaurants, True)
+    else:
+        # Than we measure the walking or driving distance between the starting position and all the destinations at once
+        await __compileRestaurantsReachingParametersAsync(
+            researchInfo, candidateRestaurants, deadline=deadline
         )
-        restaurant.maps = googleResult.get("result").get("url")
-        restaurant.phone = (
-            googleResult.get("result").get("formatted_phone_number")
-            if googleResult.get("result").get("formatted_phone_number") != None
-            else getString("ERROR_PhoneNumberNotAvailable", lang)
+        # Restaurants with an estimated route are kept, since they already passed the straight-line check.
+        return (
+            [
+                restaurant
+                for restaurant in candidateRestaurants
+                if restaurant.reachestimated or restaurant.distance <= maxRadius
+            ],
+            False,
         )
 
-        for review in googleResult.get("result").get("reviews"):
-            restaurant.reviews.add(
-                Rating(
-                    review.get("author_name"),
-                    review.get("rating"),
-                    review.get("text"),
-                    review.get("time"),
+
+def __prefetchNextPage(update: Update, context: CallbackContext) -> None:
+    """Starts fetching the next page of results in the background, if the user is close to the end of the list."""
+    if (
+        context.chat_data.get("next_page_token") == None
+        or context.chat_data.get("next_page_future") != None
+        or context.chat_data.get("restaurants_list").remaining
+        > utils.configValue("NEARBY_PAGE_PREFETCH_DISTANCE", 3)
+    ):
+        return
+
+    searchInfo: ResearchInfo = context.chat_data.get("research_info")
+    context.chat_data.update(
+        {
+            "next_page_future": asyncUpstreamClient().submit(
+                __fetchNextPageAsync(
+                    context.chat_data.get("next_page_token"),
+                    context.chat_data.get("next_page_issued_at"),
+                    searchInfo,
+                    context.chat_data.get("lang"),
+                    fetchResearchRadius(
+                        update.effective_chat.id, searchInfo.walkingdistance
+                    )[0],
+                    # The page is a continuation of the research: it gets the same time budget.
+                    Deadline(utils.configValue("SEARCH_DEADLINE_SECONDS", 10.0)),
                 )
             )
+        }
+    )
 
-        # The restaurant now has complete informations stored
-        restaurant.isdetailed = True
-    elif googleResult.get("status") == "ZERO_RESULTS":
-        raise NoPlaceFoundException(restaurant.name, "Place not found")
-    else:
-        raise GoogleCriticalErrorException(
-            "Google critical error; check the google key status."
+
+def __appendNextPage(
+    update: Update, context: CallbackContext, wait: bool = False
+) -> None:
+    """Appends to the list the restaurants of the next page of results, skipping the ones already present.
+
+    Args:
+        update (Update): the update being handled
+        context (CallbackContext): the context of the chat
+        wait (bool, optional): whether to wait for the page if it is still being fetched. Defaults to False.
+    """
+    future: Future = context.chat_data.get("next_page_future")
+    if future == None or (not future.done() and not wait):
+        return
+
+    try:
+        (restaurants, lazyRouting, nextPageToken) = future.result(
+            timeout=utils.configValue("NEARBY_PAGE_WAIT_SECONDS", 3.0)
+        )
+    except FutureTimeoutError:
+        # The page will be appended later.
+        return
+    except (
+        DeadlineExceededException,
+        GoogleCriticalErrorException,
+        GoogleUnavailableException,
+        NoPlaceFoundException,
+        RequestException,
+    ) as error:
+        logger.warning(f"Unable to fetch the next page of restaurants: {error}")
+        (restaurants, lazyRouting, nextPageToken) = ([], False, None)
+
+    restaurantsList: RestaurantList = context.chat_data.get("restaurants_list")
+    knownIds = {restaurant.id for restaurant in restaurantsList}
+    for restaurant in restaurants:
+        if restaurant.id not in knownIds:
+            knownIds.add(restaurant.id)
+            restaurantsList.add(restaurant)
+
+    if lazyRouting and context.chat_data.get("lazy_routing_radius") == None:
+        context.chat_data.update(
+            {
+                "lazy_routing_radius": fetchResearchRadius(
+                    update.effective_chat.id,
+                    context.chat_data.get("research_info").walkingdistance,
+                )[0]
+            }
         )
 
+    context.chat_data.pop("next_page_future")
+    context.chat_data.update(
+        {"next_page_token": nextPageToken, "next_page_issued_at": time()}
+    )
 
-def __compileRestaurantReachingParameters(
-    latOrigin: float,
-    longOrigin: float,
-    latDest: float,
-    longDest: float,
-    movementType: str,
-) -> tuple:
-    # http://127.0.0.1:5000/route/v1/{movementType}/{longDest},{latOrigin};{longDest},{latDest}?overview=false
-    key = utils.ApiKey(utils.Service.MAPBOX).value
-    OSRMResponse = get(
-        f"https://api.mapbox.com/directions/v5/{movementType}/{longOrigin},{latOrigin};{longDest},{latDest}?access_token={key}"
+
+def __prefetchDetails(context: CallbackContext) -> None:
+    """Starts fetching in the background the details of the current restaurant and of the following ones."""
+    restaurantsList: RestaurantList = context.chat_data.get("restaurants_list")
+    if context.chat_data.get("details_prefetches") == None:
+        # place id -> future of the prefetch of its details
+        context.chat_data.update({"details_prefetches": {}})
+    prefetches: dict = context.chat_data.get("details_prefetches")
+
+    for restaurant in [restaurantsList.current] + restaurantsList.neighbours(
+        utils.configValue("DETAILS_PREFETCH_LOOKAHEAD", 2)
+    ):
+        if not restaurant.isdetailed and restaurant.id not in prefetches:
+            prefetches[restaurant.id] = detailsPrefetcher().prefetch(
+                restaurant.id,
+                context.chat_data.get("lang"),
+                __compileDetailedInfosOfRestaurant,
+                restaurant,
+                context.chat_data.get("lang"),
+            )
+
+
+def __discardDetailsPrefetches(context: CallbackContext) -> None:
+    """Forgets the details prefetched for the restaurants of the current research which were never opened."""
+    if context.chat_data.get("details_prefetches") != None:
+        for prefetch in context.chat_data.pop("details_prefetches").values():
+            detailsPrefetcher().discarded(prefetch)
+
+
+def __discardNextPage(context: CallbackContext) -> None:
+    """Forgets the next page of results of the current research, if any."""
+    if context.chat_data.get("next_page_future") != None:
+        context.chat_data.pop("next_page_future").cancel()
+    if context.chat_data.get("next_page_token") != None:
+        context.chat_data.pop("next_page_token")
+    if context.chat_data.get("next_page_issued_at") != None:
+        context.chat_data.pop("next_page_issued_at")
+
+
+async def __filterWithinReachableAreaAsync(
+    researchInfo: ResearchInfo,
+    restaurants: list,
+    maxRadius: int,
+    deadline: Deadline = None,
+):
+    """Keeps the restaurants inside the area reachable from the research location within `maxRadius` meters.
+
+    The filter is applied only when `REACHABILITY_FILTER` is set to "isochrone" and the routing backend is Mapbox.
+
+    Args:
+        researchInfo (ResearchInfo): the research parameters
+        restaurants (list): the restaurants to be filtered
+        maxRadius (int): the maximum distance travelled, in meters
+        deadline (Deadline, optional): the deadline of the research, within which the area has to be computed.
+                                       Defaults to None.
+
+    Returns:
+        list | None: the reachable restaurants, or None if the filter is disabled or the area could not be computed.
+    """
+    router = routingBackend()
+    if (
+        utils.configValue("REACHABILITY_FILTER", "routes") != "isochrone"
+        or not isinstance(router, MapboxRouter)
+        or not router.available
+        or (deadline != None and deadline.expired)
+    ):
+        return None
+
+    try:
+        area = await asyncio.wait_for(
+            reachableAreaAsync(
+                (researchInfo.latitude, researchInfo.longitude),
+                TravelMode.WALKING
+                if researchInfo.walkingdistance
+                else TravelMode.DRIVING,
+                maxRadius,
+            ),
+            deadline.remaining if deadline != None else None,
+        )
+    except (RoutingErrorException, asyncio.TimeoutError):
+        return None
+
+    return [
+        restaurants[restaurantIndex]
+        for restaurantIndex in filterWithinPolygon(
+            area,
+            [(restaurant.latitude, restaurant.longitude) for restaurant in restaurants],
+        )
+    ]
+
+
+def __compileRestaurantsReachingParameters(
+    researchInfo: ResearchInfo, restaurants: list, computeMissingRoutes: bool = True
+) -> None:
+    """Sets `distance` and `reachtime` of every restaurant given, waiting for `__compileRestaurantsReachingParametersAsync`."""
+    asyncUpstreamClient().run(
+        __compileRestaurantsReachingParametersAsync(
+            researchInfo, restaurants, computeMissingRoutes
+        )
     )
-    OSRMResponse.raise_for_status()
-    OSRMResponse = loads(OSRMResponse.text)
 
-    if OSRMResponse.get("code") != "Ok":
-        return (100000, 100000)
+
+async def __compileRestaurantsReachingParametersAsync(
+    researchInfo: ResearchInfo,
+    restaurants: list,
+    computeMissingRoutes: bool = True,
+    deadline: Deadline = None,
+) -> None:
+    """Sets `distance` and `reachtime` of every restaurant given, starting from the research location. See
+    `__reachingParametersAsync`."""
+    __applyReachingParameters(
+        restaurants,
+        await __reachingParametersAsync(
+            researchInfo, restaurants, computeMissingRoutes, deadline
+        ),
+    )
+
+
+async def __reachingParametersAsync(
+    researchInfo: ResearchInfo,
+    restaurants: list,
+    computeMissingRoutes: bool = True,
+    deadline: Deadline = None,
+) -> list:
+    """Computes the reaching parameters of every restaurant given, starting from the research location. The restaurants
+    are not modified, so that the parameters can be computed while they are being displayed.
+
+    Args:
+        researchInfo (ResearchInfo): the research parameters
+        restaurants (list): the restaurants whose reaching parameters are computed
+        computeMissingRoutes (bool, optional): whether the routes which are not cached are computed through the routing
+                                               backend, or just estimated. Defaults to True.
+        deadline (Deadline, optional): the deadline of the research. The routes are computed only within its remaining
+                                       time, the other ones are estimated. Defaults to None.
+
+    Returns:
+        list: a (distance, reachtime, isrouted, reachestimated) tuple for each restaurant, in the same order, to be set
+              through `__applyReachingParameters`.
+    """
+    origin = (researchInfo.latitude, researchInfo.longitude)
+    travelMode = (
+        TravelMode.WALKING if researchInfo.walkingdistance else TravelMode.DRIVING
+    )
+
+    # Only the routes which are neither precomputed in the grid nor cached yet are actually computed. The grid and the
+    # cache are read on a thread, so that their files do not block the event loop.
+    routes: dict = await asyncio.to_thread(
+        travelTimeGrid().get,
+        origin,
+        [restaurant.id for restaurant in restaurants],
+        travelMode,
+    )
+    routes.update(
+        await asyncio.to_thread(
+            routeCache().get,
+            origin,
+            [restaurant.id for restaurant in restaurants if restaurant.id not in routes],
+            travelMode,
+            deadline,
+        )
+    )
+    restaurantsToRoute = [
+        restaurant for restaurant in restaurants if restaurant.id not in routes
+    ]
+
+    # Routes not computed within the research budget, or whose computation failed, are returned as None.
+    router = routingBackend()
+    routingBudget = utils.configValue("ROUTING_DEADLINE_SECONDS", 3.0)
+    if (
+        computeMissingRoutes
+        and not router.estimated
+        and router.available
+        and len(restaurantsToRoute) > 0
+        and (deadline == None or not deadline.expired)
+    ):
+        computedRoutes = await routingExecutor().routeManyAsync(
+            router,
+            origin,
+            [
+                (restaurant.latitude, restaurant.longitude)
+                for restaurant in restaurantsToRoute
+            ],
+            travelMode,
+            deadline.budget(routingBudget) if deadline != None else routingBudget,
+        )
     else:
-        return (
-            OSRMResponse.get("routes")[0].get("distance"),
-            OSRMResponse.get("routes")[0].get("duration"),
+        computedRoutes = [None] * len(restaurantsToRoute)
+
+    newRoutes = {
+        restaurant.id: route
+        for restaurant, route in zip(restaurantsToRoute, computedRoutes)
+        if route != None
+    }
+    await asyncio.to_thread(routeCache().put, origin, newRoutes, travelMode)
+    routes.update(newRoutes)
+
+    # The restaurants without a route (routing disabled, backend failing, budget expired) get a local estimate.
+    # Once their routing has been attempted, they keep the estimate rather than being sent to the backend again.
+    estimateRouter = EstimateRouter()
+    reachingParameters = []
+    for restaurant in restaurants:
+        if restaurant.id in routes:
+            reachingParameters.append((*routes.get(restaurant.id), True, False))
+        elif not restaurant.isrouted:
+            reachingParameters.append(
+                (
+                    *estimateRouter.route(
+                        origin, (restaurant.latitude, restaurant.longitude), travelMode
+                    ),
+                    computeMissingRoutes,
+                    True,
+                )
+            )
+        else:
+            reachingParameters.append(
+                (
+                    restaurant.distance,
+                    restaurant.reachtime,
+                    restaurant.isrouted,
+                    restaurant.reachestimated,
+                )
+            )
+
+    return reachingParameters
+
+
+def __applyReachingParameters(restaurants: list, reachingParameters: list) -> None:
+    """Sets the reaching parameters computed by `__reachingParametersAsync` on the restaurants they belong to."""
+    for restaurant, (distance, reachtime, isrouted, reachestimated) in zip(
+        restaurants, reachingParameters
+    ):
+        restaurant.distance = distance
+        restaurant.reachtime = reachtime
+        restaurant.isrouted = isrouted
+        restaurant.reachestimated = reachestimated
+
+
+def __routeAroundCurrentRestaurant(
+    context: CallbackContext, backwards: bool = False
+) -> None:
+    """Lazy routing: routes the current restaurant and the ones which will be displayed next.
+
+    The current restaurant and the next `ROUTING_LOOKAHEAD` ones are routed synchronously if the current one has not been
+    routed yet. While the current restaurant turns out to be out of range it is dropped from the list and the cursor moves on.
+    Finally the next restaurants which are not routed yet are routed in background: their routes are set by the
+    following updates of the chat (see `__applyBackgroundRouting`), never by the background job itself.
+    """
+    listOfRestaurants: RestaurantList = context.chat_data.get("restaurants_list")
+    researchInfo: ResearchInfo = context.chat_data.get("research_info")
+    maxRadius = context.chat_data.get("lazy_routing_radius")
+    lookahead = utils.configValue("ROUTING_LOOKAHEAD", 3)
+
+    __applyBackgroundRouting(context, listOfRestaurants.current)
+
+    while listOfRestaurants.size > 0:
+        if not listOfRestaurants.current.isrouted:
+            __compileRestaurantsReachingParameters(
+                researchInfo,
+                [listOfRestaurants.current]
+                + [
+                    restaurant
+                    for restaurant in listOfRestaurants.neighbours(lookahead, backwards)
+                    if not restaurant.isrouted
+                ],
+            )
+
+        if (
+            not listOfRestaurants.current.reachestimated
+            and listOfRestaurants.current.distance > maxRadius
+        ):
+            # Removing the current restaurant moves the cursor to its next one.
+            listOfRestaurants.remove()
+            if backwards and listOfRestaurants.size > 0:
+                listOfRestaurants.setCurrentElementWithHisPrev()
+        else:
+            break
+
+    restaurantsToRoute = [
+        restaurant
+        for restaurant in listOfRestaurants.neighbours(lookahead, backwards)
+        if not restaurant.isrouted
+    ]
+    if (
+        len(restaurantsToRoute) > 0
+        and context.chat_data.get("background_routing") == None
+    ):
+        context.chat_data.update(
+            {
+                "background_routing": (
+                    restaurantsToRoute,
+                    asyncUpstreamClient().submit(
+                        __reachingParametersAsync(researchInfo, restaurantsToRoute)
+                    ),
+                )
+            }
+        )
+
+
+def __applyBackgroundRouting(
+    context: CallbackContext, currentRestaurant: Restaurant = None
+) -> None:
+    """Sets the reaching parameters computed in background by `__routeAroundCurrentRestaurant`, if they are ready.
+
+    Args:
+        context (CallbackContext): the context of the chat
+        currentRestaurant (Restaurant, optional): the restaurant about to be displayed: if it is being routed in
+                                                  background, its routes are waited for. Defaults to None.
+    """
+    if context.chat_data.get("background_routing") == None:
+        return
+
+    (restaurants, future) = context.chat_data.get("background_routing")
+    if not future.done() and not any(
+        restaurant is currentRestaurant for restaurant in restaurants
+    ):
+        return
+
+    try:
+        reachingParameters = future.result(
+            timeout=utils.configValue("ROUTING_DEADLINE_SECONDS", 3.0)
         )
+    except FutureTimeoutError:
+        # The restaurant about to be displayed is routed again synchronously.
+        return
+    except Exception as error:
+        logger.warning(f"Unable to route the restaurants in background: {error}")
+        reachingParameters = []
+
+    context.chat_data.pop("background_routing")
+    for restaurant, parameters in zip(restaurants, reachingParameters):
+        # The restaurants routed synchronously in the meantime keep their routes.
+        if not restaurant.isrouted:
+            __applyReachingParameters([restaurant], [parameters])
+
+
+def __discardBackgroundRouting(context: CallbackContext) -> None:
+    """Forgets the restaurants of the current research being routed in background, if any."""
+    if context.chat_data.get("background_routing") != None:
+        context.chat_data.pop("background_routing")[1].cancel()
@@ -0,0 +1,182 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+"""Offline job precomputing the travel time grid of the hot areas (see `routing.TravelTimeGrid`).
+
+The hot areas are read from `TRAVEL_TIME_GRID_AREAS`. For every grid cell of an area and every travel mode, the
+restaurants stored in the `place_location` table within `TRAVEL_TIME_GRID_{MODE}_RADIUS` meters from the centre of the
+cell are routed through the configured routing backend. A cell is recomputed only if its restaurants changed since the
+last run.
+
+Usage (from the src folder):
+    python build_travel_time_grid.py
+"""
+
+from hashlib import sha1
+from os import makedirs
+import logging
+
+from custom_exceptions import RoutingErrorException
+from data import fetchPlacesInArea, setupTables
+from routing import TravelMode, TravelTimeGrid, routingBackend
+from utils.config import configValue
+from utils.geo import boundingBox, filterWithinRadius
+
+logging.basicConfig(
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    level=logging.INFO,
+)
+logger = logging.getLogger(__name__)
+
+
+def hotAreas() -> list:
+    """Parses `TRAVEL_TIME_GRID_AREAS`, a `;` separated list of `latitude,longitude,radius in meters` areas.
+
+    Returns:
+        list: a (latitude, longitude, radius) tuple for each area
+    """
+    return [
+        tuple(float(value) for value in area.split(","))
+        for area in configValue("TRAVEL_TIME_GRID_AREAS", "").split(";")
+        if area.strip() != ""
+    ]
+
+
+def areaCells(grid: TravelTimeGrid, area: tuple) -> set:
+    """Returns the (row, column) of the grid cells whose centre falls inside the given area."""
+    minLatitude, maxLatitude, minLongitude, maxLongitude = boundingBox(
+        area[:2], area[2]
+    )
+    minRow, minColumn = grid.cell((minLatitude, minLongitude))
+    maxRow, maxColumn = grid.cell((maxLatitude, maxLongitude))
+    cells = [
+        (row, column)
+        for row in range(minRow, maxRow + 1)
+        for column in range(minColumn, maxColumn + 1)
+    ]
+
+    return {
+        cells[cellIndex]
+        for cellIndex in filterWithinRadius(
+            area[:2], [grid.cellCentre(cell) for cell in cells], area[2]
+        )
+    }
+
+
+def cellPlaces(grid: TravelTimeGrid, cell: tuple, radius: float) -> list:
+    """Returns the known places within `radius` meters from the centre of the cell, as (place_id, latitude, longitude)."""
+    centre = grid.cellCentre(cell)
+    places = fetchPlacesInArea(*boundingBox(centre, radius))
+
+    return [
+        places[placeIndex]
+        for placeIndex in filterWithinRadius(
+            centre,
+            [(latitude, longitude) for (_, latitude, longitude) in places],
+            radius,
+        )
+    ]
+
+
+def placesFingerprint(places: list) -> str:
+    """Returns a digest of the ids and the positions of the places given."""
+    return sha1(
+        ";".join(
+            f"{placeId},{latitude},{longitude}"
+            for (placeId, latitude, longitude) in places
+        ).encode()
+    ).hexdigest()
+
+
+def buildTravelTimeGrid() -> None:
+    """Computes the routes of the cells whose restaurants changed, and removes the cells no longer in the hot areas."""
+    router = routingBackend()
+    if router.estimated:
+        logger.error(
+            "The travel time grid needs a routing backend computing the actual routes."
+        )
+        return
+
+    directory = configValue("TRAVEL_TIME_GRID_DIR", "travel_time_grid")
+    makedirs(directory, exist_ok=True)
+    cellSize = configValue("TRAVEL_TIME_GRID_CELL_DEGREES", 0.0025)
+    grid = TravelTimeGrid(directory, cellSize)
+    # The grid may have been built with another cell size, in which case every cell is recomputed.
+    if grid.cellsize != cellSize:
+        grid.clear(cellSize)
+
+    cells = set()
+    for area in hotAreas():
+        cells.update(areaCells(grid, area))
+
+    coveredCellKeys = set()
+    computedCells, failedCells = (0, 0)
+    for travelMode in TravelMode:
+        radius = configValue(
+            f"TRAVEL_TIME_GRID_{travelMode.name}_RADIUS",
+            2000 if travelMode == TravelMode.WALKING else 10000,
+        )
+        for cell in cells:
+            places = cellPlaces(grid, cell, radius)
+            if len(places) == 0:
+                continue
+
+            fingerprint = placesFingerprint(places)
+            coveredCellKeys.add(grid.cellKey(cell, travelMode))
+            if grid.fingerprint(cell, travelMode) == fingerprint:
+                continue
+
+            try:
+                routes = router.routeMany(
+                    grid.cellCentre(cell),
+                    [(latitude, longitude) for (_, latitude, longitude) in places],
+                    travelMode,
+                )
+            except RoutingErrorException as error:
+                # The previous routes of the cell, if any, are kept until the next run.
+                logger.warning(
+                    f"Unable to route the cell {cell} ({travelMode.name}): {error}"
+                )
+                failedCells += 1
+                continue
+
+            grid.store(
+                cell,
+                travelMode,
+                fingerprint,
+                [
+                    (placeId, distance, duration)
+                    for ((placeId, _, _), (distance, duration)) in zip(places, routes)
+                ],
+            )
+            computedCells += 1
+
+    grid.save(coveredCellKeys)
+    logger.info(
+        f"Travel time grid updated: {len(coveredCellKeys)} cells covered, {computedCells} recomputed, {failedCells} failed."
+    )
+
+
+if __name__ == "__main__":
+    setupTables()
+    buildTravelTimeGrid()
@@ -57,3 +57,33 @@ class GoogleCriticalErrorException(Exception):
 
     def __str__(self):
         return f"{self.message}"
+
+
+class GoogleUnavailableException(GoogleCriticalErrorException):
+    """Raised when google is temporarily unavailable: its requests keep failing, or they are not sent at all because of
+    too many recent failures or because of the rate limit."""
+
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class RoutingErrorException(Exception):
+    """Raised when the routing service is not able to compute a route due to internal problems or because it is unavailable."""
+
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return f"{self.message}"
+
+
+class DeadlineExceededException(Exception):
+    """Raised when the time available to answer the user runs out before a result is available."""
+
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return f"{self.message}"
@@ -5,12 +5,40 @@ from .db_fetch_infos import (
     fetchCategories,
     fetchFavoriteListContent,
     fetchResearchRadius,
+    fetchCachedRoutes,
+    fetchPlacesInArea,
+    fetchCachedGeocoding,
+    fetchPlaceDetails,
+    fetchApiKeyUsage,
+    fetchCatalogPlaces,
+    fetchTileCoverage,
 )
 from .db_insert_infos import (
     insertChat,
     insertList,
     insertRestaurantInfos,
     insertRestaurantIntoList,
+    insertCachedRoutes,
+    insertPlaceLocations,
+    insertCachedGeocoding,
+    insertPlaceDetails,
+    insertCatalogPlaces,
+    insertTileCoverage,
+)
+from .db_remove_infos import (
+    removeRestaurantFromListDb,
+    removeFavoriteListFromDb,
+    removeStaleCachedRoutes,
+    removeStaleCachedGeocodings,
+    removeStalePlaceDetails,
+    removeStaleApiKeyUsage,
+    removePlaceTags,
+    removeStaleCatalog,
+)
+from .db_update_infos import (
+    updateLang,
+    updateMaxWalkingDistance,
+    updateMaxCarDistance,
+    updateCachedRoutesUsage,
+    updateApiKeysUsage,
 )
-from .db_remove_infos import removeRestaurantFromListDb, removeFavoriteListFromDb
-from .db_update_infos import updateLang, updateMaxWalkingDistance, updateMaxCarDistance
@@ -23,6 +23,7 @@
 
 from data import dbConnect
 import utils
+from utils.deadline import Deadline
 from utils.restaurant import Restaurant, RestaurantList
 
 
@@ -44,17 +45,20 @@ def fetchLang(chatId: str) -> str:
     return result
 
 
-def fetchResearchRadius(chatId: str, reachableByFoot: bool) -> tuple:
+def fetchResearchRadius(
+    chatId: str, reachableByFoot: bool, deadline: Deadline = None
+) -> tuple:
     """Given a chat id and a distance type, returns the user distance preference.
 
     Args:
         chatId (str) - the chat_id of which the language is required
         reachableByFoot (bool) - true if the preferred_distance_on_foot param has to be fetched, otherwise false if the user wants to fetch preferred_distance_by_car
+        deadline (Deadline, optional) - the deadline bounding the wait for the database
 
     Returns:
         int - the user preference in terms of distance from the restaurant
     """
-    connection = dbConnect()
+    connection = dbConnect(deadline)
     if reachableByFoot:
         result = (
             connection.cursor()
@@ -163,3 +167,237 @@ def fetchFavoriteListContent(listId: int) -> RestaurantList:
         result.add(restaurantToAdd)
 
     return result
+
+
+def fetchCachedRoutes(
+    originCell: str,
+    profile: str,
+    placeIds: list,
+    minFetchedAt: float,
+    deadline: Deadline = None,
+) -> list:
+    """Given an origin cell and a travel profile, it returns the cached routes towards the places given which are not expired.
+
+    Args:
+        originCell (str): the grid cell of the starting position
+        profile (str): the travel profile of the routes (e.g. mapbox/walking)
+        placeIds (list): the place ids of the destinations
+        minFetchedAt (float): the routes fetched before this timestamp are considered expired
+        deadline (Deadline, optional): the deadline bounding the wait for the database. Defaults to None.
+
+    Returns:
+        list: a (place_id, distance, duration) tuple for each route found
+    """
+    if len(placeIds) == 0:
+        return []
+
+    connection = dbConnect(deadline)
+    result = (
+        connection.cursor()
+        .execute(
+            f"""SELECT place_id, distance, duration FROM route_cache
+               WHERE origin_cell = ? AND profile = ? AND fetched_at >= ? AND place_id IN ({", ".join("?" * len(placeIds))})""",
+            (originCell, profile, minFetchedAt, *placeIds),
+        )
+        .fetchall()
+    )
+    connection.close()
+
+    return result
+
+
+def fetchPlacesInArea(
+    minLatitude: float, maxLatitude: float, minLongitude: float, maxLongitude: float
+) -> list:
+    """Returns the known places whose position falls inside the given bounding box.
+
+    Args:
+        minLatitude (float): southern boundary of the box
+        maxLatitude (float): northern boundary of the box
+        minLongitude (float): western boundary of the box
+        maxLongitude (float): eastern boundary of the box
+
+    Returns:
+        list: a (place_id, latitude, longitude) tuple for each place found, sorted by place_id
+    """
+    connection = dbConnect()
+    result = (
+        connection.cursor()
+        .execute(
+            """SELECT place_id, latitude, longitude FROM place_location
+               WHERE latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?
+               ORDER BY place_id""",
+            (minLatitude, maxLatitude, minLongitude, maxLongitude),
+        )
+        .fetchall()
+    )
+    connection.close()
+
+    return result
+
+
+def fetchCachedGeocoding(query: str, deadline: Deadline = None) -> tuple:
+    """Given a normalized location name, it returns the location cached for it.
+
+    Args:
+        query (str): the normalized location name
+        deadline (Deadline, optional): the deadline bounding the wait for the database. Defaults to None.
+
+    Returns:
+        tuple: (name, latitude, longitude, fetched_at), with name, latitude and longitude set to None if no location
+               matched the query. None if the query is not cached.
+    """
+    connection = dbConnect(deadline)
+    result = (
+        connection.cursor()
+        .execute(
+            "SELECT name, latitude, longitude, fetched_at FROM geocoding_cache WHERE query = ?",
+            (query,),
+        )
+        .fetchone()
+    )
+    connection.close()
+
+    return result
+
+
+def fetchPlaceDetails(placeId: str, lang: str, deadline: Deadline = None) -> tuple:
+    """Given a place id and a language, it returns the details stored for that place.
+
+    Args:
+        placeId (str): the place id provided by google
+        lang (str): the language of the details
+        deadline (Deadline, optional): the deadline bounding the wait for the database. Defaults to None.
+
+    Returns:
+        tuple: (address, phone_number, website, maps_link, timetable, reviews, fetched_at), where timetable and reviews
+               are JSON encoded lists. None if no details are stored.
+    """
+    connection = dbConnect(deadline)
+    result = (
+        connection.cursor()
+        .execute(
+            """SELECT address, phone_number, website, maps_link, timetable, reviews, fetched_at FROM place_details
+               WHERE place_id = ? AND lang = ?""",
+            (placeId, lang),
+        )
+        .fetchone()
+    )
+    connection.close()
+
+    return result
+
+
+def fetchApiKeyUsage(service: str, day: str) -> list:
+    """Given a service and a day, it returns the usage of each API key of the service in that day.
+
+    Args:
+        service (str): the name of the service (e.g. `GOOGLE_PLACES`)
+        day (str): the ISO formatted UTC day
+
+    Returns:
+        list: a (key_hash, requests, benched_until) tuple for each key used in that day
+    """
+    connection = dbConnect()
+    result = (
+        connection.cursor()
+        .execute(
+            "SELECT key_hash, requests, benched_until FROM api_key_usage WHERE service = ? AND day = ?",
+            (service, day),
+        )
+        .fetchall()
+    )
+    connection.close()
+
+    return result
+
+
+def fetchCatalogPlaces(
+    keyword: str,
+    maxPrice: int,
+    lang: str,
+    minLatitude: float,
+    maxLatitude: float,
+    minLongitude: float,
+    maxLongitude: float,
+    deadline: Deadline = None,
+) -> list:
+    """Returns the catalog restaurants inside the given bounding box which were returned by the given research.
+
+    Args:
+        keyword (str): the canonical keyword of the research
+        maxPrice (int): the maximum price level of the research
+        lang (str): the language of the research
+        minLatitude (float): southern boundary of the box
+        maxLatitude (float): northern boundary of the box
+        minLongitude (float): western boundary of the box
+        maxLongitude (float): eastern boundary of the box
+        deadline (Deadline, optional): the deadline bounding the wait for the database. Defaults to None.
+
+    Returns:
+        list: a (place_id, name, latitude, longitude, price_level, rating, user_ratings_total) tuple for each restaurant
+    """
+    connection = dbConnect(deadline)
+    result = (
+        connection.cursor()
+        .execute(
+            """SELECT catalog_place.place_id, name, latitude, longitude, price_level, rating, user_ratings_total
+               FROM catalog_place JOIN place_tag ON catalog_place.place_id = place_tag.place_id
+               WHERE keyword = ? AND max_price = ? AND lang = ?
+               AND latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?""",
+            (
+                keyword,
+                maxPrice,
+                lang,
+                minLatitude,
+                maxLatitude,
+                minLongitude,
+                maxLongitude,
+            ),
+        )
+        .fetchall()
+    )
+    connection.close()
+
+    return result
+
+
+def fetchTileCoverage(
+    keyword: str,
+    maxPrice: int,
+    lang: str,
+    minRow: int,
+    maxRow: int,
+    minColumn: int,
+    maxColumn: int,
+    deadline: Deadline = None,
+) -> list:
+    """Returns when the tiles in the given range have been completely researched with the given parameters.
+
+    Args:
+        keyword (str): the canonical keyword of the research
+        maxPrice (int): the maximum price level of the research
+        lang (str): the language of the research
+        minRow (int): the first row of the range
+        maxRow (int): the last row of the range
+        minColumn (int): the first column of the range
+        maxColumn (int): the last column of the range
+        deadline (Deadline, optional): the deadline bounding the wait for the database. Defaults to None.
+
+    Returns:
+        list: a (tile_row, tile_column, fetched_at) tuple for each tile researched
+    """
+    connection = dbConnect(deadline)
+    result = (
+        connection.cursor()
+        .execute(
+            """SELECT tile_row, tile_column, fetched_at FROM tile_coverage
+               WHERE keyword = ? AND max_price = ? AND lang = ?
+               AND tile_row BETWEEN ? AND ? AND tile_column BETWEEN ? AND ?""",
+            (keyword, maxPrice, lang, minRow, maxRow, minColumn, maxColumn),
+        )
+        .fetchall()
+    )
+    connection.close()
+
+    return result
@@ -118,3 +118,165 @@ def insertRestaurantIntoList(listId: int, restaurantId: str) -> None:
     )
     connection.commit()
     connection.close()
+
+
+def insertCachedRoutes(
+    originCell: str, profile: str, routes: list, fetchedAt: float
+) -> None:
+    """Stores the routes computed from an origin cell, replacing the old ones if present.
+
+    Args:
+        originCell (str): the grid cell of the starting position
+        profile (str): the travel profile of the routes (e.g. mapbox/walking)
+        routes (list): a (place_id, distance, duration) tuple for each route
+        fetchedAt (float): the timestamp of the computation
+    """
+    connection = dbConnect()
+    cursor = connection.cursor()
+    cursor.executemany(
+        "INSERT OR REPLACE INTO route_cache VALUES(?, ?, ?, ?, ?, ?, ?)",
+        [
+            (originCell, placeId, profile, distance, duration, fetchedAt, fetchedAt)
+            for (placeId, distance, duration) in routes
+        ],
+    )
+    connection.commit()
+    connection.close()
+
+
+def insertPlaceLocations(places: list, updatedAt: float) -> None:
+    """Stores the position of the places given. The update timestamp of a known place changes only if it moved.
+
+    Args:
+        places (list): a (place_id, latitude, longitude) tuple for each place
+        updatedAt (float): the timestamp of the update
+    """
+    connection = dbConnect()
+    cursor = connection.cursor()
+    cursor.executemany(
+        """INSERT INTO place_location VALUES(?, ?, ?, ?)
+           ON CONFLICT (place_id) DO UPDATE SET latitude = excluded.latitude, longitude = excluded.longitude, updated_at = excluded.updated_at
+           WHERE latitude != excluded.latitude OR longitude != excluded.longitude""",
+        [
+            (placeId, latitude, longitude, updatedAt)
+            for (placeId, latitude, longitude) in places
+        ],
+    )
+    connection.commit()
+    connection.close()
+
+
+def insertCachedGeocoding(
+    query: str, name: str, latitude: float, longitude: float, fetchedAt: float
+) -> None:
+    """Stores the location found for a normalized location name, replacing the old one if present.
+
+    Args:
+        query (str): the normalized location name
+        name (str): the name of the location found, None if no location matched the query
+        latitude (float): the latitude of the location found, None if no location matched the query
+        longitude (float): the longitude of the location found, None if no location matched the query
+        fetchedAt (float): the timestamp of the lookup
+    """
+    connection = dbConnect()
+    cursor = connection.cursor()
+    cursor.execute(
+        "INSERT OR REPLACE INTO geocoding_cache VALUES(?, ?, ?, ?, ?)",
+        (query, name, latitude, longitude, fetchedAt),
+    )
+    connection.commit()
+    connection.close()
+
+
+def insertPlaceDetails(
+    placeId: str,
+    lang: str,
+    address: str,
+    phoneNumber: str,
+    website: str,
+    mapsLink: str,
+    timetable: str,
+    reviews: str,
+    fetchedAt: float,
+) -> None:
+    """Stores the details fetched for a place, replacing the old ones if present.
+
+    Args:
+        placeId (str): the place id provided by google
+        lang (str): the language of the details
+        address (str): the address of the place
+        phoneNumber (str): the phone number of the place
+        website (str): the website of the place
+        mapsLink (str): the google maps url of the place
+        timetable (str): the JSON encoded list of the opening hours of each day of the week, None if not provided
+        reviews (str): the JSON encoded list of the reviews
+        fetchedAt (float): the timestamp of the fetch
+    """
+    connection = dbConnect()
+    cursor = connection.cursor()
+    cursor.execute(
+        "INSERT OR REPLACE INTO place_details VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            placeId,
+            lang,
+            address,
+            phoneNumber,
+            website,
+            mapsLink,
+            timetable,
+            reviews,
+            fetchedAt,
+        ),
+    )
+    connection.commit()
+    connection.close()
+
+
+def insertCatalogPlaces(
+    places: list, keyword: str, maxPrice: int, lang: str, updatedAt: float
+) -> None:
+    """Stores the restaurants returned by a research in the catalog, replacing the old infos, and tags them with the
+    research.
+
+    Args:
+        places (list): a (place_id, name, latitude, longitude, price_level, rating, user_ratings_total, types) tuple for
+                       each restaurant, with the types JSON encoded
+        keyword (str): the canonical keyword of the research
+        maxPrice (int): the maximum price level of the research
+        lang (str): the language of the research
+        updatedAt (float): the timestamp of the research
+    """
+    connection = dbConnect()
+    cursor = connection.cursor()
+    cursor.executemany(
+        "INSERT OR REPLACE INTO catalog_place VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [place + (updatedAt,) for place in places],
+    )
+    cursor.executemany(
+        "INSERT OR REPLACE INTO place_tag VALUES(?, ?, ?, ?, ?)",
+        [(keyword, maxPrice, lang, place[0], updatedAt) for place in places],
+    )
+    connection.commit()
+    connection.close()
+
+
+def insertTileCoverage(
+    tiles: list, keyword: str, maxPrice: int, lang: str, fetchedAt: float
+) -> None:
+    """Marks the tiles given as completely researched with the given parameters.
+
+    Args:
+        tiles (list): the (row, column) of each tile
+        keyword (str): the canonical keyword of the research
+        maxPrice (int): the maximum price level of the research
+        lang (str): the language of the research
+        fetchedAt (float): the timestamp of the research
+    """
+    connection = dbConnect()
+    cursor = connection.cursor()
+    cursor.executemany(
+        "INSERT OR REPLACE INTO tile_coverage VALUES(?, ?, ?, ?, ?, ?)",
+        [(keyword, maxPrice, lang, row, column, fetchedAt) for (row, column) in tiles],
+    )
+    connection.commit()
+    connection.close()
@@ -57,3 +57,117 @@ def removeFavoriteListFromDb(listId: int) -> None:
     )
     connection.commit()
     connection.close()
+
+
+def removeStaleCachedRoutes(minFetchedAt: float, maxEntries: int) -> None:
+    """Removes the expired cached routes and, if there are still more than `maxEntries` routes, the least recently used ones.
+
+    Args:
+        minFetchedAt (float): the routes fetched before this timestamp are removed
+        maxEntries (int): the maximum number of routes kept in the cache
+    """
+    connection = dbConnect()
+    cursor = connection.cursor()
+    cursor.execute(
+        """DELETE FROM route_cache
+           WHERE fetched_at < ?""",
+        (minFetchedAt,),
+    )
+    cursor.execute(
+        """DELETE FROM route_cache
+           WHERE rowid IN (SELECT rowid FROM route_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)""",
+        (maxEntries,),
+    )
+    connection.commit()
+    connection.close()
+
+
+def removeStaleCachedGeocodings(
+    minFetchedAt: float, minNotFoundFetchedAt: float
+) -> None:
+    """Removes the expired cached locations.
+
+    Args:
+        minFetchedAt (float): the locations found before this timestamp are removed
+        minNotFoundFetchedAt (float): the queries without a location looked up before this timestamp are removed
+    """
+    connection = dbConnect()
+    cursor = connection.cursor()
+    cursor.execute(
+        """DELETE FROM geocoding_cache
+           WHERE (name IS NOT NULL AND fetched_at < ?) OR (name IS NULL AND fetched_at < ?)""",
+        (minFetchedAt, minNotFoundFetchedAt),
+    )
+    connection.commit()
+    connection.close()
+
+
+def removeStalePlaceDetails(minFetchedAt: float) -> None:
+    """Removes the place details fetched before the given timestamp.
+
+    Args:
+        minFetchedAt (float): the details fetched before this timestamp are removed
+    """
+    connection = dbConnect()
+    cursor = connection.cursor()
+    cursor.execute(
+        "DELETE FROM place_details WHERE fetched_at < ?",
+        (minFetchedAt,),
+    )
+    connection.commit()
+    connection.close()
+
+
+def removeStaleApiKeyUsage(minDay: str) -> None:
+    """Removes the usage of the API keys in the days before the given one.
+
+    Args:
+        minDay (str): the ISO formatted UTC day before which the usage is removed
+    """
+    connection = dbConnect()
+    cursor = connection.cursor()
+    cursor.execute(
+        "DELETE FROM api_key_usage WHERE day < ?",
+        (minDay,),
+    )
+    connection.commit()
+    connection.close()
+
+
+def removePlaceTags(placeIds: list, keyword: str, maxPrice: int, lang: str) -> None:
+    """Removes the tag of a research from the given catalog restaurants, since the research does not return them anymore.
+
+    Args:
+        placeIds (list): the place ids of the restaurants
+        keyword (str): the canonical keyword of the research
+        maxPrice (int): the maximum price level of the research
+        lang (str): the language of the research
+    """
+    connection = dbConnect()
+    cursor = connection.cursor()
+    cursor.executemany(
+        "DELETE FROM place_tag WHERE keyword = ? AND max_price = ? AND lang = ? AND place_id = ?",
+        [(keyword, maxPrice, lang, placeId) for placeId in placeIds],
+    )
+    connection.commit()
+    connection.close()
+
+
+def removeStaleCatalog(minFetchedAt: float) -> None:
+    """Removes the tile coverage and the tags older than the given timestamp, and the catalog restaurants which are
+    neither tagged nor updated since then.
+
+    Args:
+        minFetchedAt (float): the catalog entries older than this timestamp are removed
+    """
+    connection = dbConnect()
+    cursor = connection.cursor()
+    cursor.execute("DELETE FROM tile_coverage WHERE fetched_at < ?", (minFetchedAt,))
+    cursor.execute("DELETE FROM place_tag WHERE tagged_at < ?", (minFetchedAt,))
+    cursor.execute(
+        """DELETE FROM catalog_place
+           WHERE updated_at < ? AND place_id NOT IN (SELECT place_id FROM place_tag)""",
+        (minFetchedAt,),
+    )
+    connection.commit()
+    connection.close()
@@ -30,6 +30,14 @@ def setupTables() -> None:
     """
     Create the database's tables if they haven't been created yet.
     The DB is composed by 4 tables: `chat`, `list`, `restaurant`, `restaurant_for_list`.
+    The `route_cache` table stores the routes already computed to reach the restaurants.
+    The `place_location` table stores the position of the restaurants found by the researches.
+    The `geocoding_cache` table stores the locations found for the names typed by the users.
+    The `place_details` table stores the details fetched for the restaurants, in each language.
+    The `api_key_usage` table stores, for each day, the requests sent with every API key of a pool and its cooldowns.
+    The `catalog_place` table stores the restaurants returned by the researches, and the `place_tag` table the researches
+    (keyword, maximum price, language) which returned them. The `tile_coverage` table stores when every tile of the map
+    has been completely researched, for each keyword, maximum price and language.
     """
     connection = dbConnect()
     cursor = connection.cursor()
@@ -71,6 +79,94 @@ def setupTables() -> None:
             FOREIGN KEY (list_id) REFERENCES list (list_id) ON DELETE CASCADE ON UPDATE CASCADE,
             FOREIGN KEY (restaurant_id) REFERENCES restaurant (restaurant_id) ON DELETE CASCADE ON UPDATE CASCADE)"""
     )
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS route_cache (
+            origin_cell TEXT,
+            place_id TEXT,
+            profile TEXT,
+            distance REAL NOT NULL,
+            duration REAL NOT NULL,
+            fetched_at REAL NOT NULL,
+            last_used_at REAL NOT NULL,
+            PRIMARY KEY(origin_cell, place_id, profile))"""
+    )
+    cursor.execute(
+        """CREATE INDEX IF NOT EXISTS route_cache_last_used_at ON route_cache (last_used_at)"""
+    )
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS place_location (
+            place_id TEXT PRIMARY KEY,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            updated_at REAL NOT NULL)"""
+    )
+    cursor.execute(
+        """CREATE INDEX IF NOT EXISTS place_location_position ON place_location (latitude, longitude)"""
+    )
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS geocoding_cache (
+            query TEXT PRIMARY KEY,
+            name TEXT,
+            latitude REAL,
+            longitude REAL,
+            fetched_at REAL NOT NULL)"""
+    )
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS place_details (
+            place_id TEXT,
+            lang TEXT,
+            address TEXT,
+            phone_number TEXT,
+            website TEXT,
+            maps_link TEXT,
+            timetable TEXT,
+            reviews TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            PRIMARY KEY(place_id, lang))"""
+    )
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS api_key_usage (
+            service TEXT,
+            key_hash TEXT,
+            day TEXT,
+            requests INTEGER NOT NULL,
+            benched_until REAL NOT NULL,
+            PRIMARY KEY(service, key_hash, day))"""
+    )
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS catalog_place (
+            place_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            price_level INTEGER,
+            rating REAL,
+            user_ratings_total INTEGER,
+            types TEXT,
+            updated_at REAL NOT NULL)"""
+    )
+    cursor.execute(
+        """CREATE INDEX IF NOT EXISTS catalog_place_position ON catalog_place (latitude, longitude)"""
+    )
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS place_tag (
+            keyword TEXT,
+            max_price INTEGER,
+            lang TEXT,
+            place_id TEXT,
+            tagged_at REAL NOT NULL,
+            PRIMARY KEY(keyword, max_price, lang, place_id))"""
+    )
+    cursor.execute(
+        """CREATE TABLE IF NOT EXISTS tile_coverage (
+            keyword TEXT,
+            max_price INTEGER,
+            lang TEXT,
+            tile_row INTEGER,
+            tile_column INTEGER,
+            fetched_at REAL NOT NULL,
+            PRIMARY KEY(keyword, max_price, lang, tile_row, tile_column))"""
+    )
 
     connection.commit()
     connection.close()
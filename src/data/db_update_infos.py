@@ -22,6 +22,7 @@
 ####################################################################################
 
 from data import dbConnect
+from utils.deadline import Deadline
 
 
 def updateLang(chatId: str, newLang: str) -> None:
@@ -70,3 +71,54 @@ def updateMaxCarDistance(chatId: str, newDistanceInMeters: int) -> None:
 
     connection.commit()
     connection.close()
+
+
+def updateCachedRoutesUsage(
+    originCell: str,
+    profile: str,
+    placeIds: list,
+    usedAt: float,
+    deadline: Deadline = None,
+) -> None:
+    """Marks the cached routes from an origin cell towards the places given as used at `usedAt`. With a deadline, the
+    wait for the database is bounded by its remaining time."""
+    connection = dbConnect(deadline)
+    cursor = connection.cursor()
+    cursor.executemany(
+        """
+        UPDATE route_cache
+        SET last_used_at = ?
+        WHERE origin_cell = ? AND place_id = ? AND profile = ?
+    """,
+        [(usedAt, originCell, placeId, profile) for placeId in placeIds],
+    )
+
+    connection.commit()
+    connection.close()
+
+
+def updateApiKeysUsage(service: str, day: str, usages: list) -> None:
+    """Adds the requests sent with some API keys of a service to their usage of the given day.
+
+    Args:
+        service (str): the name of the service (e.g. `GOOGLE_PLACES`)
+        day (str): the ISO formatted UTC day
+        usages (list): a (key_hash, requests, benched_until) tuple for each key. The requests are added to the stored
+                       ones, while the latest of the two cooldowns is kept.
+    """
+    connection = dbConnect()
+    cursor = connection.cursor()
+    cursor.executemany(
+        """
+        INSERT INTO api_key_usage VALUES(?, ?, ?, ?, ?)
+        ON CONFLICT(service, key_hash, day) DO UPDATE
+        SET requests = requests + excluded.requests, benched_until = MAX(benched_until, excluded.benched_until)
+    """,
+        [
+            (service, keyHash, day, requests, benchedUntil)
+            for (keyHash, requests, benchedUntil) in usages
+        ],
+    )
+
+    connection.commit()
+    connection.close()
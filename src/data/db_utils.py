@@ -23,6 +23,22 @@
 
 from sqlite3 import connect, Connection
 
+from utils.deadline import Deadline
 
-def dbConnect() -> Connection:
-    return connect("tasteit.db")
+# Seconds a statement waits for the database to be unlocked by another connection (the sqlite3 default).
+__LOCK_TIMEOUT = 5.0
+
+# Seconds a statement waits for the database to be unlocked even when the deadline has expired, so that a short write
+# of the background jobs does not fail the reads of a research.
+__MIN_LOCK_TIMEOUT = 0.2
+
+
+def dbConnect(deadline: Deadline = None) -> Connection:
+    """Opens a connection to the database. With a deadline, the statements wait for the database to be unlocked only
+    within the remaining time (but at least `__MIN_LOCK_TIMEOUT` seconds)."""
+    return connect(
+        "tasteit.db",
+        timeout=max(__MIN_LOCK_TIMEOUT, deadline.budget(__LOCK_TIMEOUT))
+        if deadline != None
+        else __LOCK_TIMEOUT,
+    )
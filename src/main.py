@@ -40,6 +40,11 @@ import logging
 import os
 
 from utils.api_key import ApiKey, Service
+from utils.config import configValue
+from utils.metrics import countersSnapshot
+from upstream import asyncUpstreamClient, upstreamClient
+from places import geocodingCache, googlePlacesCircuitBreaker, placeDetailsStore
+from routing import mapboxCircuitBreaker, osrmCircuitBreaker, routeCache
 from utils.conversation_utils import notAvailableOption, cancelConversation
 from bot_functionalities import (
     start,
@@ -153,6 +158,43 @@ def error_handler(update: object, context: CallbackContext) -> None:
         parse_mode=ParseMode.HTML,
     )
 
+
+def logMetrics(context: CallbackContext) -> None:
+    """Periodically log the counters collected by the bot (caches hit rates, upstream requests, ...) and the state of
+    the circuit breakers."""
+    logger.info("Metrics: %s", json.dumps(countersSnapshot()))
+    logger.info("Upstream pools: %s", json.dumps(upstreamClient().poolsSnapshot()))
+    logger.info(
+        "Upstream requests in flight: %s",
+        json.dumps(asyncUpstreamClient().inFlightSnapshot()),
+    )
+    logger.info(
+        "Upstream hedging latencies: %s",
+        json.dumps(asyncUpstreamClient().latencySnapshot()),
+    )
+    logger.info(
+        "Circuit breakers: %s",
+        json.dumps(
+            {
+                circuitBreaker.name: circuitBreaker.state
+                for circuitBreaker in (
+                    googlePlacesCircuitBreaker,
+                    mapboxCircuitBreaker,
+                    osrmCircuitBreaker,
+                )
+            }
+        ),
+    )
+
+
+def evictStaleCacheEntries(context: CallbackContext) -> None:
+    """Periodically remove the expired entries of the caches stored in the database, so that the researches do not
+    wait for the scans of the whole tables."""
+    routeCache().evictStale()
+    geocodingCache().evictStale()
+    placeDetailsStore().evictStale()
+
+
 def main():
     telegramKey = ApiKey(service=Service.TELEGRAM, devMode=_DEVMODE).value
 
@@ -404,6 +446,29 @@ def main():
     # Setting up database
     setupTables()
 
+    # Opening the connections towards the upstream services before the first research
+    asyncUpstreamClient().warmUp(
+        [
+            url.strip()
+            for url in configValue(
+                "UPSTREAM_WARM_UP_URLS",
+                "https://maps.googleapis.com/,https://api.mapbox.com/",
+            ).split(",")
+            if url.strip() != ""
+        ]
+    )
+
+    # Logging the collected metrics
+    updater.job_queue.run_repeating(
+        logMetrics, interval=configValue("METRICS_LOG_INTERVAL_SECONDS", 600)
+    )
+
+    # Removing the expired entries of the caches
+    updater.job_queue.run_repeating(
+        evictStaleCacheEntries,
+        interval=configValue("CACHE_EVICTION_INTERVAL_SECONDS", 600),
+    )
+
     updater.start_polling()
     updater.idle()
 
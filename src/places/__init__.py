@@ -0,0 +1,16 @@
+from .google_places_client import (
+    GooglePlacesClient,
+    googlePlacesCircuitBreaker,
+    googlePlacesClient,
+)
+from .geocoding_cache import GeocodingCache, geocodingCache
+from .nearby_search_cache import NearbySearchCache, nearbySearchCache
+from .place_details_store import PlaceDetailsStore, placeDetailsStore
+from .details_prefetcher import DetailsPrefetcher, detailsPrefetcher
+from .response_projections import (
+    findPlaceProjection,
+    nearbySearchProjection,
+    placeDetailsProjection,
+)
+from .food_keywords import FoodKeywordCanonicalizer, foodKeywordCanonicalizer
+from .restaurant_catalog import RestaurantCatalog, restaurantCatalog
@@ -0,0 +1,108 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from logging import getLogger
+from threading import Lock
+
+from places.place_details_store import placeDetailsStore
+from utils.config import configValue
+from utils.metrics import incrementCounter
+
+logger = getLogger(__name__)
+
+
+class DetailsPrefetcher:
+    """Fetches in the background the details of the restaurants the users are about to open, with bounded concurrency.
+
+    The details fetched from Google by a prefetch are tracked: `details_prefetch.viewed` counts the ones the user then
+    opened, `details_prefetch.unviewed` the ones never opened, which spent the quota for nothing.
+
+    Attributes
+    ----------
+    :attr:`__pool` : ThreadPoolExecutor
+        the threads fetching the details
+    """
+
+    def __init__(self, maxWorkers: int) -> None:
+        self.__pool = ThreadPoolExecutor(
+            max_workers=maxWorkers, thread_name_prefix="details-prefetch"
+        )
+
+    def prefetch(self, placeId: str, lang: str, onFetched, *args) -> Future:
+        """Fetches the details of a place in the background.
+
+        Args:
+            placeId (str): the place id provided by google
+            lang (str): the language of the details
+            onFetched: called, in the background, with the details fetched followed by `args`
+
+        Returns:
+            Future: resolved with True if the details were fetched from Google, False if they were already stored
+        """
+        return self.__pool.submit(self.__prefetch, placeId, lang, onFetched, *args)
+
+    def viewed(self, future: Future) -> None:
+        """Records that the details prefetched by `future` have been opened by the user."""
+        future.add_done_callback(lambda done: self.__record(done, "viewed"))
+
+    def discarded(self, future: Future) -> None:
+        """Records that the details prefetched by `future` will not be opened anymore, cancelling it if not started yet."""
+        if not future.cancel():
+            future.add_done_callback(lambda done: self.__record(done, "unviewed"))
+
+    def __prefetch(self, placeId: str, lang: str, onFetched, *args) -> bool:
+        usesQuota = not placeDetailsStore().isStored(placeId, lang)
+        try:
+            onFetched(placeDetailsStore().details(placeId, lang), *args)
+        except Exception as error:
+            logger.warning(f"Unable to prefetch the details of {placeId}: {error}")
+            raise
+
+        if usesQuota:
+            incrementCounter("details_prefetch.requests")
+        return usesQuota
+
+    @staticmethod
+    def __record(future: Future, outcome: str) -> None:
+        if future.cancelled() or future.exception() != None:
+            return
+        elif future.result():
+            incrementCounter(f"details_prefetch.{outcome}")
+
+
+__detailsPrefetcher: DetailsPrefetcher = None
+__detailsPrefetcherLock = Lock()
+
+
+def detailsPrefetcher() -> DetailsPrefetcher:
+    """Returns the details prefetcher shared by all the chats, creating it on the first call."""
+    global __detailsPrefetcher
+
+    with __detailsPrefetcherLock:
+        if __detailsPrefetcher == None:
+            __detailsPrefetcher = DetailsPrefetcher(
+                configValue("DETAILS_PREFETCH_WORKERS", 2)
+            )
+
+    return __detailsPrefetcher
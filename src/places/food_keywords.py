@@ -0,0 +1,154 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from threading import Lock
+from unicodedata import combining, normalize
+
+from FOOD_KEYWORDS import FOOD_KEYWORDS
+from utils.config import configValue
+from utils.keyword_trie import KeywordTrie
+from utils.metrics import incrementCounter
+
+
+class FoodKeywordCanonicalizer:
+    """Maps the food typed by the user to the keyword sent to the Nearby Search.
+
+    The text is normalized (case, accents, punctuation and whitespace) and looked up in the per-language vocabulary of
+    `FOOD_KEYWORDS`, so that e.g. "Pizzeria" and "pizza " both become "pizza". Misspelled keywords ("sushii") are
+    matched by edit distance. A text which matches no keyword as a whole is canonicalized word by word, and the words
+    which match no keyword are kept normalized. The outcomes are counted in the metrics as `food_keywords.matched`,
+    `food_keywords.fuzzy_matched` and `food_keywords.unmatched`.
+
+    Attributes
+    ----------
+    :attr:`__vocabularies` : dict
+        the trie of the known keywords of each language, mapping each keyword and synonym to its canonical keyword
+    :attr:`__maxEditDistance` : int
+        the maximum edit distance of a misspelled keyword from the known one
+    """
+
+    def __init__(self, keywords: dict, maxEditDistance: int) -> None:
+        self.__vocabularies: dict = {}
+        self.__maxEditDistance = maxEditDistance
+
+        for language, synonyms in keywords.items():
+            vocabulary = KeywordTrie()
+            for keyword, keywordSynonyms in synonyms.items():
+                for synonym in keywordSynonyms:
+                    vocabulary.insert(self.normalize(synonym), self.normalize(keyword))
+            # The canonical keywords are inserted last, so that they win over a synonym spelled the same way.
+            for keyword in synonyms:
+                vocabulary.insert(self.normalize(keyword), self.normalize(keyword))
+            self.__vocabularies[language] = vocabulary
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Returns the text case-folded, without accents and punctuation, with single spaces between the words."""
+        decomposedText = normalize("NFKD", text.casefold())
+        return " ".join(
+            "".join(
+                character if character.isalnum() else " "
+                for character in decomposedText
+                if not combining(character)
+            ).split()
+        )
+
+    def canonical(self, food: str, lang: str) -> str:
+        """Returns the canonical keyword of the food typed by the user.
+
+        Args:
+            food (str): the food typed by the user
+            lang (str): the language of the chat
+
+        Returns:
+            str: the keyword to be sent to Google and to be used in the cache keys
+        """
+        normalizedFood = self.normalize(food)
+        if normalizedFood == "":
+            # Nothing is left of a text made of emojis or symbols only: it is sent as it was typed.
+            incrementCounter("food_keywords.unmatched")
+            return food.strip()
+
+        vocabulary = self.__vocabularies.get(lang)
+        if vocabulary == None:
+            incrementCounter("food_keywords.unmatched")
+            return normalizedFood
+
+        keyword = self.__match(vocabulary, normalizedFood)
+        if keyword != None:
+            return keyword
+
+        words = normalizedFood.split()
+        if len(words) == 1:
+            incrementCounter("food_keywords.unmatched")
+            return normalizedFood
+
+        keywords: list = []
+        for word in words:
+            keyword = self.__match(vocabulary, word)
+            if keyword == None:
+                incrementCounter("food_keywords.unmatched")
+                keyword = word
+            # Two words with the same canonical keyword (e.g. "pizza pizzeria") are searched once.
+            if keyword not in keywords:
+                keywords.append(keyword)
+
+        return " ".join(keywords)
+
+    def __match(self, vocabulary: KeywordTrie, text: str) -> str:
+        """Returns the canonical keyword matching the text exactly or by edit distance, None if there is none."""
+        keyword = vocabulary.get(text)
+        if keyword != None:
+            incrementCounter("food_keywords.matched")
+            return keyword
+
+        # Short words have many neighbours: they are allowed fewer typos.
+        maxDistance = min(
+            self.__maxEditDistance, 0 if len(text) < 4 else 1 if len(text) < 8 else 2
+        )
+        if maxDistance == 0:
+            return None
+
+        closestKeyword = vocabulary.closest(text, maxDistance)
+        if closestKeyword == None:
+            return None
+
+        incrementCounter("food_keywords.fuzzy_matched")
+        return closestKeyword[0]
+
+
+__foodKeywordCanonicalizer: FoodKeywordCanonicalizer = None
+__foodKeywordCanonicalizerLock = Lock()
+
+
+def foodKeywordCanonicalizer() -> FoodKeywordCanonicalizer:
+    """Returns the canonicalizer of the food keywords, creating it on the first call."""
+    global __foodKeywordCanonicalizer
+
+    with __foodKeywordCanonicalizerLock:
+        if __foodKeywordCanonicalizer == None:
+            __foodKeywordCanonicalizer = FoodKeywordCanonicalizer(
+                FOOD_KEYWORDS, configValue("FOOD_KEYWORD_MAX_EDIT_DISTANCE", 2)
+            )
+
+    return __foodKeywordCanonicalizer
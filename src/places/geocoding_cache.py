@@ -0,0 +1,173 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from logging import getLogger
+from sqlite3 import OperationalError
+from threading import Lock
+from time import time
+
+from data import (
+    fetchCachedGeocoding,
+    insertCachedGeocoding,
+    removeStaleCachedGeocodings,
+)
+from utils.config import configValue
+from utils.deadline import Deadline
+from utils.lru_cache import LRUCache
+from utils.metrics import incrementCounter
+
+logger = getLogger(__name__)
+
+
+class GeocodingCache:
+    """A two-tier cache of the locations found for the names typed by the users: an in-memory LRU in front of the
+    `geocoding_cache` table.
+
+    The names are normalized (case and whitespace), and the names without any location are cached too, for a shorter
+    time.
+
+    Attributes
+    ----------
+    :attr:`__memoryCache` : LRUCache
+        the in-memory tier
+    :attr:`__timeToLive` : float
+        seconds after which a cached location expires
+    :attr:`__notFoundTimeToLive` : float
+        seconds after which a name without any location expires
+    """
+
+    def __init__(
+        self, memoryCache: LRUCache, timeToLive: float, notFoundTimeToLive: float
+    ) -> None:
+        self.__memoryCache = memoryCache
+        self.__timeToLive = timeToLive
+        self.__notFoundTimeToLive = notFoundTimeToLive
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Returns the key under which the location of the given name is cached."""
+        return " ".join(query.casefold().split())
+
+    def get(self, query: str, deadline: Deadline = None) -> tuple:
+        """Returns the cached location of the given name.
+
+        Args:
+            query (str): the name typed by the user
+            deadline (Deadline, optional): the deadline bounding the wait for the database. Defaults to None.
+
+        Returns:
+            tuple: (name, latitude, longitude) of the location, or (None, None, None) if it is known that no location
+                   matches the name. None if the name is not cached, or if the database stays locked by another
+                   connection.
+        """
+        key = self.normalize(query)
+        location = self.__memoryCache.get(key)
+
+        if location == None:
+            try:
+                cachedLocation = fetchCachedGeocoding(key, deadline)
+            except OperationalError:
+                # The database is locked by a background write: the location is searched again rather than waited for.
+                incrementCounter("geocoding_cache.errors")
+                cachedLocation = None
+            if cachedLocation != None:
+                name, latitude, longitude, fetchedAt = cachedLocation
+                expiresAt = fetchedAt + (
+                    self.__timeToLive if name != None else self.__notFoundTimeToLive
+                )
+                if expiresAt > time():
+                    location = (name, latitude, longitude)
+                    self.__memoryCache.put(key, location, expiresAt - time())
+
+        incrementCounter(
+            "geocoding_cache.hits" if location != None else "geocoding_cache.misses"
+        )
+        return location
+
+    def put(
+        self,
+        query: str,
+        name: str = None,
+        latitude: float = None,
+        longitude: float = None,
+    ) -> None:
+        """Stores the location found for the given name. Without a location, the name is cached as not found. The
+        location is kept in memory only if the database stays locked by another connection.
+
+        Args:
+            query (str): the name typed by the user
+            name (str, optional): the name of the location found. Defaults to None.
+            latitude (float, optional): the latitude of the location found. Defaults to None.
+            longitude (float, optional): the longitude of the location found. Defaults to None.
+        """
+        key = self.normalize(query)
+        now = time()
+
+        self.__memoryCache.put(
+            key,
+            (name, latitude, longitude),
+            self.__timeToLive if name != None else self.__notFoundTimeToLive,
+        )
+        try:
+            insertCachedGeocoding(key, name, latitude, longitude, now)
+        except OperationalError as error:
+            # The location was found anyway: the research goes on without storing it.
+            incrementCounter("geocoding_cache.errors")
+            logger.warning(f"Unable to cache the location of {key}: {error}")
+
+    def evictStale(self) -> None:
+        """Removes the expired locations from the database.
+
+        Meant to be run periodically rather than by the researches, since it scans the whole table.
+        """
+        now = time()
+        try:
+            removeStaleCachedGeocodings(
+                now - self.__timeToLive, now - self.__notFoundTimeToLive
+            )
+        except OperationalError as error:
+            incrementCounter("geocoding_cache.errors")
+            logger.warning(f"Unable to evict the stale locations: {error}")
+
+
+__geocodingCache: GeocodingCache = None
+__geocodingCacheLock = Lock()
+
+
+def geocodingCache() -> GeocodingCache:
+    """Returns the geocoding cache shared by all the researches, creating it on the first call."""
+    global __geocodingCache
+
+    with __geocodingCacheLock:
+        if __geocodingCache == None:
+            __geocodingCache = GeocodingCache(
+                LRUCache(
+                    "geocoding_cache.memory",
+                    configValue("GEOCODING_CACHE_MEMORY_ENTRIES", 1000),
+                    configValue("GEOCODING_CACHE_TTL_SECONDS", 2592000.0),
+                ),
+                configValue("GEOCODING_CACHE_TTL_SECONDS", 2592000.0),
+                configValue("GEOCODING_CACHE_NOT_FOUND_TTL_SECONDS", 86400.0),
+            )
+
+    return __geocodingCache
@@ -0,0 +1,293 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+import asyncio
+from logging import getLogger
+from random import uniform
+from threading import Lock
+
+from requests import HTTPError, RequestException
+
+from custom_exceptions import (
+    DeadlineExceededException,
+    GoogleCriticalErrorException,
+    GoogleUnavailableException,
+)
+from upstream import ApiKeyPool, TokenBucket, apiKeyPool, asyncUpstreamClient
+from utils.api_key import Service
+from utils.circuit_breaker import CircuitBreaker
+from utils.config import configValue
+from utils.deadline import Deadline
+from utils.metrics import incrementCounter
+
+logger = getLogger(__name__)
+
+# Shared by all the researches: while Google is failing, its requests are refused and the caches are used where possible.
+googlePlacesCircuitBreaker = CircuitBreaker(
+    "google_places",
+    configValue("GOOGLE_BREAKER_FAILURE_THRESHOLD", 5),
+    configValue("GOOGLE_BREAKER_RESET_SECONDS", 30.0),
+)
+
+
+class GooglePlacesClient:
+    """Sends the requests to the Google Places API, protecting both the bot and the API key.
+
+    - Every endpoint (`findplace`, `nearby`, `details`) has its own rate limit, so that the bot slows down rather than
+      receiving `OVER_QUERY_LIMIT`.
+    - The transient failures (`OVER_QUERY_LIMIT`, `UNKNOWN_ERROR`, 5xx status codes, timeouts) are retried with a
+      jittered exponential backoff.
+    - The requests go through `googlePlacesCircuitBreaker`: once Google keeps failing, the requests are refused without
+      contacting it, for a while.
+    - Every attempt takes its key from the pool of Google Places keys. The keys returning quota or authorization errors
+      are benched, and the request is sent again with another key.
+
+    Attributes
+    ----------
+    :attr:`__limiters` : dict
+        endpoint -> token bucket limiting its requests
+    :attr:`__circuitBreaker` : CircuitBreaker
+        the breaker shared by all the endpoints
+    :attr:`__keyPool` : ApiKeyPool
+        the pool of Google Places keys
+    :attr:`__maxAttempts` : int
+        maximum number of attempts of a request
+    :attr:`__backoffBase` : float
+        seconds of the maximum wait before the first retry, doubled at every following retry
+    :attr:`__backoffMax` : float
+        upper bound of the maximum wait before a retry, in seconds
+    :attr:`__maxThrottleWait` : float
+        maximum seconds a request waits for the rate limit before being refused
+    """
+
+    ENDPOINTS = ("findplace", "nearby", "details")
+
+    # Statuses meaning that the same request may succeed if sent again.
+    TRANSIENT_STATUSES = ("OVER_QUERY_LIMIT", "UNKNOWN_ERROR")
+
+    # Statuses meaning that the key used has run out of quota or is not authorized.
+    KEY_STATUSES = ("OVER_QUERY_LIMIT", "OVER_DAILY_LIMIT", "REQUEST_DENIED")
+
+    def __init__(
+        self,
+        limiters: dict,
+        circuitBreaker: CircuitBreaker,
+        keyPool: ApiKeyPool,
+        maxAttempts: int,
+        backoffBase: float,
+        backoffMax: float,
+        maxThrottleWait: float,
+    ) -> None:
+        self.__limiters = limiters
+        self.__circuitBreaker = circuitBreaker
+        self.__keyPool = keyPool
+        self.__maxAttempts = maxAttempts
+        self.__backoffBase = backoffBase
+        self.__backoffMax = backoffMax
+        self.__maxThrottleWait = maxThrottleWait
+
+    def request(
+        self, endpoint: str, url: str, projection=None, deadline: Deadline = None
+    ) -> dict:
+        """Sends a request to the Google Places API and waits for its parsed response. See `requestAsync`."""
+        return asyncUpstreamClient().run(
+            self.requestAsync(endpoint, url, projection, deadline), deadline
+        )
+
+    async def requestAsync(
+        self, endpoint: str, url: str, projection=None, deadline: Deadline = None
+    ) -> dict:
+        """Sends a request to the Google Places API and returns its parsed response.
+
+        The responses whose status is not transient (e.g. `OK`, `ZERO_RESULTS`, `INVALID_REQUEST`, `REQUEST_DENIED`) are
+        returned as they are: their status has to be checked by the caller.
+
+        Args:
+            endpoint (str): the endpoint class of the request, one of `ENDPOINTS`
+            url (str): the url of the request, without the key
+            projection (optional): function applied to the parsed response, see `AsyncUpstreamClient.getJson`
+            deadline (Deadline, optional): the deadline of the update being served. The waits for the rate limit, the
+                                           retries and the responses fit in its remaining time. Defaults to None.
+
+        Raises:
+            GoogleUnavailableException: raised when Google is considered unavailable, when the rate limit is exceeded
+                                        or when every attempt fails transiently.
+            DeadlineExceededException: raised when the deadline expires while waiting for the response.
+            GoogleCriticalErrorException: raised when Google refuses the request with a 4xx status code.
+
+        Returns:
+            dict: the parsed response
+        """
+        if not self.__circuitBreaker.allowRequest():
+            raise self.__unavailable(endpoint, "Google is temporarily unavailable.")
+
+        try:
+            return await self.__send(endpoint, url, projection, deadline)
+        except (asyncio.CancelledError, DeadlineExceededException):
+            # The request has no outcome: its caller gave up on it.
+            self.__circuitBreaker.recordCancellation()
+            raise
+
+    async def __send(
+        self, endpoint: str, url: str, projection, deadline: Deadline
+    ) -> dict:
+        """Sends the request, retrying its transient failures, and records its outcome in the circuit breaker.
+
+        The rate limit and the key are taken by `__authorize`, once per HTTP request actually sent.
+        """
+        for attempt in range(self.__maxAttempts):
+            if attempt > 0:
+                # Full jitter: the retries of concurrent requests are spread over the whole backoff interval.
+                backoff = uniform(
+                    0, min(self.__backoffMax, self.__backoffBase * 2 ** (attempt - 1))
+                )
+                # A retry which could not be answered before the deadline is not sent.
+                if deadline != None and backoff >= deadline.remaining:
+                    break
+                await asyncio.sleep(backoff)
+                incrementCounter(f"google_places.{endpoint}.retries")
+
+            try:
+                googleResult = await asyncUpstreamClient().getJson(
+                    url,
+                    f"google_places.{endpoint}",
+                    projection=projection,
+                    deadline=deadline,
+                    authorize=self.__authorizer(endpoint, deadline),
+                )
+            except GoogleUnavailableException:
+                # The rate limit has been exceeded: the request has not been sent.
+                if attempt == 0:
+                    self.__circuitBreaker.recordCancellation()
+                    raise
+                break
+            except HTTPError as error:
+                if error.response.status_code < 500:
+                    self.__circuitBreaker.recordSuccess()
+                    raise GoogleCriticalErrorException(
+                        f"Google critical error: {error.response.status_code} status code."
+                    )
+                failure = f"{error.response.status_code} status code"
+            except (RequestException, ValueError) as error:
+                failure = str(error)
+            else:
+                status = googleResult.get("status")
+                if status not in GooglePlacesClient.TRANSIENT_STATUSES and not (
+                    status in GooglePlacesClient.KEY_STATUSES
+                    and self.__keyPool.hasAvailableKey()
+                ):
+                    self.__circuitBreaker.recordSuccess()
+                    return googleResult
+                failure = status
+
+            logger.warning(
+                f"Google {endpoint} request failed (attempt {attempt + 1}): {failure}"
+            )
+
+        self.__circuitBreaker.recordFailure()
+        raise self.__unavailable(
+            endpoint, f"Google {endpoint} request failed: {failure}"
+        )
+
+    def __authorizer(self, endpoint: str, deadline: Deadline):
+        """Returns the `authorize` function of the requests towards the endpoint (see `AsyncUpstreamClient.getJson`).
+
+        It waits for the rate limit and takes a key from the pool, benching the key if Google refuses it.
+        """
+
+        async def authorize(url: str) -> tuple:
+            if not await self.__throttle(endpoint, deadline):
+                raise self.__unavailable(endpoint, "Google rate limit exceeded.")
+            key = self.__keyPool.acquire()
+
+            def onResponse(response, googleResult: dict) -> None:
+                if (
+                    googleResult != None
+                    and googleResult.get("status") in GooglePlacesClient.KEY_STATUSES
+                ):
+                    self.__keyPool.bench(key)
+
+            return (f"{url}&key={key}", onResponse)
+
+        return authorize
+
+    async def __throttle(self, endpoint: str, deadline: Deadline) -> bool:
+        """Waits for the rate limit of the endpoint. Returns False if the wait would be too long."""
+        wait = self.__limiters[endpoint].reserve(
+            deadline.budget(self.__maxThrottleWait)
+            if deadline != None
+            else self.__maxThrottleWait
+        )
+        if wait != None and wait > 0:
+            await asyncio.sleep(wait)
+
+        return wait != None
+
+    @staticmethod
+    def __unavailable(endpoint: str, message: str) -> GoogleUnavailableException:
+        incrementCounter(f"google_places.{endpoint}.unavailable")
+        return GoogleUnavailableException(message)
+
+
+__googlePlacesClient: GooglePlacesClient = None
+__googlePlacesClientLock = Lock()
+
+
+def googlePlacesClient() -> GooglePlacesClient:
+    """Returns the Google Places client shared by all the chats, creating it on the first call.
+
+    The rate limits are read from `GOOGLE_PLACES_RATE_LIMITS`, a `,` separated list of `endpoint=requests per second`
+    pairs. Every endpoint can send a burst of one second of requests.
+    """
+    global __googlePlacesClient
+
+    with __googlePlacesClientLock:
+        if __googlePlacesClient == None:
+            rates = {
+                endpoint.strip(): float(rate)
+                for (endpoint, rate) in (
+                    rateLimit.split("=")
+                    for rateLimit in configValue(
+                        "GOOGLE_PLACES_RATE_LIMITS", "findplace=10,nearby=10,details=10"
+                    ).split(",")
+                    if rateLimit.strip() != ""
+                )
+            }
+            __googlePlacesClient = GooglePlacesClient(
+                {
+                    endpoint: TokenBucket(
+                        f"google_places.{endpoint}",
+                        rates.get(endpoint, 10.0),
+                        max(1.0, rates.get(endpoint, 10.0)),
+                    )
+                    for endpoint in GooglePlacesClient.ENDPOINTS
+                },
+                googlePlacesCircuitBreaker,
+                apiKeyPool(Service.GOOGLE_PLACES),
+                configValue("GOOGLE_PLACES_MAX_ATTEMPTS", 3),
+                configValue("GOOGLE_PLACES_BACKOFF_BASE_SECONDS", 0.5),
+                configValue("GOOGLE_PLACES_BACKOFF_MAX_SECONDS", 4.0),
+                configValue("GOOGLE_PLACES_MAX_THROTTLE_SECONDS", 5.0),
+            )
+
+    return __googlePlacesClient
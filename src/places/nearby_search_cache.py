@@ -0,0 +1,169 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from math import ceil
+from threading import Lock
+
+from utils.config import configValue
+from utils.lru_cache import LRUCache
+
+
+class NearbySearchCache:
+    """An in-memory cache of the Nearby Search responses, shared by all the chats.
+
+    A response is identified by the grid cell of the research location, the normalized keyword, the maximum price, the
+    opennow flag, the radius bucket and the language. Since the response may come from another position of the same
+    cell, the places it contains must be checked again against the exact research location and radius.
+
+    Attributes
+    ----------
+    :attr:`__cache` : LRUCache
+        the cached responses
+    :attr:`__cellSize` : float
+        size in degrees of the side of a grid cell
+    :attr:`__radiusBucket` : int
+        the research radiuses are rounded up to a multiple of this value, in meters
+    :attr:`__timeToLive` : float
+        seconds after which a response expires
+    :attr:`__openNowTimeToLive` : float
+        seconds after which a response of a research of the open restaurants expires
+    :attr:`__notFoundTimeToLive` : float
+        seconds after which a response without results expires
+    """
+
+    def __init__(
+        self,
+        cache: LRUCache,
+        cellSize: float,
+        radiusBucket: int,
+        timeToLive: float,
+        openNowTimeToLive: float,
+        notFoundTimeToLive: float,
+    ) -> None:
+        self.__cache = cache
+        self.__cellSize = cellSize
+        self.__radiusBucket = radiusBucket
+        self.__timeToLive = timeToLive
+        self.__openNowTimeToLive = openNowTimeToLive
+        self.__notFoundTimeToLive = notFoundTimeToLive
+
+    def searchRadius(self, radius: int) -> int:
+        """Returns the radius, in meters, to be sent to Google for a research within `radius` meters."""
+        return ceil(radius / self.__radiusBucket) * self.__radiusBucket
+
+    def key(
+        self,
+        origin: tuple,
+        keyword: str,
+        maxPrice: int,
+        openNow: bool,
+        radius: int,
+        lang: str,
+    ) -> tuple:
+        """Returns the key identifying the response of a research.
+
+        Args:
+            origin (tuple): (latitude, longitude) of the research location
+            keyword (str): the canonical keyword of the food searched (see `FoodKeywordCanonicalizer`)
+            maxPrice (int): the maximum price level
+            openNow (bool): whether only the open restaurants are searched
+            radius (int): the research radius, in meters
+            lang (str): the language of the response
+
+        Returns:
+            tuple: the key of the response
+        """
+        return (
+            round(origin[0] / self.__cellSize),
+            round(origin[1] / self.__cellSize),
+            keyword,
+            maxPrice,
+            openNow,
+            self.searchRadius(radius),
+            lang,
+        )
+
+    def get(self, key: tuple) -> dict:
+        """Returns the cached response with the given key (see `key`), None if it is not cached."""
+        return self.__cache.get(key)
+
+    def getExpired(self, key: tuple) -> dict:
+        """Returns the cached response with the given key (see `key`) even if it is expired, None if it is not cached.
+
+        Meant to be used only when Google is unavailable.
+        """
+        return self.__cache.getExpired(key)
+
+    def put(self, key: tuple, response: dict) -> None:
+        """Stores the response with the given key (see `key`). Responses without results are cached too.
+
+        The `next_page_token` is not stored: it may have expired, or belong to the research of another chat, by the time
+        the response is served again, so the further pages of a cached response are never requested.
+
+        Args:
+            key (tuple): the key of the response
+            response (dict): the parsed Nearby Search response
+        """
+        if response.get("status") == "ZERO_RESULTS":
+            timeToLive = self.__notFoundTimeToLive
+        # The fifth element of the key is the opennow flag.
+        elif key[4]:
+            timeToLive = self.__openNowTimeToLive
+        else:
+            timeToLive = self.__timeToLive
+
+        self.__cache.put(
+            key,
+            {
+                field: value
+                for field, value in response.items()
+                if field != "next_page_token"
+            },
+            timeToLive,
+        )
+
+
+__nearbySearchCache: NearbySearchCache = None
+__nearbySearchCacheLock = Lock()
+
+
+def nearbySearchCache() -> NearbySearchCache:
+    """Returns the Nearby Search cache shared by all the researches, creating it on the first call."""
+    global __nearbySearchCache
+
+    with __nearbySearchCacheLock:
+        if __nearbySearchCache == None:
+            __nearbySearchCache = NearbySearchCache(
+                LRUCache(
+                    "nearby_cache",
+                    configValue("NEARBY_CACHE_MAX_ENTRIES", 2000),
+                    configValue("NEARBY_CACHE_TTL_SECONDS", 3600.0),
+                ),
+                configValue("NEARBY_CACHE_CELL_DEGREES", 0.002),
+                configValue("NEARBY_CACHE_RADIUS_BUCKET_METERS", 500),
+                configValue("NEARBY_CACHE_TTL_SECONDS", 3600.0),
+                configValue("NEARBY_CACHE_OPEN_NOW_TTL_SECONDS", 300.0),
+                configValue("NEARBY_CACHE_NOT_FOUND_TTL_SECONDS", 600.0),
+            )
+
+    return __nearbySearchCache
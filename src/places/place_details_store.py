@@ -0,0 +1,233 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from concurrent.futures import ThreadPoolExecutor
+from json import dumps, loads
+from logging import getLogger
+from sqlite3 import OperationalError
+from threading import Lock
+from time import time
+
+from custom_exceptions import (
+    DeadlineExceededException,
+    GoogleCriticalErrorException,
+    GoogleUnavailableException,
+    NoPlaceFoundException,
+)
+from data import fetchPlaceDetails, insertPlaceDetails, removeStalePlaceDetails
+from places.google_places_client import googlePlacesClient
+from places.response_projections import placeDetailsProjection
+from utils.config import configValue
+from utils.deadline import Deadline
+from utils.metrics import incrementCounter
+
+logger = getLogger(__name__)
+
+
+class PlaceDetailsStore:
+    """A persistent store of the details of every restaurant ever fetched through the Place Details API, in each
+    language, kept in the `place_details` table.
+
+    The details fetched less than `softTimeToLive` seconds ago are served as they are. The details older than that are
+    served too, but they are refreshed in the background. Only the details older than `hardTimeToLive` seconds, or never
+    fetched, are fetched before being returned. While Google is unavailable or slow, the details older than
+    `hardTimeToLive` seconds which have not been removed yet are served anyway.
+
+    Attributes
+    ----------
+    :attr:`__softTimeToLive` : float
+        seconds after which the details are refreshed in the background
+    :attr:`__hardTimeToLive` : float
+        seconds after which the details are not served anymore
+    :attr:`__refreshPool` : ThreadPoolExecutor
+        the threads refreshing the details in the background
+    :attr:`__refreshing` : set
+        (place id, language) of the details being refreshed
+    """
+
+    def __init__(
+        self, softTimeToLive: float, hardTimeToLive: float, refreshWorkers: int
+    ) -> None:
+        self.__softTimeToLive = softTimeToLive
+        self.__hardTimeToLive = hardTimeToLive
+        self.__refreshPool = ThreadPoolExecutor(
+            max_workers=refreshWorkers, thread_name_prefix="details-refresh"
+        )
+        self.__refreshing: set = set()
+        self.__lock = Lock()
+
+    def details(self, placeId: str, lang: str, deadline: Deadline = None) -> dict:
+        """Returns the details of a place.
+
+        Args:
+            placeId (str): the place id provided by google
+            lang (str): the language of the details
+            deadline (Deadline, optional): the deadline of the update being served. Defaults to None.
+
+        Raises:
+            NoPlaceFoundException: raised when the details have to be fetched and google does not find the place.
+            GoogleCriticalErrorException: raised when the details have to be fetched and google fails.
+            GoogleUnavailableException: raised when the details have to be fetched, google is unavailable and no details
+                                        are stored.
+            DeadlineExceededException: raised when the details have to be fetched, google does not answer before the
+                                       deadline and no details are stored.
+
+        Returns:
+            dict: the details, shaped as the `result` of a Place Details response: `formatted_address`,
+                  `formatted_phone_number`, `website`, `url`, `opening_hours` (with `weekday_text`) and `reviews`. The
+                  fields not provided by google are missing.
+        """
+        storedDetails = fetchPlaceDetails(placeId, lang, deadline)
+        now = time()
+
+        if storedDetails != None and storedDetails[6] >= now - self.__hardTimeToLive:
+            if storedDetails[6] < now - self.__softTimeToLive:
+                incrementCounter("place_details.stale_hits")
+                self.__refreshInBackground(placeId, lang)
+            else:
+                incrementCounter("place_details.hits")
+
+            return self.__storedDetails(storedDetails)
+
+        incrementCounter("place_details.misses")
+        try:
+            return self.__fetch(placeId, lang, deadline)
+        except (GoogleUnavailableException, DeadlineExceededException):
+            if storedDetails == None:
+                raise
+
+            incrementCounter("place_details.degraded_hits")
+            return self.__storedDetails(storedDetails)
+
+    def isStored(self, placeId: str, lang: str) -> bool:
+        """Returns True if the details of the place can be served without contacting Google."""
+        storedDetails = fetchPlaceDetails(placeId, lang)
+
+        return (
+            storedDetails != None and storedDetails[6] >= time() - self.__hardTimeToLive
+        )
+
+    @staticmethod
+    def __storedDetails(storedDetails: tuple) -> dict:
+        """Returns the details stored in a row of the `place_details` table, shaped as in `details`."""
+        address, phoneNumber, website, mapsLink, timetable, reviews, _ = storedDetails
+        details = {
+            "formatted_address": address,
+            "formatted_phone_number": phoneNumber,
+            "website": website,
+            "url": mapsLink,
+            "reviews": loads(reviews),
+        }
+        if timetable != None:
+            details["opening_hours"] = {"weekday_text": loads(timetable)}
+
+        return {key: value for key, value in details.items() if value != None}
+
+    def __refreshInBackground(self, placeId: str, lang: str) -> None:
+        """Fetches again the details of a place in the background, unless they are already being refreshed."""
+        with self.__lock:
+            if (placeId, lang) in self.__refreshing:
+                return
+            self.__refreshing.add((placeId, lang))
+
+        self.__refreshPool.submit(self.__refresh, placeId, lang)
+
+    def __refresh(self, placeId: str, lang: str) -> None:
+        try:
+            self.__fetch(placeId, lang)
+        except Exception as error:
+            logger.warning(f"Unable to refresh the details of {placeId}: {error}")
+        finally:
+            with self.__lock:
+                self.__refreshing.discard((placeId, lang))
+
+    def __fetch(self, placeId: str, lang: str, deadline: Deadline = None) -> dict:
+        """Fetches the details of a place through the Place Details API and stores them."""
+        googleResult = googlePlacesClient().request(
+            "details",
+            f"https://maps.googleapis.com/maps/api/place/details/json?fields=formatted_address%2Cformatted_phone_number%2Copening_hours/weekday_text%2Creviews%2Cwebsite%2Curl&language={lang}&place_id={placeId}",
+            projection=placeDetailsProjection,
+            deadline=deadline,
+        )
+
+        if googleResult.get("status") == "ZERO_RESULTS":
+            raise NoPlaceFoundException(placeId, "Place not found")
+        elif googleResult.get("status") != "OK":
+            raise GoogleCriticalErrorException(
+                "Google critical error; check the google key status."
+            )
+
+        details: dict = googleResult.get("result")
+
+        try:
+            insertPlaceDetails(
+                placeId,
+                lang,
+                details.get("formatted_address"),
+                details.get("formatted_phone_number"),
+                details.get("website"),
+                details.get("url"),
+                (
+                    dumps(details.get("opening_hours").get("weekday_text"))
+                    if details.get("opening_hours", {}).get("weekday_text") != None
+                    else None
+                ),
+                dumps(details.get("reviews")),
+                time(),
+            )
+        except OperationalError as error:
+            # The details were fetched anyway: they are shown without storing them.
+            incrementCounter("place_details.errors")
+            logger.warning(f"Unable to store the details of {placeId}: {error}")
+
+        return details
+
+    def evictStale(self) -> None:
+        """Removes the details older than `hardTimeToLive` seconds.
+
+        Meant to be run periodically rather than by the chats, since it scans the whole table.
+        """
+        try:
+            removeStalePlaceDetails(time() - self.__hardTimeToLive)
+        except OperationalError as error:
+            incrementCounter("place_details.errors")
+            logger.warning(f"Unable to evict the stale details: {error}")
+
+
+__placeDetailsStore: PlaceDetailsStore = None
+__placeDetailsStoreLock = Lock()
+
+
+def placeDetailsStore() -> PlaceDetailsStore:
+    """Returns the place details store shared by all the chats, creating it on the first call."""
+    global __placeDetailsStore
+
+    with __placeDetailsStoreLock:
+        if __placeDetailsStore == None:
+            __placeDetailsStore = PlaceDetailsStore(
+                configValue("PLACE_DETAILS_SOFT_TTL_SECONDS", 86400.0),
+                configValue("PLACE_DETAILS_HARD_TTL_SECONDS", 2592000.0),
+                configValue("PLACE_DETAILS_REFRESH_WORKERS", 2),
+            )
+
+    return __placeDetailsStore
@@ -0,0 +1,100 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+"""Projections of the Places API responses on the fields actually read by the bot.
+
+They are applied once, right after decoding (see `AsyncUpstreamClient.getJson`), so that the large blobs never read
+(`photos`, `plus_code`, `viewport`, ...) are dropped immediately and never stored in the caches. The records keep the
+shape of the original responses.
+"""
+
+
+def __pick(source: dict, keys: tuple) -> dict:
+    """Returns the entries of `source` with the given keys, skipping the missing ones."""
+    return {key: source[key] for key in keys if key in source}
+
+
+def __location(place: dict) -> dict:
+    return {
+        "location": __pick(
+            place.get("geometry", {}).get("location", {}), ("lat", "lng")
+        )
+    }
+
+
+def findPlaceProjection(response: dict) -> dict:
+    """Projection of a Find Place from Text response: status and name and location of the candidates."""
+    projection = __pick(response, ("status",))
+    if "candidates" in response:
+        projection["candidates"] = [
+            {"name": candidate.get("name"), "geometry": __location(candidate)}
+            for candidate in response.get("candidates")
+        ]
+
+    return projection
+
+
+def nearbySearchProjection(response: dict) -> dict:
+    """Projection of a Nearby Search response: status, next page token and the infos of the restaurants shown and
+    stored in the catalog."""
+    projection = __pick(response, ("status", "next_page_token"))
+    if "results" in response:
+        projection["results"] = [
+            {
+                **__pick(
+                    result,
+                    (
+                        "name",
+                        "place_id",
+                        "price_level",
+                        "rating",
+                        "user_ratings_total",
+                        "types",
+                    ),
+                ),
+                "geometry": __location(result),
+            }
+            for result in response.get("results")
+        ]
+
+    return projection
+
+
+def placeDetailsProjection(response: dict) -> dict:
+    """Projection of a Place Details response: status and the details shown in the restaurant card."""
+    projection = __pick(response, ("status",))
+    if "result" in response:
+        result = response.get("result")
+        projection["result"] = __pick(
+            result, ("formatted_address", "formatted_phone_number", "website", "url")
+        )
+        if "weekday_text" in result.get("opening_hours", {}):
+            projection["result"]["opening_hours"] = __pick(
+                result.get("opening_hours"), ("weekday_text",)
+            )
+        projection["result"]["reviews"] = [
+            __pick(review, ("author_name", "rating", "text", "time"))
+            for review in result.get("reviews", [])
+        ]
+
+    return projection
@@ -0,0 +1,319 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from json import dumps
+from math import floor
+from sqlite3 import OperationalError
+from threading import Lock
+from time import time
+
+from data import (
+    fetchCatalogPlaces,
+    fetchTileCoverage,
+    insertCatalogPlaces,
+    insertTileCoverage,
+    removePlaceTags,
+    removeStaleCatalog,
+)
+from utils.config import configValue
+from utils.deadline import Deadline
+from utils.geo import boundingBox, filterWithinRadius
+from utils.metrics import incrementCounter
+
+
+class RestaurantCatalog:
+    """A persistent catalog of the restaurants returned by the Nearby Searches, which answers the researches of the
+    areas already researched without contacting Google.
+
+    The map is split in square tiles of `tileSize` degrees. A research covers the tiles lying entirely within its radius
+    only if Google returned all the restaurants matching it, i.e. the response has no following page, and if it was not
+    restricted to the open restaurants, which change during the day. A research with the same keyword, maximum price and
+    language whose circle only touches tiles covered less than `timeToLive` seconds ago is answered from the catalog.
+    The outcomes are counted in the metrics as `catalog.hits` and `catalog.misses`.
+
+    Attributes
+    ----------
+    :attr:`__tileSize` : float
+        size in degrees of the side of a tile
+    :attr:`__timeToLive` : float
+        seconds after which the coverage of a tile expires, 0 to disable the catalog
+    """
+
+    def __init__(self, tileSize: float, timeToLive: float) -> None:
+        self.__tileSize = tileSize
+        self.__timeToLive = timeToLive
+
+    def tile(self, position: tuple) -> tuple:
+        """Returns the (row, column) of the tile containing the given (latitude, longitude) position."""
+        return (
+            floor(position[0] / self.__tileSize),
+            floor(position[1] / self.__tileSize),
+        )
+
+    def search(
+        self,
+        origin: tuple,
+        radius: float,
+        keyword: str,
+        maxPrice: int,
+        lang: str,
+        deadline: Deadline = None,
+    ) -> dict:
+        """Returns the restaurants matching a research from the catalog, if its whole area is covered.
+
+        Args:
+            origin (tuple): (latitude, longitude) of the research location
+            radius (float): the research radius, in meters
+            keyword (str): the canonical keyword of the research
+            maxPrice (int): the maximum price level of the research
+            lang (str): the language of the research
+            deadline (Deadline, optional): the deadline bounding the wait for the database. Defaults to None.
+
+        Returns:
+            dict: the restaurants within the radius, shaped as a projected Nearby Search response (see
+                  `nearbySearchProjection`) with the `OK` or `ZERO_RESULTS` status. None if some tile of the area has not
+                  been covered recently, or if the database stays locked by another connection.
+        """
+        if self.__timeToLive <= 0:
+            return None
+
+        try:
+            return self.__search(origin, radius, keyword, maxPrice, lang, deadline)
+        except OperationalError:
+            # The database is locked by a background write (e.g. `record`): Google is queried rather than waited for.
+            incrementCounter("catalog.errors")
+            return None
+
+    def __search(
+        self,
+        origin: tuple,
+        radius: float,
+        keyword: str,
+        maxPrice: int,
+        lang: str,
+        deadline: Deadline,
+    ) -> dict:
+
+        tiles = self.__tilesTouching(origin, radius)
+        rows = [row for (row, _) in tiles]
+        columns = [column for (_, column) in tiles]
+        minFetchedAt = time() - self.__timeToLive
+        coveredTiles = {
+            (row, column)
+            for (row, column, fetchedAt) in fetchTileCoverage(
+                keyword,
+                maxPrice,
+                lang,
+                min(rows),
+                max(rows),
+                min(columns),
+                max(columns),
+                deadline,
+            )
+            if fetchedAt >= minFetchedAt
+        }
+        if not tiles <= coveredTiles:
+            incrementCounter("catalog.misses")
+            return None
+
+        places = fetchCatalogPlaces(
+            keyword, maxPrice, lang, *boundingBox(origin, radius), deadline
+        )
+        places = [
+            places[placeIndex]
+            for placeIndex in filterWithinRadius(
+                origin, [(place[2], place[3]) for place in places], radius
+            )
+        ]
+        # Google sorts the results by prominence, the number of ratings is the closest known measure of it.
+        places.sort(key=lambda place: (place[6] or 0, place[5] or 0), reverse=True)
+
+        incrementCounter("catalog.hits")
+        return {
+            "status": "OK" if len(places) > 0 else "ZERO_RESULTS",
+            "results": [self.__result(place) for place in places],
+        }
+
+    def record(
+        self,
+        response: dict,
+        keyword: str,
+        maxPrice: int,
+        lang: str,
+        researchArea: tuple = None,
+        openNow: bool = False,
+    ) -> None:
+        """Stores the restaurants of a Nearby Search response in the catalog and, if the response is complete, marks the
+        tiles inside the research area as covered.
+
+        Args:
+            response (dict): the projected Nearby Search response
+            keyword (str): the canonical keyword of the research
+            maxPrice (int): the maximum price level of the research
+            lang (str): the language of the research
+            researchArea (tuple, optional): (origin, radius in meters) of the research. Defaults to None, for the
+                                            following pages of a research, which never cover any tile.
+            openNow (bool, optional): whether only the open restaurants were searched. Defaults to False.
+        """
+        if self.__timeToLive <= 0 or response.get("status") not in (
+            "OK",
+            "ZERO_RESULTS",
+        ):
+            return
+
+        now = time()
+        results = response.get("results", [])
+        insertCatalogPlaces(
+            [
+                (
+                    result.get("place_id"),
+                    result.get("name"),
+                    result.get("geometry").get("location").get("lat"),
+                    result.get("geometry").get("location").get("lng"),
+                    result.get("price_level"),
+                    result.get("rating"),
+                    result.get("user_ratings_total"),
+                    dumps(result.get("types", [])),
+                )
+                for result in results
+            ],
+            keyword,
+            maxPrice,
+            lang,
+            now,
+        )
+
+        if researchArea != None and not openNow and "next_page_token" not in response:
+            origin, radius = researchArea
+            coveredTiles = self.__tilesInside(origin, radius)
+
+            # The restaurants of the covered tiles which were not returned do not match the research anymore.
+            returnedPlaces = {result.get("place_id") for result in results}
+            removePlaceTags(
+                [
+                    placeId
+                    for (placeId, _, latitude, longitude, *_) in fetchCatalogPlaces(
+                        keyword, maxPrice, lang, *boundingBox(origin, radius)
+                    )
+                    if placeId not in returnedPlaces
+                    and self.tile((latitude, longitude)) in coveredTiles
+                ],
+                keyword,
+                maxPrice,
+                lang,
+            )
+            insertTileCoverage(list(coveredTiles), keyword, maxPrice, lang, now)
+
+        removeStaleCatalog(now - self.__timeToLive)
+
+    def __tilesTouching(self, origin: tuple, radius: float) -> set:
+        """Returns the tiles which have at least a point within `radius` meters from the origin."""
+        tiles = self.__tilesAround(origin, radius)
+
+        # The point of a tile closest to the origin is the origin itself, clamped to the boundaries of the tile.
+        closestPoints = [
+            (
+                min(max(origin[0], row * self.__tileSize), (row + 1) * self.__tileSize),
+                min(
+                    max(origin[1], column * self.__tileSize),
+                    (column + 1) * self.__tileSize,
+                ),
+            )
+            for (row, column) in tiles
+        ]
+        return {
+            tiles[tileIndex]
+            for tileIndex in filterWithinRadius(origin, closestPoints, radius)
+        }
+
+    def __tilesInside(self, origin: tuple, radius: float) -> set:
+        """Returns the tiles whose points are all within `radius` meters from the origin."""
+        tiles = self.__tilesAround(origin, radius)
+
+        corners = [
+            (
+                (row + rowOffset) * self.__tileSize,
+                (column + columnOffset) * self.__tileSize,
+            )
+            for (row, column) in tiles
+            for rowOffset in (0, 1)
+            for columnOffset in (0, 1)
+        ]
+        cornersInside = set(filterWithinRadius(origin, corners, radius))
+        # The corners of each tile are consecutive: a tile is inside the circle if its four corners are.
+        return {
+            tiles[tileIndex]
+            for tileIndex in range(len(tiles))
+            if all(
+                cornerIndex in cornersInside
+                for cornerIndex in range(4 * tileIndex, 4 * tileIndex + 4)
+            )
+        }
+
+    def __tilesAround(self, origin: tuple, radius: float) -> list:
+        """Returns the tiles overlapping the bounding box of the circle given."""
+        minLatitude, maxLatitude, minLongitude, maxLongitude = boundingBox(
+            origin, radius
+        )
+        minRow, minColumn = self.tile((minLatitude, minLongitude))
+        maxRow, maxColumn = self.tile((maxLatitude, maxLongitude))
+
+        return [
+            (row, column)
+            for row in range(minRow, maxRow + 1)
+            for column in range(minColumn, maxColumn + 1)
+        ]
+
+    @staticmethod
+    def __result(place: tuple) -> dict:
+        """Returns a row of the catalog shaped as a result of a projected Nearby Search response."""
+        placeId, name, latitude, longitude, priceLevel, rating, userRatingsTotal = place
+        result = {
+            "name": name,
+            "place_id": placeId,
+            "price_level": priceLevel,
+            "rating": rating,
+            "user_ratings_total": userRatingsTotal,
+        }
+        result = {key: value for key, value in result.items() if value != None}
+        result["geometry"] = {"location": {"lat": latitude, "lng": longitude}}
+
+        return result
+
+
+__restaurantCatalog: RestaurantCatalog = None
+__restaurantCatalogLock = Lock()
+
+
+def restaurantCatalog() -> RestaurantCatalog:
+    """Returns the restaurant catalog shared by all the researches, creating it on the first call."""
+    global __restaurantCatalog
+
+    with __restaurantCatalogLock:
+        if __restaurantCatalog == None:
+            __restaurantCatalog = RestaurantCatalog(
+                configValue("CATALOG_TILE_DEGREES", 0.002),
+                configValue("CATALOG_TTL_SECONDS", 604800.0),
+            )
+
+    return __restaurantCatalog
@@ -0,0 +1,10 @@
+from .travel_mode import TravelMode
+from .routing_backend import UNREACHABLE, RoutingBackend
+from .mapbox_router import MapboxRouter, mapboxCircuitBreaker
+from .osrm_router import OsrmRouter, osrmCircuitBreaker
+from .estimate_router import EstimateRouter
+from .router_factory import routingBackend
+from .routing_executor import RoutingExecutor, routingExecutor
+from .route_cache import RouteCache, routeCache
+from .reachable_area import reachableAreaAsync
+from .travel_time_grid import TravelTimeGrid, travelTimeGrid
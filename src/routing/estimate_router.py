@@ -0,0 +1,85 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from routing.routing_backend import RoutingBackend
+from routing.travel_mode import TravelMode
+from utils.config import configValue
+from utils.geo import haversineDistance
+
+
+class EstimateRouter(RoutingBackend):
+    """Estimates the distance and the time needed to reach a destination, without contacting any routing service.
+
+    The distance is the straight-line distance multiplied by a detour factor, which accounts for the streets not being
+    straight; the time is obtained from that distance with an average speed. Both depend on the travel mode and can be
+    tuned through the `ROUTING_<MODE>_DETOUR_FACTOR` and `ROUTING_<MODE>_SPEED_KMH` configuration parameters.
+
+    Since nothing has to be awaited, `route` and `matrix` compute the estimates directly, without the event loop.
+    """
+
+    # Since no request is sent, there is no limit on the number of destinations.
+    MATRIX_MAX_DESTINATIONS = 1000
+
+    __DEFAULT_PROFILES = {
+        TravelMode.WALKING: (1.3, 4.8),
+        TravelMode.DRIVING: (1.4, 25.0),
+    }
+
+    @property
+    def estimated(self) -> bool:
+        return True
+
+    def route(
+        self, origin: tuple, destination: tuple, travelMode: TravelMode
+    ) -> tuple:
+        (detourFactor, speedInKmh) = self.__profile(travelMode)
+        distance = haversineDistance(origin, destination) * detourFactor
+
+        return (distance, distance / (speedInKmh / 3.6))
+
+    def matrix(
+        self, origin: tuple, destinations: list, travelMode: TravelMode
+    ) -> list:
+        return [
+            self.route(origin, destination, travelMode) for destination in destinations
+        ]
+
+    async def routeAsync(
+        self, origin: tuple, destination: tuple, travelMode: TravelMode
+    ) -> tuple:
+        return self.route(origin, destination, travelMode)
+
+    async def matrixAsync(
+        self, origin: tuple, destinations: list, travelMode: TravelMode
+    ) -> list:
+        return self.matrix(origin, destinations, travelMode)
+
+    def __profile(self, travelMode: TravelMode) -> tuple:
+        (defaultDetourFactor, defaultSpeedInKmh) = self.__DEFAULT_PROFILES[travelMode]
+
+        return (
+            configValue(
+                f"ROUTING_{travelMode.name}_DETOUR_FACTOR", defaultDetourFactor
+            ),
+            configValue(f"ROUTING_{travelMode.name}_SPEED_KMH", defaultSpeedInKmh),
+        )
@@ -0,0 +1,143 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from custom_exceptions import RoutingErrorException
+from routing.routing_backend import UNREACHABLE, RoutingBackend
+from routing.travel_mode import TravelMode
+from upstream import apiKeyPool
+from utils.api_key import Service
+from utils.circuit_breaker import CircuitBreaker
+from utils.config import configValue
+
+# Shared by all the researches: while Mapbox is failing, the routes are estimated without contacting it.
+mapboxCircuitBreaker = CircuitBreaker(
+    "mapbox",
+    configValue("MAPBOX_BREAKER_FAILURE_THRESHOLD", 5),
+    configValue("MAPBOX_BREAKER_RESET_SECONDS", 30.0),
+)
+
+
+class MapboxRouter(RoutingBackend):
+    """Computes the routes through the Mapbox Matrix API (`matrixAsync`) and the Mapbox Directions API (`routeAsync`).
+
+    It also computes the area reachable from a position through the Mapbox Isochrone API (`isochroneAsync`).
+
+    Every request goes through `mapboxCircuitBreaker`, and takes its access token from the pool of Mapbox keys.
+    """
+
+    API_KEY_PARAMETER = "access_token"
+
+    # The Matrix API accepts at most 25 coordinates per request, one of them is the origin.
+    MATRIX_MAX_DESTINATIONS = 24
+
+    # The Isochrone API accepts contours of at most 100 km.
+    ISOCHRONE_MAX_METERS = 100000
+
+    # Response codes meaning that the destination cannot be reached, rather than that the request failed.
+    __NO_ROUTE_CODES = ("NoRoute", "NoSegment")
+
+    def __init__(self) -> None:
+        super().__init__(mapboxCircuitBreaker, apiKeyPool(Service.MAPBOX))
+
+    async def routeAsync(
+        self, origin: tuple, destination: tuple, travelMode: TravelMode
+    ) -> tuple:
+        mapboxResponse = await self.fetchResponseAsync(
+            f"https://api.mapbox.com/directions/v5/{travelMode.value}/{origin[1]},{origin[0]};{destination[1]},{destination[0]}?overview=false&steps=false",
+            self.__NO_ROUTE_CODES,
+            projection=self.routesProjection,
+            endpoint="mapbox.route",
+        )
+
+        if mapboxResponse.get("code") in self.__NO_ROUTE_CODES:
+            return (UNREACHABLE, UNREACHABLE)
+        else:
+            return (
+                mapboxResponse.get("routes")[0].get("distance"),
+                mapboxResponse.get("routes")[0].get("duration"),
+            )
+
+    async def isochroneAsync(
+        self, origin: tuple, travelMode: TravelMode, distanceInMeters: int
+    ) -> list:
+        """Computes the area which can be reached from the origin travelling at most `distanceInMeters` meters, through
+        the Mapbox Isochrone API.
+
+        Args:
+            origin (tuple): (latitude, longitude) of the starting position
+            travelMode (TravelMode): the way the area is travelled
+            distanceInMeters (int): the maximum distance travelled, at most 100 km
+
+        Raises:
+            RoutingErrorException: raised when Mapbox is not able to compute the area or it is unavailable.
+
+        Returns:
+            list: the rings of the polygon, each one a list of (latitude, longitude) vertices. The first ring is the
+                  outer boundary, the following ones are holes.
+        """
+        if distanceInMeters > self.ISOCHRONE_MAX_METERS:
+            raise RoutingErrorException(
+                f"The isochrone distance cannot exceed {self.ISOCHRONE_MAX_METERS} meters."
+            )
+
+        mapboxResponse = await self.fetchResponseAsync(
+            f"https://api.mapbox.com/isochrone/v1/{travelMode.value}/{origin[1]},{origin[0]}?contours_meters={int(distanceInMeters)}&polygons=true&denoise=1",
+            (),
+            endpoint="mapbox.isochrone",
+        )
+
+        if len(mapboxResponse.get("features", [])) == 0:
+            raise RoutingErrorException("Mapbox returned an empty isochrone.")
+
+        # GeoJSON coordinates are (longitude, latitude) pairs.
+        rings = mapboxResponse.get("features")[0].get("geometry").get("coordinates")
+        return [
+            [(latitude, longitude) for (longitude, latitude) in ring] for ring in rings
+        ]
+
+    async def matrixAsync(
+        self, origin: tuple, destinations: list, travelMode: TravelMode
+    ) -> list:
+        coordinates = ";".join(
+            f"{longitude},{latitude}"
+            for (latitude, longitude) in [origin] + destinations
+        )
+        destinationsIndexes = ";".join(str(i) for i in range(1, len(destinations) + 1))
+
+        mapboxResponse = await self.fetchResponseAsync(
+            f"https://api.mapbox.com/directions-matrix/v1/{travelMode.value}/{coordinates}?sources=0&destinations={destinationsIndexes}&annotations=distance,duration",
+            (),
+            projection=self.routesProjection,
+            endpoint="mapbox.matrix",
+        )
+
+        # The matrix has a single row since the origin is the only source. A null cell means that no route was found.
+        return [
+            (
+                distance if distance != None else UNREACHABLE,
+                duration if duration != None else UNREACHABLE,
+            )
+            for (distance, duration) in zip(
+                mapboxResponse.get("distances")[0], mapboxResponse.get("durations")[0]
+            )
+        ]
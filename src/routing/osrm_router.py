@@ -0,0 +1,105 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from routing.routing_backend import UNREACHABLE, RoutingBackend
+from routing.travel_mode import TravelMode
+from utils.circuit_breaker import CircuitBreaker
+from utils.config import configValue
+
+# Shared by all the researches: while the OSRM server is failing, the routes are estimated without contacting it.
+osrmCircuitBreaker = CircuitBreaker(
+    "osrm",
+    configValue("OSRM_BREAKER_FAILURE_THRESHOLD", 5),
+    configValue("OSRM_BREAKER_RESET_SECONDS", 30.0),
+)
+
+
+class OsrmRouter(RoutingBackend):
+    """Computes the routes through a self-hosted OSRM server, using the Table service (`matrixAsync`) and the Route service (`routeAsync`).
+
+    An OSRM server routes a single profile, so walking and driving routes can be served by two different servers, whose
+    base urls are set with `OSRM_WALKING_URL` and `OSRM_DRIVING_URL` (by default both point to http://127.0.0.1:5000).
+    Every request goes through `osrmCircuitBreaker`.
+    """
+
+    __PROFILES = {
+        TravelMode.WALKING: "foot",
+        TravelMode.DRIVING: "driving",
+    }
+
+    # Response codes meaning that the destination cannot be reached, rather than that the request failed.
+    __NO_ROUTE_CODES = ("NoRoute", "NoSegment")
+
+    def __init__(self) -> None:
+        super().__init__(osrmCircuitBreaker)
+        # The Table service of OSRM accepts at most --max-table-size coordinates (100 by default), one of them is the origin.
+        self.MATRIX_MAX_DESTINATIONS = configValue("OSRM_MAX_TABLE_SIZE", 100) - 1
+
+    async def routeAsync(
+        self, origin: tuple, destination: tuple, travelMode: TravelMode
+    ) -> tuple:
+        osrmResponse = await self.fetchResponseAsync(
+            f"{self.__baseUrl(travelMode)}/route/v1/{self.__PROFILES[travelMode]}/{origin[1]},{origin[0]};{destination[1]},{destination[0]}?overview=false",
+            self.__NO_ROUTE_CODES,
+            projection=self.routesProjection,
+            endpoint="osrm.route",
+        )
+
+        if osrmResponse.get("code") in self.__NO_ROUTE_CODES:
+            return (UNREACHABLE, UNREACHABLE)
+        else:
+            return (
+                osrmResponse.get("routes")[0].get("distance"),
+                osrmResponse.get("routes")[0].get("duration"),
+            )
+
+    async def matrixAsync(
+        self, origin: tuple, destinations: list, travelMode: TravelMode
+    ) -> list:
+        coordinates = ";".join(
+            f"{longitude},{latitude}" for (latitude, longitude) in [origin] + destinations
+        )
+        destinationsIndexes = ";".join(str(i) for i in range(1, len(destinations) + 1))
+
+        osrmResponse = await self.fetchResponseAsync(
+            f"{self.__baseUrl(travelMode)}/table/v1/{self.__PROFILES[travelMode]}/{coordinates}?sources=0&destinations={destinationsIndexes}&annotations=distance,duration",
+            (),
+            projection=self.routesProjection,
+            endpoint="osrm.matrix",
+        )
+
+        # The table has a single row since the origin is the only source. A null cell means that no route was found.
+        return [
+            (
+                distance if distance != None else UNREACHABLE,
+                duration if duration != None else UNREACHABLE,
+            )
+            for (distance, duration) in zip(
+                osrmResponse.get("distances")[0], osrmResponse.get("durations")[0]
+            )
+        ]
+
+    def __baseUrl(self, travelMode: TravelMode) -> str:
+        return configValue(
+            f"OSRM_{travelMode.name}_URL", "http://127.0.0.1:5000"
+        ).rstrip("/")
@@ -0,0 +1,69 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from routing.mapbox_router import MapboxRouter
+from routing.travel_mode import TravelMode
+from utils.config import configValue
+from utils.lru_cache import LRUCache
+
+# The areas are shared by close starting positions: the error introduced is at most the size of a grid cell,
+# which is negligible with respect to the distances travelled to reach a restaurant.
+__reachableAreasCache = LRUCache(
+    "isochrone_cache",
+    configValue("ISOCHRONE_CACHE_MAX_ENTRIES", 1000),
+    configValue("ISOCHRONE_CACHE_TTL_SECONDS", 86400.0),
+)
+
+
+async def reachableAreaAsync(
+    origin: tuple, travelMode: TravelMode, distanceInMeters: int
+) -> list:
+    """Returns the area which can be reached from the origin travelling at most `distanceInMeters` meters.
+
+    The areas are cached, so that changing the food or the price of a research does not fetch the same area again.
+
+    Args:
+        origin (tuple): (latitude, longitude) of the starting position
+        travelMode (TravelMode): the way the area is travelled
+        distanceInMeters (int): the maximum distance travelled
+
+    Raises:
+        RoutingErrorException: raised when the area cannot be computed.
+
+    Returns:
+        list: the rings of the polygon, each one a list of (latitude, longitude) vertices (see `MapboxRouter.isochroneAsync`).
+    """
+    cellSize = configValue("ISOCHRONE_CACHE_CELL_DEGREES", 0.001)
+    key = (
+        round(origin[0] / cellSize),
+        round(origin[1] / cellSize),
+        travelMode.value,
+        int(distanceInMeters),
+    )
+
+    area = __reachableAreasCache.get(key)
+    if area == None:
+        area = await MapboxRouter().isochroneAsync(origin, travelMode, distanceInMeters)
+        __reachableAreasCache.put(key, area)
+
+    return area
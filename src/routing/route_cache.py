@@ -0,0 +1,172 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from logging import getLogger
+from sqlite3 import OperationalError
+from threading import Lock
+from time import time
+
+from data import (
+    fetchCachedRoutes,
+    insertCachedRoutes,
+    updateCachedRoutesUsage,
+    removeStaleCachedRoutes,
+)
+from routing.travel_mode import TravelMode
+from utils.config import configValue
+from utils.deadline import Deadline
+from utils.metrics import incrementCounter
+
+logger = getLogger(__name__)
+
+
+class RouteCache:
+    """A persistent cache of the routes computed towards the restaurants, stored in the `route_cache` table.
+
+    A route is identified by the grid cell of its origin, the place id of its destination and its travel profile, so
+    that researches started a few meters apart share the same routes.
+
+    Attributes
+    ----------
+    :attr:`__cellSize` : float
+        size in degrees of the side of a grid cell
+    :attr:`__timeToLive` : float
+        seconds after which a cached route expires
+    :attr:`__maxEntries` : int
+        maximum number of routes kept, the least recently used ones are evicted first
+    """
+
+    def __init__(self, cellSize: float, timeToLive: float, maxEntries: int) -> None:
+        self.__cellSize = cellSize
+        self.__timeToLive = timeToLive
+        self.__maxEntries = maxEntries
+
+    def originCell(self, origin: tuple) -> str:
+        """Returns the identifier of the grid cell containing the (latitude, longitude) origin given."""
+        return (
+            f"{round(origin[0] / self.__cellSize)}:{round(origin[1] / self.__cellSize)}"
+        )
+
+    def get(
+        self,
+        origin: tuple,
+        placeIds: list,
+        travelMode: TravelMode,
+        deadline: Deadline = None,
+    ) -> dict:
+        """Returns the cached routes from the origin towards the places given.
+
+        Args:
+            origin (tuple): (latitude, longitude) of the starting position
+            placeIds (list): the place ids of the destinations
+            travelMode (TravelMode): the way the destinations are reached
+            deadline (Deadline, optional): the deadline bounding the wait for the database. Defaults to None.
+
+        Returns:
+            dict: place_id -> (distance in meters, duration in seconds) for each cached route. The routes are all
+                  missing if the database stays locked by another connection.
+        """
+        now = time()
+        originCell = self.originCell(origin)
+        try:
+            result = {
+                placeId: (distance, duration)
+                for (placeId, distance, duration) in fetchCachedRoutes(
+                    originCell,
+                    travelMode.value,
+                    placeIds,
+                    now - self.__timeToLive,
+                    deadline,
+                )
+            }
+
+            if len(result) > 0:
+                updateCachedRoutesUsage(
+                    originCell, travelMode.value, list(result), now, deadline
+                )
+        except OperationalError:
+            # The database is locked by a background write: the routes are computed again rather than waited for.
+            incrementCounter("route_cache.errors")
+            result = {}
+        incrementCounter("route_cache.hits", len(result))
+        incrementCounter("route_cache.misses", len(set(placeIds)) - len(result))
+
+        return result
+
+    def put(self, origin: tuple, routes: dict, travelMode: TravelMode) -> None:
+        """Stores the routes computed from the origin. The routes are not stored if the database stays locked by another
+        connection.
+
+        Args:
+            origin (tuple): (latitude, longitude) of the starting position
+            routes (dict): place_id -> (distance in meters, duration in seconds)
+            travelMode (TravelMode): the way the destinations are reached
+        """
+        if len(routes) == 0:
+            return
+
+        now = time()
+        try:
+            insertCachedRoutes(
+                self.originCell(origin),
+                travelMode.value,
+                [
+                    (placeId, distance, duration)
+                    for placeId, (distance, duration) in routes.items()
+                ],
+                now,
+            )
+        except OperationalError as error:
+            # The routes were computed anyway: the research goes on without caching them.
+            incrementCounter("route_cache.errors")
+            logger.warning(f"Unable to cache the routes: {error}")
+
+    def evictStale(self) -> None:
+        """Removes the expired routes and the least recently used ones exceeding `maxEntries`.
+
+        Meant to be run periodically rather than by the researches, since it scans the whole table.
+        """
+        try:
+            removeStaleCachedRoutes(time() - self.__timeToLive, self.__maxEntries)
+        except OperationalError as error:
+            incrementCounter("route_cache.errors")
+            logger.warning(f"Unable to evict the stale routes: {error}")
+
+
+__routeCache: RouteCache = None
+__routeCacheLock = Lock()
+
+
+def routeCache() -> RouteCache:
+    """Returns the route cache shared by all the researches, creating it on the first call."""
+    global __routeCache
+
+    with __routeCacheLock:
+        if __routeCache == None:
+            __routeCache = RouteCache(
+                configValue("ROUTE_CACHE_CELL_DEGREES", 0.001),
+                configValue("ROUTE_CACHE_TTL_SECONDS", 604800.0),
+                configValue("ROUTE_CACHE_MAX_ENTRIES", 50000),
+            )
+
+    return __routeCache
@@ -0,0 +1,53 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from routing.estimate_router import EstimateRouter
+from routing.mapbox_router import MapboxRouter
+from routing.osrm_router import OsrmRouter
+from routing.routing_backend import RoutingBackend
+from utils.config import configValue
+
+__BACKENDS = {
+    "mapbox": MapboxRouter,
+    "osrm": OsrmRouter,
+    "estimate": EstimateRouter,
+}
+
+
+def routingBackend() -> RoutingBackend:
+    """Returns the routing backend selected with the `ROUTING_BACKEND` configuration parameter.
+
+    The available backends are `mapbox` (default), `osrm` and `estimate`. If `ROUTING_ENABLED` is false the routes are
+    always estimated, whatever backend is selected.
+
+    Raises:
+        ValueError: raised when `ROUTING_BACKEND` does not match any available backend.
+    """
+    if not configValue("ROUTING_ENABLED", True):
+        return EstimateRouter()
+
+    backendName = configValue("ROUTING_BACKEND", "mapbox").strip().lower()
+    if backendName not in __BACKENDS:
+        raise ValueError(f"Unknown routing backend: {backendName}")
+
+    return __BACKENDS[backendName]()
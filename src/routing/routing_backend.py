@@ -0,0 +1,261 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from abc import ABC, abstractmethod
+from asyncio import CancelledError
+from requests import HTTPError, RequestException
+from json import loads
+
+from custom_exceptions import RoutingErrorException
+from routing.travel_mode import TravelMode
+from upstream import ApiKeyPool, asyncUpstreamClient
+from utils.circuit_breaker import CircuitBreaker
+
+# Distance (meters) and duration (seconds) assigned to a destination which cannot be reached.
+UNREACHABLE = 100000
+
+
+class RoutingBackend(ABC):
+    """A service computing the distance and the time needed to reach one or more destinations.
+
+    Usage:
+        * `matrixAsync` computes the routes from one origin to at most `MATRIX_MAX_DESTINATIONS` destinations with a single request.
+        * `routeAsync` computes a single route.
+        * `matrix` and `route` run them on the upstream event loop and wait for their result, for the synchronous callers.
+        * `routeMany` splits any number of destinations in chunks routed through `matrix`. If `matrix` fails for a chunk,
+          the destinations of that chunk are routed one by one through `route`.
+
+    Subclasses contacting a remote service can use `fetchResponseAsync`, which sends the requests through a circuit breaker.
+    If the service requires an API key, it is taken from the pool given, and sent as the `API_KEY_PARAMETER` query
+    parameter.
+    """
+
+    # Maximum number of destinations accepted by a single `matrix` call.
+    MATRIX_MAX_DESTINATIONS = 1
+
+    # Query parameter carrying the API key, if the service requires one.
+    API_KEY_PARAMETER = None
+
+    # HTTP status codes meaning that the API key used has run out of quota or is not authorized.
+    __KEY_ERROR_STATUS_CODES = (401, 403, 429)
+
+    def __init__(
+        self, circuitBreaker: CircuitBreaker = None, apiKeyPool: ApiKeyPool = None
+    ) -> None:
+        self.__circuitBreaker = circuitBreaker
+        self.__apiKeyPool = apiKeyPool
+
+    @property
+    def available(self) -> bool:
+        """False if the service is currently considered unavailable, because of too many failures."""
+        return (
+            self.__circuitBreaker == None
+            or self.__circuitBreaker.state != CircuitBreaker.OPEN
+        )
+
+    @property
+    def estimated(self) -> bool:
+        """True if the routes are estimated rather than computed on the actual streets."""
+        return False
+
+    @abstractmethod
+    async def routeAsync(
+        self, origin: tuple, destination: tuple, travelMode: TravelMode
+    ) -> tuple:
+        """Computes the route between two points.
+
+        Args:
+            origin (tuple): (latitude, longitude) of the starting position
+            destination (tuple): (latitude, longitude) of the destination
+            travelMode (TravelMode): the way the destination is reached
+
+        Raises:
+            RoutingErrorException: raised when the route cannot be computed because of the service.
+
+        Returns:
+            tuple: (distance in meters, duration in seconds). (`UNREACHABLE`, `UNREACHABLE`) if no route exists.
+        """
+        pass
+
+    @abstractmethod
+    async def matrixAsync(
+        self, origin: tuple, destinations: list, travelMode: TravelMode
+    ) -> list:
+        """Computes the routes between one origin and at most `MATRIX_MAX_DESTINATIONS` destinations with a single request.
+
+        Args:
+            origin (tuple): (latitude, longitude) of the starting position
+            destinations (list): list of (latitude, longitude) of the destinations
+            travelMode (TravelMode): the way the destinations are reached
+
+        Raises:
+            RoutingErrorException: raised when the routes cannot be computed because of the service.
+
+        Returns:
+            list: a (distance in meters, duration in seconds) tuple for each destination, in the same order of `destinations`.
+        """
+        pass
+
+    def route(
+        self, origin: tuple, destination: tuple, travelMode: TravelMode
+    ) -> tuple:
+        """Computes the route between two points, waiting for `routeAsync`."""
+        return asyncUpstreamClient().run(
+            self.routeAsync(origin, destination, travelMode)
+        )
+
+    def matrix(
+        self, origin: tuple, destinations: list, travelMode: TravelMode
+    ) -> list:
+        """Computes the routes between one origin and at most `MATRIX_MAX_DESTINATIONS` destinations, waiting for `matrixAsync`."""
+        return asyncUpstreamClient().run(
+            self.matrixAsync(origin, destinations, travelMode)
+        )
+
+    def routeMany(
+        self, origin: tuple, destinations: list, travelMode: TravelMode
+    ) -> list:
+        """Computes the routes between one origin and many destinations.
+
+        Args:
+            origin (tuple): (latitude, longitude) of the starting position
+            destinations (list): list of (latitude, longitude) of the destinations
+            travelMode (TravelMode): the way the destinations are reached
+
+        Raises:
+            RoutingErrorException: raised when both `matrix` and `route` fail.
+
+        Returns:
+            list: a (distance in meters, duration in seconds) tuple for each destination, in the same order of `destinations`.
+        """
+        result = []
+
+        for chunkStart in range(0, len(destinations), self.MATRIX_MAX_DESTINATIONS):
+            chunk = destinations[chunkStart : chunkStart + self.MATRIX_MAX_DESTINATIONS]
+            try:
+                result.extend(self.matrix(origin, chunk, travelMode))
+            except RoutingErrorException:
+                result.extend(
+                    self.route(origin, destination, travelMode) for destination in chunk
+                )
+
+        return result
+
+    @staticmethod
+    def routesProjection(response: dict) -> dict:
+        """Projection of a route or matrix response on its code, the distances and the durations."""
+        projection = {
+            key: response[key]
+            for key in ("code", "distances", "durations")
+            if key in response
+        }
+        if "routes" in response:
+            projection["routes"] = [
+                {"distance": route.get("distance"), "duration": route.get("duration")}
+                for route in response.get("routes")
+            ]
+
+        return projection
+
+    async def fetchResponseAsync(
+        self, url: str, noRouteCodes: tuple, endpoint: str, projection=None
+    ) -> dict:
+        """Performs a GET request through the circuit breaker and returns the parsed JSON response.
+
+        Args:
+            url (str): the url of the request, without the API key
+            noRouteCodes (tuple): the response codes, other than `Ok`, meaning that no route exists rather than an error
+            endpoint (str): the name of the endpoint (e.g. `mapbox.matrix`), whose response sizes are measured and whose
+                            requests can be hedged (see `AsyncUpstreamClient.getJson`)
+            projection (optional): function applied to the parsed response, see `AsyncUpstreamClient.getJson`
+
+        Raises:
+            RoutingErrorException: raised when the circuit breaker is open, the request fails or the service returns an error code.
+
+        Returns:
+            dict: the parsed response
+        """
+        if self.__circuitBreaker != None and not self.__circuitBreaker.allowRequest():
+            raise RoutingErrorException(
+                f"{self.__circuitBreaker.name} is temporarily unavailable."
+            )
+
+        try:
+            parsedResponse = await asyncUpstreamClient().getJson(
+                url,
+                endpoint,
+                projection=projection,
+                authorize=self.__authorize if self.__apiKeyPool != None else None,
+            )
+        except CancelledError:
+            # e.g. the routing budget expired: the request has no outcome.
+            if self.__circuitBreaker != None:
+                self.__circuitBreaker.recordCancellation()
+            raise
+        except HTTPError as error:
+            # Some services answer with a 4xx status code when no route exists.
+            try:
+                parsedResponse = loads(error.response.text)
+            except ValueError:
+                parsedResponse = {}
+
+            if parsedResponse.get("code") not in noRouteCodes:
+                self.__recordOutcome(False)
+                raise RoutingErrorException(
+                    f"Routing error: {error.response.status_code} {parsedResponse.get('code')}"
+                )
+        except (RequestException, ValueError) as error:
+            self.__recordOutcome(False)
+            raise RoutingErrorException(f"Routing request failed: {error}")
+        else:
+            # Responses without any code (e.g. GeoJSON) are accepted, since their status code is successful.
+            if parsedResponse.get("code", "Ok") not in ("Ok", *noRouteCodes):
+                self.__recordOutcome(False)
+                raise RoutingErrorException(
+                    f"Routing error: {parsedResponse.get('code')}"
+                )
+
+        self.__recordOutcome(True)
+        return parsedResponse
+
+    async def __authorize(self, url: str) -> tuple:
+        """Takes a key from the pool for each HTTP request actually sent, benching it if the service refuses it (see
+        `AsyncUpstreamClient.getJson`)."""
+        apiKey = self.__apiKeyPool.acquire()
+
+        def onResponse(response, parsedResponse: dict) -> None:
+            if response.status_code in self.__KEY_ERROR_STATUS_CODES:
+                self.__apiKeyPool.bench(apiKey)
+
+        return (
+            f"{url}{'&' if '?' in url else '?'}{self.API_KEY_PARAMETER}={apiKey}",
+            onResponse,
+        )
+
+    def __recordOutcome(self, isSuccess: bool) -> None:
+        if self.__circuitBreaker == None:
+            return
+        elif isSuccess:
+            self.__circuitBreaker.recordSuccess()
+        else:
+            self.__circuitBreaker.recordFailure()
@@ -0,0 +1,170 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+import logging
+
+from routing.routing_backend import RoutingBackend
+from routing.travel_mode import TravelMode
+from utils.config import configValue
+
+logger = logging.getLogger(__name__)
+
+
+class RoutingExecutor:
+    """Runs the routing requests of the researches concurrently on the upstream event loop.
+
+    Each call to `routeManyAsync` has its own wall-clock budget: the routes which are not computed when the budget
+    expires are returned as `None`, so that the caller can mark them as not available without waiting any longer.
+
+    Attributes
+    ----------
+    :attr:`__maxConcurrentRequests` : int
+        maximum number of routing requests in flight at the same time, shared by all the researches
+    :attr:`__requestsSemaphore` : asyncio.Semaphore
+        the semaphore enforcing `__maxConcurrentRequests`, created on the event loop
+    :attr:`__backgroundPool` : ThreadPoolExecutor
+        the pool running the routing jobs started by `runInBackground`
+    """
+
+    def __init__(self, maxConcurrentRequests: int, maxBackgroundWorkers: int) -> None:
+        self.__maxConcurrentRequests = maxConcurrentRequests
+        self.__requestsSemaphore = None
+        self.__backgroundPool = ThreadPoolExecutor(
+            max_workers=maxBackgroundWorkers, thread_name_prefix="background-routing"
+        )
+
+    def runInBackground(self, function, *args) -> Future:
+        """Runs `function(*args)` in background, without waiting for its completion.
+
+        Returns:
+            Future: the future of the job
+        """
+        future = self.__backgroundPool.submit(function, *args)
+        future.add_done_callback(self.__logBackgroundFailure)
+
+        return future
+
+    async def routeManyAsync(
+        self,
+        router: RoutingBackend,
+        origin: tuple,
+        destinations: list,
+        travelMode: TravelMode,
+        timeout: float,
+    ) -> list:
+        """Computes the routes between one origin and many destinations within `timeout` seconds.
+
+        The destinations are split in chunks which are routed concurrently through `router.matrixAsync`.
+        If a chunk fails, its destinations are routed concurrently one by one through `router.routeAsync`.
+
+        Args:
+            router (RoutingBackend): the backend used to compute the routes
+            origin (tuple): (latitude, longitude) of the starting position
+            destinations (list): list of (latitude, longitude) of the destinations
+            travelMode (TravelMode): the way the destinations are reached
+            timeout (float): the budget in seconds for the whole computation
+
+        Returns:
+            list: a (distance in meters, duration in seconds) tuple for each destination, in the same order of `destinations`.
+                  The element is `None` if the route was not computed before the budget expired or if its computation failed.
+        """
+        result: list = [None] * len(destinations)
+        if len(destinations) == 0:
+            return result
+
+        if self.__requestsSemaphore == None:
+            self.__requestsSemaphore = asyncio.Semaphore(self.__maxConcurrentRequests)
+
+        async def routeOne(index: int) -> None:
+            try:
+                async with self.__requestsSemaphore:
+                    result[index] = await router.routeAsync(
+                        origin, destinations[index], travelMode
+                    )
+            except Exception as error:
+                # The route is left as None, the caller decides how to replace it.
+                logger.warning("Routing failed: %s", error)
+
+        async def routeChunk(indexes: range) -> None:
+            try:
+                async with self.__requestsSemaphore:
+                    routes = await router.matrixAsync(
+                        origin, [destinations[i] for i in indexes], travelMode
+                    )
+            except Exception as error:
+                # The Matrix API failed, the destinations of the chunk are routed one by one.
+                logger.warning("Routing chunk failed (%s), routing one by one.", error)
+                await asyncio.gather(*(routeOne(i) for i in indexes))
+            else:
+                for i, route in zip(indexes, routes):
+                    result[i] = route
+
+        tasks = [
+            asyncio.ensure_future(
+                routeChunk(
+                    range(
+                        chunkStart,
+                        min(
+                            chunkStart + router.MATRIX_MAX_DESTINATIONS,
+                            len(destinations),
+                        ),
+                    )
+                )
+            )
+            for chunkStart in range(
+                0, len(destinations), router.MATRIX_MAX_DESTINATIONS
+            )
+        ]
+        (_, pending) = await asyncio.wait(tasks, timeout=timeout)
+
+        # The budget is over: the routes still being computed are dropped.
+        for task in pending:
+            task.cancel()
+
+        return list(result)
+
+    @staticmethod
+    def __logBackgroundFailure(future: Future) -> None:
+        if not future.cancelled() and future.exception() != None:
+            logger.error("Background routing failed", exc_info=future.exception())
+
+
+__routingExecutor: RoutingExecutor = None
+__routingExecutorLock = Lock()
+
+
+def routingExecutor() -> RoutingExecutor:
+    """Returns the routing executor shared by all the researches, creating it on the first call."""
+    global __routingExecutor
+
+    with __routingExecutorLock:
+        if __routingExecutor == None:
+            __routingExecutor = RoutingExecutor(
+                configValue("ROUTING_MAX_WORKERS", 8),
+                configValue("ROUTING_MAX_BACKGROUND_WORKERS", 2),
+            )
+
+    return __routingExecutor
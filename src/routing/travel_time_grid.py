@@ -0,0 +1,260 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from array import array
+from json import dump, load
+from logging import getLogger
+from os import listdir, path, remove, replace, stat
+from threading import Lock
+
+from routing.travel_mode import TravelMode
+from utils.config import configValue
+from utils.metrics import incrementCounter
+
+logger = getLogger(__name__)
+
+
+class TravelTimeGrid:
+    """A raster of the routes precomputed from the centre of some grid cells towards the known restaurants.
+
+    The grid is built offline by `build_travel_time_grid.py` and stored in a directory: `index.json` lists, for each
+    cell and travel profile, the place ids routed and the name of a binary file holding the distance and the duration
+    of each route as 32 bit floats, in the same order. Every origin inside a cell is given the routes computed from its
+    centre.
+
+    Attributes
+    ----------
+    :attr:`__directory` : str
+        directory containing the grid
+    :attr:`__cellSize` : float
+        size in degrees of the side of a grid cell. The one stored in the index, if any, takes precedence.
+    :attr:`__entries` : dict
+        the index of the grid, cell key -> {"fingerprint", "file", "places"}
+    :attr:`__loadedCells` : dict
+        cell key -> (place id -> position, routes array) of the covered cells already read from disk
+    :attr:`__indexModifiedAt` : float
+        modification time of the index currently loaded
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, directory: str, cellSize: float) -> None:
+        self.__directory = directory
+        self.__cellSize = cellSize
+        self.__entries: dict = {}
+        self.__loadedCells: dict = {}
+        self.__indexModifiedAt: float = None
+        self.__lock = Lock()
+
+    @property
+    def cellsize(self) -> float:
+        with self.__lock:
+            self.__reloadIndex()
+            return self.__cellSize
+
+    def cell(self, origin: tuple) -> tuple:
+        """Returns the (row, column) of the grid cell containing the (latitude, longitude) origin given."""
+        return (
+            round(origin[0] / self.__cellSize),
+            round(origin[1] / self.__cellSize),
+        )
+
+    def cellCentre(self, cell: tuple) -> tuple:
+        """Returns the (latitude, longitude) of the centre of the grid cell given."""
+        return (cell[0] * self.__cellSize, cell[1] * self.__cellSize)
+
+    def cellKey(self, cell: tuple, travelMode: TravelMode) -> str:
+        """Returns the key identifying the routes of a grid cell and a travel profile in the index."""
+        return f"{cell[0]}:{cell[1]}:{travelMode.name.lower()}"
+
+    def fingerprint(self, cell: tuple, travelMode: TravelMode) -> str:
+        """Returns the fingerprint of the places routed from the given cell, None if the cell is not covered."""
+        with self.__lock:
+            self.__reloadIndex()
+            return self.__entries.get(self.cellKey(cell, travelMode), {}).get(
+                "fingerprint"
+            )
+
+    def get(self, origin: tuple, placeIds: list, travelMode: TravelMode) -> dict:
+        """Returns the precomputed routes from the origin towards the places given.
+
+        Args:
+            origin (tuple): (latitude, longitude) of the starting position
+            placeIds (list): the place ids of the destinations
+            travelMode (TravelMode): the way the destinations are reached
+
+        Returns:
+            dict: place_id -> (distance in meters, duration in seconds) for each route found in the grid
+        """
+        with self.__lock:
+            self.__reloadIndex()
+            loadedCell = self.__loadCell(self.cellKey(self.cell(origin), travelMode))
+
+        result = {}
+        if loadedCell != None:
+            positions, routes = loadedCell
+            for placeId in placeIds:
+                position = positions.get(placeId)
+                if position != None:
+                    result[placeId] = (routes[2 * position], routes[2 * position + 1])
+
+        incrementCounter("travel_time_grid.hits", len(result))
+        incrementCounter("travel_time_grid.misses", len(set(placeIds)) - len(result))
+
+        return result
+
+    def store(
+        self, cell: tuple, travelMode: TravelMode, fingerprint: str, routes: list
+    ) -> None:
+        """Writes the routes computed from the centre of a cell. They become visible once `save` is called.
+
+        Args:
+            cell (tuple): (row, column) of the grid cell
+            travelMode (TravelMode): the way the destinations are reached
+            fingerprint (str): fingerprint of the places routed, used to detect the cells to be recomputed
+            routes (list): a (place_id, distance, duration) tuple for each route
+        """
+        cellKey = self.cellKey(cell, travelMode)
+        # The fingerprint is part of the file name, so the file read by a running bot is never overwritten.
+        fileName = f"{cellKey.replace(':', '_')}_{fingerprint[:16]}.bin"
+
+        with open(path.join(self.__directory, fileName), "wb") as gridFile:
+            array(
+                "f",
+                [
+                    value
+                    for (_, distance, duration) in routes
+                    for value in (distance, duration)
+                ],
+            ).tofile(gridFile)
+
+        with self.__lock:
+            self.__reloadIndex()
+            self.__entries[cellKey] = {
+                "fingerprint": fingerprint,
+                "file": fileName,
+                "places": [placeId for (placeId, _, _) in routes],
+            }
+
+    def clear(self, cellSize: float) -> None:
+        """Drops every cell of the grid and changes its cell size. The change becomes visible once `save` is called."""
+        with self.__lock:
+            self.__reloadIndex()
+            self.__cellSize = cellSize
+            self.__entries = {}
+            self.__loadedCells = {}
+
+    def save(self, cellKeys: set) -> None:
+        """Writes the index of the grid, keeping only the given cells, and removes the files no longer referenced.
+
+        Args:
+            cellKeys (set): keys (see `cellKey`) of the cells covered by the grid
+        """
+        with self.__lock:
+            self.__entries = {
+                cellKey: entry
+                for cellKey, entry in self.__entries.items()
+                if cellKey in cellKeys
+            }
+            indexPath = path.join(self.__directory, self.INDEX_FILE)
+            with open(indexPath + ".tmp", "w") as indexFile:
+                dump({"cell_size": self.__cellSize, "cells": self.__entries}, indexFile)
+            replace(indexPath + ".tmp", indexPath)
+            self.__indexModifiedAt = None
+
+            referencedFiles = {entry.get("file") for entry in self.__entries.values()}
+            for fileName in listdir(self.__directory):
+                if fileName.endswith(".bin") and fileName not in referencedFiles:
+                    remove(path.join(self.__directory, fileName))
+
+    def __reloadIndex(self) -> None:
+        """Reads the index again if it changed on disk since the last read. Must be called holding the lock."""
+        try:
+            modifiedAt = stat(path.join(self.__directory, self.INDEX_FILE)).st_mtime
+        except OSError:
+            return
+
+        if modifiedAt == self.__indexModifiedAt:
+            return
+
+        try:
+            with open(path.join(self.__directory, self.INDEX_FILE)) as indexFile:
+                index = load(indexFile)
+        except (OSError, ValueError) as error:
+            logger.warning(f"Unable to read the travel time grid index: {error}")
+            return
+
+        self.__cellSize = index.get("cell_size", self.__cellSize)
+        self.__entries = index.get("cells", {})
+        self.__loadedCells = {}
+        self.__indexModifiedAt = modifiedAt
+
+    def __loadCell(self, cellKey: str):
+        """Returns (place id -> position, routes array) of the given cell, reading it from disk on the first access.
+
+        Must be called holding the lock. None is returned if the cell is not covered by the grid.
+        """
+        entry = self.__entries.get(cellKey)
+        # The cells not covered are never cached, so that only the cells of the index can be kept in memory.
+        if entry == None:
+            return None
+        if cellKey in self.__loadedCells:
+            return self.__loadedCells.get(cellKey)
+
+        loadedCell = None
+        try:
+            routes = array("f")
+            with open(path.join(self.__directory, entry.get("file")), "rb") as gridFile:
+                routes.frombytes(gridFile.read())
+            loadedCell = (
+                {
+                    placeId: position
+                    for position, placeId in enumerate(entry.get("places"))
+                },
+                routes,
+            )
+        except OSError as error:
+            logger.warning(
+                f"Unable to read the travel time grid cell {cellKey}: {error}"
+            )
+
+        self.__loadedCells[cellKey] = loadedCell
+        return loadedCell
+
+
+__travelTimeGrid: TravelTimeGrid = None
+__travelTimeGridLock = Lock()
+
+
+def travelTimeGrid() -> TravelTimeGrid:
+    """Returns the travel time grid shared by all the researches, creating it on the first call."""
+    global __travelTimeGrid
+
+    with __travelTimeGridLock:
+        if __travelTimeGrid == None:
+            __travelTimeGrid = TravelTimeGrid(
+                configValue("TRAVEL_TIME_GRID_DIR", "travel_time_grid"),
+                configValue("TRAVEL_TIME_GRID_CELL_DEGREES", 0.0025),
+            )
+
+    return __travelTimeGrid
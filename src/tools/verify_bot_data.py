@@ -24,7 +24,8 @@
 from telegram import Update
 from telegram.ext import CallbackContext
 
-from data import fetchLang, insertChat
+# The data functions are looked up when called: data depends on the utils package, which imports this module.
+import data
 
 
 def verifyChatData(update: Update, context: CallbackContext) -> None:
@@ -37,12 +38,12 @@ def verifyChatData(update: Update, context: CallbackContext) -> None:
         context (CallbackContext): _description_
     """
     if context.chat_data.get("lang") == None:
-        chatLanguage = fetchLang(update.effective_chat.id)
+        chatLanguage = data.fetchLang(update.effective_chat.id)
 
         if chatLanguage:
             context.chat_data.update({"lang": chatLanguage[0]})
         else:
-            insertChat(
+            data.insertChat(
                 chatId=update.effective_chat.id,
                 language=update.effective_user.language_code,
             )
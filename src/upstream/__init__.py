@@ -0,0 +1,6 @@
+from .api_key_pool import ApiKeyPool, apiKeyPool
+from .json_decoding import decodeJson, decodeResponseJson
+from .latency_tracker import LatencyTracker
+from .token_bucket import TokenBucket
+from .upstream_client import UpstreamClient, upstreamClient
+from .async_upstream_client import AsyncUpstreamClient, asyncUpstreamClient
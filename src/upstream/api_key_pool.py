@@ -0,0 +1,265 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from datetime import datetime, timezone
+from hashlib import sha256
+from logging import getLogger
+from threading import Event, Lock, Thread
+from time import monotonic, sleep, time
+
+from data import fetchApiKeyUsage, removeStaleApiKeyUsage, updateApiKeysUsage
+from utils.api_key import ApiKey, Service
+from utils.config import configValue
+from utils.metrics import incrementCounter
+
+logger = getLogger(__name__)
+
+
+class ApiKeyPool:
+    """The pool of API keys of a service, across which its requests are spread.
+
+    Every request takes the key with the most remaining daily quota, i.e. the least used one in the current UTC day,
+    among the keys not benched. A key returning quota or authorization errors is benched for a cooldown. When every key
+    is benched or out of quota, the one whose cooldown ends first is used anyway.
+
+    The number of requests sent with each key and the cooldowns are persisted in the `api_key_usage` table, identified by
+    a hash of the key, so that the rotation survives the restarts. `acquire` and `bench` only update the usage in memory,
+    since they are called by the coroutines of the upstream event loop: the usage is written in batches, and the usage
+    stored by the previous runs is read back, by a background thread every `flushInterval` seconds.
+
+    Attributes
+    ----------
+    :attr:`service` : Service
+        the service the keys belong to
+    :attr:`__keys` : list
+        the keys of the pool
+    :attr:`__dailyQuota` : int
+        requests which can be sent with each key in a day, 0 if unlimited
+    :attr:`__cooldown` : float
+        seconds for which a failing key is benched
+    :attr:`__flushInterval` : float
+        seconds between two writes of the usage to the database
+    :attr:`__day` : str
+        the UTC day the usage refers to
+    :attr:`__requests` : dict
+        key -> requests sent with it in the current day
+    :attr:`__benchedUntil` : dict
+        key -> timestamp at which its cooldown ends
+    :attr:`__pendingRequests` : dict
+        (day, key) -> requests not written to the database yet
+    :attr:`__pendingBenches` : set
+        keys benched since the last write to the database
+    :attr:`__flushRequested` : Event
+        set to have the background thread write the usage without waiting for the interval (e.g. a key was benched)
+    """
+
+    # Minimum seconds between two writes of the usage, even when they are requested.
+    MIN_FLUSH_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        service: Service,
+        keys: list,
+        dailyQuota: int,
+        cooldown: float,
+        flushInterval: float,
+    ) -> None:
+        self.service = service
+        self.__keys = keys
+        self.__dailyQuota = dailyQuota
+        self.__cooldown = cooldown
+        self.__flushInterval = flushInterval
+        self.__day = self.__today()
+        self.__requests: dict = {}
+        self.__benchedUntil: dict = {}
+        self.__pendingRequests: dict = {}
+        self.__pendingBenches: set = set()
+        self.__cleanedDay = None
+        self.__lock = Lock()
+        self.__flushRequested = Event()
+
+        if len(keys) > 0:
+            Thread(
+                target=self.__persistUsage,
+                name=f"api-key-usage-{service.name.lower()}",
+                daemon=True,
+            ).start()
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+    def acquire(self) -> str:
+        """Returns the key to be used by the next request, counting the request. None if the service has no keys."""
+        if len(self.__keys) == 0:
+            return None
+
+        now = time()
+        with self.__lock:
+            self.__startDay()
+            availableKeys = [key for key in self.__keys if self.__isAvailable(key, now)]
+            if len(availableKeys) > 0:
+                key = min(availableKeys, key=lambda key: self.__requests.get(key, 0))
+            else:
+                incrementCounter(f"api_keys.{self.service.name.lower()}.exhausted")
+                key = min(self.__keys, key=lambda key: self.__benchedUntil.get(key, 0))
+
+            self.__requests[key] = self.__requests.get(key, 0) + 1
+            self.__pendingRequests[(self.__day, key)] = (
+                self.__pendingRequests.get((self.__day, key), 0) + 1
+            )
+
+        return key
+
+    def hasAvailableKey(self) -> bool:
+        """Returns True if at least a key is neither benched nor out of quota."""
+        now = time()
+        with self.__lock:
+            self.__startDay()
+            return any(self.__isAvailable(key, now) for key in self.__keys)
+
+    def bench(self, key: str) -> None:
+        """Benches a key which returned a quota or authorization error, for the cooldown of the pool."""
+        with self.__lock:
+            self.__benchedUntil[key] = time() + self.__cooldown
+            self.__pendingBenches.add(key)
+        incrementCounter(f"api_keys.{self.service.name.lower()}.benched")
+
+        # The other processes sharing the database should stop using the key as soon as possible.
+        self.__flushRequested.set()
+
+    def flush(self) -> None:
+        """Writes the usage not persisted yet to the database, and reads back the usage of the current day stored by
+        every run.
+
+        It performs database I/O, so it must not be called from the upstream event loop.
+        """
+        with self.__lock:
+            day = self.__day
+            pendingRequests = self.__pendingRequests
+            pendingBenches = self.__pendingBenches
+            benchedUntil = dict(self.__benchedUntil)
+            self.__pendingRequests = {}
+            self.__pendingBenches = set()
+
+        for pendingDay in sorted({pendingDay for (pendingDay, _) in pendingRequests}):
+            updateApiKeysUsage(
+                self.service.name,
+                pendingDay,
+                [
+                    (self.__hash(key), requests, benchedUntil.get(key, 0.0))
+                    for ((requestsDay, key), requests) in pendingRequests.items()
+                    if requestsDay == pendingDay
+                ],
+            )
+        # The keys benched without requests pending are written on their own.
+        pendingBenches -= {
+            key for (requestsDay, key) in pendingRequests if requestsDay == day
+        }
+        if len(pendingBenches) > 0:
+            updateApiKeysUsage(
+                self.service.name,
+                day,
+                [(self.__hash(key), 0, benchedUntil[key]) for key in pendingBenches],
+            )
+
+        if self.__cleanedDay != day:
+            removeStaleApiKeyUsage(day)
+            self.__cleanedDay = day
+        storedUsage = {
+            keyHash: (requests, until)
+            for (keyHash, requests, until) in fetchApiKeyUsage(self.service.name, day)
+        }
+
+        with self.__lock:
+            if self.__day != day:
+                return
+            for key in self.__keys:
+                requests, until = storedUsage.get(self.__hash(key), (0, 0.0))
+                # The requests counted while the usage was being written are not stored yet.
+                self.__requests[key] = requests + self.__pendingRequests.get(
+                    (day, key), 0
+                )
+                self.__benchedUntil[key] = max(self.__benchedUntil.get(key, 0.0), until)
+
+    def __isAvailable(self, key: str, now: float) -> bool:
+        return self.__benchedUntil.get(key, 0) <= now and (
+            self.__dailyQuota <= 0 or self.__requests.get(key, 0) < self.__dailyQuota
+        )
+
+    def __startDay(self) -> None:
+        """Resets the requests counted on the first request of a new day. Requires the lock."""
+        today = self.__today()
+        if self.__day != today:
+            # The pending requests of the previous day are still written, to the previous day.
+            self.__day = today
+            self.__requests = {}
+
+    def __persistUsage(self) -> None:
+        """Body of the background thread: flushes the usage right away, then every `__flushInterval` seconds or as soon
+        as it is requested, but never more often than every `MIN_FLUSH_INTERVAL` seconds."""
+        while True:
+            flushedAt = monotonic()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception(
+                    f"Unable to persist the usage of the {self.service.name} keys"
+                )
+            self.__flushRequested.wait(
+                max(self.__flushInterval, ApiKeyPool.MIN_FLUSH_INTERVAL)
+            )
+            # A requested flush still waits for the minimum interval, so a burst of benches is written at once.
+            sleep(max(0.0, flushedAt + ApiKeyPool.MIN_FLUSH_INTERVAL - monotonic()))
+            self.__flushRequested.clear()
+
+    @staticmethod
+    def __today() -> str:
+        return datetime.now(timezone.utc).date().isoformat()
+
+    @staticmethod
+    def __hash(key: str) -> str:
+        # The keys are never stored in clear.
+        return sha256(key.encode()).hexdigest()[:16]
+
+
+__apiKeyPools: dict = {}
+__apiKeyPoolsLock = Lock()
+
+
+def apiKeyPool(service: Service) -> ApiKeyPool:
+    """Returns the pool of API keys of the given service, creating it on the first call.
+
+    The keys are read from the `<SERVICE_NAME>_KEY` parameter, a `,` separated list, and the daily quota of each key from
+    `<SERVICE_NAME>_KEY_DAILY_QUOTA`.
+    """
+    with __apiKeyPoolsLock:
+        if service not in __apiKeyPools:
+            __apiKeyPools[service] = ApiKeyPool(
+                service,
+                ApiKey(service).values,
+                configValue(f"{service.name}_KEY_DAILY_QUOTA", 0),
+                configValue("API_KEY_COOLDOWN_SECONDS", 300.0),
+                configValue("API_KEY_USAGE_FLUSH_SECONDS", 30.0),
+            )
+
+        return __apiKeyPools[service]
@@ -0,0 +1,460 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+import asyncio
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from logging import getLogger
+from threading import Lock, Thread, current_thread
+from urllib.parse import urlsplit
+
+from requests import ConnectionError, HTTPError, Response, Timeout
+
+from custom_exceptions import DeadlineExceededException
+from upstream.json_decoding import decodeResponseJson
+from upstream.latency_tracker import LatencyTracker
+from upstream.upstream_client import UpstreamClient, hostSizes, upstreamClient
+from utils.config import configValue
+from utils.deadline import Deadline
+from utils.metrics import incrementCounter
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = getLogger(__name__)
+
+
+class AsyncUpstreamClient:
+    """The asynchronous counterpart of `UpstreamClient`, running on a single background event loop.
+
+    The search pipelines and the upstream requests are coroutines submitted to the loop (`submit`, `run`), so that the
+    researches waiting for the network do not hold a thread each. The requests towards each host are limited to a
+    maximum number of concurrent ones, and the concurrent `getJson` calls of the same request are coalesced.
+
+    The requests are sent through `aiohttp` when it is installed. Otherwise they are sent by the synchronous client on the
+    threads of the loop's executor: the behaviour is the same, but every request in flight holds a thread.
+
+    Every request names its endpoint (see `getJson`), and can be hedged: if the response has not arrived within the
+    `hedgePercentile` of the latest latencies of the endpoint, the same request is sent again, the first response wins
+    and the other request is cancelled (without aiohttp, the cancelled request still runs to completion on its thread).
+    Each request earns `maxHedgeRatio` hedges, up to `MAX_HEDGE_CREDITS`, so that at most that fraction of the requests
+    is sent twice. The hedges are counted in the metrics as `upstream.<endpoint>.hedges` and
+    `upstream.<endpoint>.hedge_wins`, the ones not sent because of the cap as `upstream.hedges_refused`.
+
+    The size and the decoding time of the responses are counted per endpoint, see `decodeResponseJson`.
+
+    Attributes
+    ----------
+    :attr:`__concurrencyLimits` : dict
+        host -> maximum number of concurrent requests towards it
+    :attr:`__defaultConcurrencyLimit` : int
+        maximum number of concurrent requests towards the hosts not listed in `__concurrencyLimits`
+    :attr:`__timeout` : tuple
+        (connect timeout, read timeout) in seconds of every request
+    :attr:`__latencyTracker` : LatencyTracker
+        the latest latencies of the endpoints
+    :attr:`__hedgePercentile` : float
+        percentile of the latencies of an endpoint after which its requests are hedged
+    :attr:`__maxHedgeRatio` : float
+        maximum fraction of the requests which are hedged, 0 to disable hedging
+    :attr:`__hedgeCredits` : float
+        number of hedges which can currently be sent
+    :attr:`__semaphores` : dict
+        host -> semaphore limiting its concurrent requests
+    :attr:`__inFlight` : dict
+        host -> requests currently in flight towards it
+    :attr:`__pendingRequests` : dict
+        key of a request -> task sending it, shared by the concurrent `getJson` calls
+    :attr:`__loop` : AbstractEventLoop
+        the event loop, run by the `upstream-event-loop` thread
+    """
+
+    # Maximum number of hedges which can be saved up, i.e. sent in a burst.
+    MAX_HEDGE_CREDITS = 10
+
+    # Seconds left to a coroutine run with a deadline to return its partial results, once the deadline has expired.
+    DEADLINE_GRACE_SECONDS = 1.0
+
+    def __init__(
+        self,
+        concurrencyLimits: dict,
+        defaultConcurrencyLimit: int,
+        timeout: tuple,
+        latencyTracker: LatencyTracker,
+        hedgePercentile: float,
+        maxHedgeRatio: float,
+    ) -> None:
+        self.__concurrencyLimits = concurrencyLimits
+        self.__defaultConcurrencyLimit = defaultConcurrencyLimit
+        self.__timeout = timeout
+        self.__latencyTracker = latencyTracker
+        self.__hedgePercentile = hedgePercentile
+        self.__maxHedgeRatio = maxHedgeRatio
+        self.__hedgeCredits = 0.0
+        self.__semaphores: dict = {}
+        self.__inFlight: dict = {}
+        self.__pendingRequests: dict = {}
+        self.__session = None
+        self.__loop = asyncio.new_event_loop()
+        self.__thread = Thread(
+            target=self.__loop.run_forever, name="upstream-event-loop", daemon=True
+        )
+        self.__thread.start()
+
+    def submit(self, coroutine) -> Future:
+        """Schedules a coroutine on the event loop, without waiting for it.
+
+        Returns:
+            Future: the future of the coroutine's result. Cancelling it cancels the coroutine.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.__loop)
+
+    def run(self, coroutine, deadline: Deadline = None):
+        """Runs a coroutine on the event loop and waits for its result. It must not be called from the loop itself.
+
+        Args:
+            coroutine: the coroutine to be run
+            deadline (Deadline, optional): the deadline of the update being served. The coroutine is expected to
+                                           respect it, and it is cancelled if it has not returned `DEADLINE_GRACE_SECONDS`
+                                           after the deadline. Defaults to None, to wait for the coroutine indefinitely.
+
+        Raises:
+            RuntimeError: raised when called from the event loop, which would wait for itself.
+            DeadlineExceededException: raised when the coroutine is cancelled because of the deadline.
+
+        Returns:
+            the result of the coroutine
+        """
+        if current_thread() is self.__thread:
+            coroutine.close()
+            raise RuntimeError(
+                "The upstream event loop cannot wait for itself: the coroutine must be awaited."
+            )
+
+        future = self.submit(coroutine)
+        try:
+            return future.result(
+                deadline.remaining + self.DEADLINE_GRACE_SECONDS
+                if deadline != None
+                else None
+            )
+        except FutureTimeoutError:
+            future.cancel()
+            incrementCounter("upstream.deadline_exceeded")
+            raise DeadlineExceededException("The deadline expired.")
+
+    async def getJson(
+        self,
+        url: str,
+        endpoint: str,
+        timeout: tuple = None,
+        projection=None,
+        deadline: Deadline = None,
+        authorize=None,
+    ) -> dict:
+        """Performs a GET request and parses its JSON response. Concurrent calls of the same request share a single one.
+
+        The parsed response may be shared with other callers, so it must not be modified.
+
+        Args:
+            url (str): the url of the request
+            endpoint (str): the name of the endpoint (e.g. `google_places.nearby`), whose latencies and response sizes
+                            are tracked and whose requests can be hedged
+            timeout (tuple, optional): (connect timeout, read timeout) in seconds. Defaults to the client's timeout.
+            projection (optional): function applied to the parsed response, keeping only the fields the caller reads.
+                                   Defaults to None (the whole response is returned).
+            deadline (Deadline, optional): the deadline of the update being served: the response is awaited only within
+                                           its remaining time. Defaults to None.
+            authorize (optional): coroutine function called right before each HTTP request actually sent, i.e. once
+                                  for all the coalesced calls and once more for a hedge. Given the url, it returns the
+                                  url to be sent (e.g. with an API key) and a function called with the response and
+                                  its parsed content (None for an error status code), or None. It can raise to give
+                                  up on the request. Defaults to None, to send the url as it is.
+
+        Raises:
+            DeadlineExceededException: raised when the deadline expires before the response arrives.
+            HTTPError: raised when the response has an error status code. The response is available in `response`.
+            RequestException: raised when the request fails or times out.
+            ValueError: raised when the response is not valid JSON.
+
+        Returns:
+            dict: the parsed response
+        """
+        if deadline != None and deadline.expired:
+            incrementCounter("upstream.deadline_exceeded")
+            raise DeadlineExceededException(
+                f"The deadline expired before requesting {urlsplit(url).hostname}."
+            )
+
+        key = (UpstreamClient.requestKey(url), projection)
+        task: asyncio.Task = self.__pendingRequests.get(key)
+        if task == None:
+            task = asyncio.ensure_future(
+                self.__fetchJsonHedged(url, timeout, projection, endpoint, authorize)
+            )
+            self.__pendingRequests[key] = task
+            task.add_done_callback(lambda task: self.__forget(key, task))
+        else:
+            incrementCounter("upstream.coalesced")
+
+        # A caller giving up (e.g. its routing budget expired) does not cancel the request shared with the others.
+        try:
+            response, parsedResponse = await asyncio.wait_for(
+                asyncio.shield(task), deadline.remaining if deadline != None else None
+            )
+        except asyncio.TimeoutError:
+            incrementCounter("upstream.deadline_exceeded")
+            raise DeadlineExceededException(
+                f"The deadline expired while waiting for {urlsplit(url).hostname}."
+            )
+        if not response.ok:
+            raise HTTPError(
+                f"{response.status_code} error from {urlsplit(url).hostname}",
+                response=response,
+            )
+
+        return parsedResponse
+
+    def warmUp(self, urls: list) -> None:
+        """Opens a connection towards the host of each url given, in the background (see `UpstreamClient.warmUp`)."""
+        if aiohttp == None:
+            upstreamClient().warmUp(urls)
+        else:
+            self.submit(self.__warmUp(urls))
+
+    def inFlightSnapshot(self) -> dict:
+        """Returns, for each host contacted so far, the number of requests currently in flight towards it."""
+        return dict(self.__inFlight)
+
+    def latencySnapshot(self) -> dict:
+        """Returns, for each endpoint, the latency after which its requests are hedged, in milliseconds."""
+        return self.__latencyTracker.snapshot(self.__hedgePercentile)
+
+    async def __fetchJsonHedged(
+        self, url: str, timeout: tuple, projection, endpoint: str, authorize
+    ) -> tuple:
+        """Sends the request through `__fetchJson`, and sends it again if it is slower than usual (see the class
+        docstring)."""
+        hedgeDelay = None
+        if self.__maxHedgeRatio > 0:
+            self.__hedgeCredits = min(
+                self.MAX_HEDGE_CREDITS, self.__hedgeCredits + self.__maxHedgeRatio
+            )
+            hedgeDelay = self.__latencyTracker.percentile(
+                endpoint, self.__hedgePercentile
+            )
+
+        attempts = [
+            self.__timedFetchJson(url, timeout, projection, endpoint, authorize)
+        ]
+        try:
+            (done, _) = await asyncio.wait(attempts, timeout=hedgeDelay)
+            if len(done) == 0:
+                if self.__hedgeCredits >= 1:
+                    self.__hedgeCredits -= 1
+                    incrementCounter(f"upstream.{endpoint}.hedges")
+                    attempts.append(
+                        self.__timedFetchJson(
+                            url, timeout, projection, endpoint, authorize
+                        )
+                    )
+                else:
+                    incrementCounter("upstream.hedges_refused")
+
+            # The first response wins, even with an error status code. A failed attempt leaves the other one running.
+            pending = set(attempts)
+            while True:
+                (done, pending) = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for attempt in attempts:
+                    if attempt in done and attempt.exception() == None:
+                        if attempt is not attempts[0]:
+                            incrementCounter(f"upstream.{endpoint}.hedge_wins")
+                        return attempt.result()
+                if len(pending) == 0:
+                    # Every attempt failed: the failure of the original request is raised.
+                    return attempts[0].result()
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+                # The failure of the attempt which lost is retrieved.
+                elif not attempt.cancelled():
+                    attempt.exception()
+
+    def __timedFetchJson(
+        self, url: str, timeout: tuple, projection, endpoint: str, authorize
+    ) -> asyncio.Task:
+        """Sends the request in a new task, recording its latency once it is answered."""
+        startedAt = self.__loop.time()
+
+        def recordLatency(task: asyncio.Task) -> None:
+            # The latency of a request cancelled because the hedge won is at least the time it has been waiting.
+            if task.cancelled() or task.exception() == None:
+                self.__latencyTracker.record(endpoint, self.__loop.time() - startedAt)
+
+        task = asyncio.ensure_future(
+            self.__fetchJson(url, timeout, projection, endpoint, authorize)
+        )
+        task.add_done_callback(recordLatency)
+
+        return task
+
+    async def __fetchJson(
+        self, url: str, timeout: tuple, projection, endpoint: str, authorize
+    ) -> tuple:
+        """Returns the response to the request and, if successful, its parsed and projected content."""
+        host = urlsplit(url).hostname
+        onResponse = None
+        if authorize != None:
+            (url, onResponse) = await authorize(url)
+
+        async with self.__semaphore(host):
+            self.__inFlight[host] = self.__inFlight.get(host, 0) + 1
+            try:
+                if aiohttp == None:
+                    response = await self.__loop.run_in_executor(
+                        None,
+                        upstreamClient().get,
+                        url,
+                        timeout if timeout != None else self.__timeout,
+                    )
+                else:
+                    response = await self.__get(host, url, timeout)
+            finally:
+                self.__inFlight[host] -= 1
+
+        parsedResponse = (
+            decodeResponseJson(response.content, projection, endpoint)
+            if response.ok
+            else None
+        )
+        if onResponse != None:
+            onResponse(response, parsedResponse)
+
+        return (response, parsedResponse)
+
+    async def __get(self, host: str, url: str, timeout: tuple) -> Response:
+        """Performs a GET request through aiohttp. The response and the errors are converted to the ones of requests, so
+        that the callers handle them as the ones of the synchronous client."""
+        connectTimeout, readTimeout = timeout if timeout != None else self.__timeout
+
+        incrementCounter(f"upstream.{host}.requests")
+        try:
+            async with self.__aiohttpSession().get(
+                url,
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=connectTimeout, sock_read=readTimeout
+                ),
+            ) as aiohttpResponse:
+                content = await aiohttpResponse.read()
+        except asyncio.TimeoutError as error:
+            incrementCounter(f"upstream.{host}.errors")
+            raise Timeout(f"Request to {host} timed out") from error
+        except aiohttp.ClientError as error:
+            incrementCounter(f"upstream.{host}.errors")
+            raise ConnectionError(f"Request to {host} failed: {error}") from error
+
+        response = Response()
+        response.url = url
+        response.status_code = aiohttpResponse.status
+        response.encoding = aiohttpResponse.charset
+        response._content = content
+
+        return response
+
+    def __aiohttpSession(self):
+        """Returns the aiohttp session, creating it on the first request (it has to be created within the loop)."""
+        if self.__session == None:
+            # The concurrency is limited by the semaphores of the hosts, rather than by the connector.
+            self.__session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=0)
+            )
+
+        return self.__session
+
+    def __semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphore = self.__semaphores.get(host)
+        if semaphore == None:
+            semaphore = asyncio.Semaphore(
+                self.__concurrencyLimits.get(host, self.__defaultConcurrencyLimit)
+            )
+            self.__semaphores[host] = semaphore
+
+        return semaphore
+
+    def __forget(self, key, task: asyncio.Task) -> None:
+        if self.__pendingRequests.get(key) is task:
+            del self.__pendingRequests[key]
+        # The failure is retrieved, since all the callers may have given up on the request.
+        if not task.cancelled():
+            task.exception()
+
+    async def __warmUp(self, urls: list) -> None:
+        for url in urls:
+            host = urlsplit(url).hostname
+            try:
+                async with self.__semaphore(host):
+                    await self.__get(host, url, None)
+            except (ConnectionError, Timeout) as error:
+                logger.warning(
+                    f"Unable to warm up the connection towards {host}: {error}"
+                )
+
+
+__asyncUpstreamClient: AsyncUpstreamClient = None
+__asyncUpstreamClientLock = Lock()
+
+
+def asyncUpstreamClient() -> AsyncUpstreamClient:
+    """Returns the asynchronous client shared by all the upstream requests, starting its event loop on the first call.
+
+    The concurrency limits are read from `UPSTREAM_CONCURRENCY_LIMITS`, a `,` separated list of `host=limit` pairs.
+    """
+    global __asyncUpstreamClient
+
+    with __asyncUpstreamClientLock:
+        if __asyncUpstreamClient == None:
+            __asyncUpstreamClient = AsyncUpstreamClient(
+                hostSizes(
+                    configValue(
+                        "UPSTREAM_CONCURRENCY_LIMITS",
+                        "maps.googleapis.com=50,api.mapbox.com=50",
+                    )
+                ),
+                configValue("UPSTREAM_DEFAULT_CONCURRENCY_LIMIT", 20),
+                (
+                    configValue("UPSTREAM_CONNECT_TIMEOUT_SECONDS", 3.05),
+                    configValue("UPSTREAM_READ_TIMEOUT_SECONDS", 10.0),
+                ),
+                LatencyTracker(
+                    configValue("UPSTREAM_HEDGE_LATENCY_WINDOW", 200),
+                    configValue("UPSTREAM_HEDGE_MIN_SAMPLES", 20),
+                ),
+                configValue("UPSTREAM_HEDGE_PERCENTILE", 95.0),
+                configValue("UPSTREAM_HEDGE_MAX_RATIO", 0.0),
+            )
+
+    return __asyncUpstreamClient
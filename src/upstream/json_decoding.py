@@ -0,0 +1,88 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from json import loads
+from time import perf_counter
+
+from utils.config import configValue
+from utils.metrics import incrementCounter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson is used when it is installed, unless `UPSTREAM_JSON_DECODER` is set to `json`.
+__decode = (
+    orjson.loads
+    if orjson != None and configValue("UPSTREAM_JSON_DECODER", "auto") != "json"
+    else loads
+)
+
+
+def decodeJson(content: bytes):
+    """Decodes a JSON document straight from its bytes, without building an intermediate str.
+
+    Args:
+        content (bytes): the UTF-8 encoded document
+
+    Raises:
+        ValueError: raised when the content is not valid JSON.
+
+    Returns:
+        the decoded document
+    """
+    return __decode(content)
+
+
+def decodeResponseJson(content: bytes, projection, endpoint: str):
+    """Decodes a JSON response and applies the projection to it, measuring the cost of the response.
+
+    The size of the response and the time spent decoding and projecting it are added to the counters
+    `upstream.<endpoint>.response_bytes` and `upstream.<endpoint>.decode_microseconds`, while
+    `upstream.<endpoint>.responses` counts the responses decoded.
+
+    Args:
+        content (bytes): the UTF-8 encoded response
+        projection: function applied to the decoded response, None to keep the whole response
+        endpoint (str): the name of the endpoint which sent the response (e.g. `google_places.nearby`)
+
+    Raises:
+        ValueError: raised when the content is not valid JSON.
+
+    Returns:
+        the decoded and projected response
+    """
+    startedAt = perf_counter()
+    decodedResponse = __decode(content)
+    if projection != None:
+        decodedResponse = projection(decodedResponse)
+
+    incrementCounter(
+        f"upstream.{endpoint}.decode_microseconds",
+        int((perf_counter() - startedAt) * 1000000),
+    )
+    incrementCounter(f"upstream.{endpoint}.response_bytes", len(content))
+    incrementCounter(f"upstream.{endpoint}.responses")
+
+    return decodedResponse
@@ -0,0 +1,83 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from collections import deque
+from math import ceil
+from threading import Lock
+
+
+class LatencyTracker:
+    """Keeps the latencies of the latest requests towards each endpoint, to estimate their percentiles.
+
+    Attributes
+    ----------
+    :attr:`__window` : int
+        number of latest latencies kept for each endpoint
+    :attr:`__minSamples` : int
+        number of latencies needed before estimating the percentiles of an endpoint
+    :attr:`__latencies` : dict
+        endpoint -> its latest latencies, in seconds
+    """
+
+    def __init__(self, window: int, minSamples: int) -> None:
+        self.__window = window
+        self.__minSamples = minSamples
+        self.__latencies: dict = {}
+        self.__lock = Lock()
+
+    def record(self, endpoint: str, latency: float) -> None:
+        """Adds the latency, in seconds, of a request towards the endpoint, forgetting the oldest one if needed."""
+        with self.__lock:
+            latencies = self.__latencies.get(endpoint)
+            if latencies == None:
+                latencies = deque(maxlen=self.__window)
+                self.__latencies[endpoint] = latencies
+            latencies.append(latency)
+
+    def percentile(self, endpoint: str, percentile: float) -> float:
+        """Returns the given percentile (e.g. 95) of the latest latencies of the endpoint, in seconds.
+
+        Returns:
+            float: the percentile, None if too few latencies of the endpoint are known
+        """
+        with self.__lock:
+            latencies = self.__latencies.get(endpoint)
+            if latencies == None or len(latencies) < self.__minSamples:
+                return None
+            latencies = sorted(latencies)
+
+        # Nearest-rank percentile.
+        return latencies[max(0, ceil(percentile / 100 * len(latencies)) - 1)]
+
+    def snapshot(self, percentile: float) -> dict:
+        """Returns the given percentile of the latencies of each endpoint with enough latencies, in milliseconds."""
+        with self.__lock:
+            endpoints = list(self.__latencies)
+
+        snapshot: dict = {}
+        for endpoint in endpoints:
+            latency = self.percentile(endpoint, percentile)
+            if latency != None:
+                snapshot[endpoint] = round(latency * 1000)
+
+        return snapshot
@@ -0,0 +1,86 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from threading import Lock
+from time import monotonic
+
+from utils.metrics import incrementCounter
+
+
+class TokenBucket:
+    """A thread-safe token bucket limiting the rate of the requests towards an upstream endpoint.
+
+    The bucket is refilled with `rate` tokens per second, up to `capacity` tokens, and every request takes one token.
+    When the bucket is empty the request waits for the next token. The waits are counted in the metrics as
+    `{name}.throttled` and `{name}.throttle_wait_ms`.
+
+    Attributes
+    ----------
+    :attr:`name` : str
+        name of the limited endpoint, prefix of its counters
+    :attr:`__rate` : float
+        tokens added per second, i.e. the sustained requests per second
+    :attr:`__capacity` : float
+        maximum number of tokens, i.e. the requests which can be sent in a burst
+    :attr:`__tokens` : float
+        tokens currently available. It is negative when some requests are waiting for their token.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float) -> None:
+        self.name = name
+        self.__rate = rate
+        self.__capacity = capacity
+        self.__tokens = capacity
+        self.__updatedAt = monotonic()
+        self.__lock = Lock()
+
+    def reserve(self, maxWait: float) -> float:
+        """Takes a token without waiting for it: the caller has to wait the returned time before sending its request.
+
+        Args:
+            maxWait (float): maximum seconds to wait for the token
+
+        Returns:
+            float: the seconds to wait before the token is available. None if they would exceed `maxWait` (no token is
+                   taken).
+        """
+        with self.__lock:
+            now = monotonic()
+            self.__tokens = min(
+                self.__capacity,
+                self.__tokens + (now - self.__updatedAt) * self.__rate,
+            )
+            self.__updatedAt = now
+
+            wait = max(0.0, (1 - self.__tokens) / self.__rate)
+            if wait > maxWait:
+                incrementCounter(f"{self.name}.throttle_refused")
+                return None
+            # The token is reserved now, so that the following requests wait after this one.
+            self.__tokens -= 1
+
+        if wait > 0:
+            incrementCounter(f"{self.name}.throttled")
+            incrementCounter(f"{self.name}.throttle_wait_ms", round(wait * 1000))
+
+        return wait
@@ -0,0 +1,214 @@
+####################################################################################
+# Copyright (c) 2022 TasteIt                                                       #
+# Author: Paolo Pertino                                                            #
+#                                                                                  #
+# Permission is hereby granted, free of charge, to any person obtaining a copy     #
+# of this software and associated documentation files (the "Software"), to deal    #
+# in the Software without restriction, including without limitation the rights     #
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell        #
+# copies of the Software, and to permit persons to whom the Software is            #
+# furnished to do so, subject to the following conditions:                         #
+#                                                                                  #
+# The above copyright notice and this permission notice shall be included in       #
+# all copies or substantial portions of the Software.                              #
+#                                                                                  #
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR       #
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,         #
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE      #
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER           #
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,    #
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN        #
+# THE SOFTWARE.                                                                    #
+####################################################################################
+
+from logging import getLogger
+from socket import getaddrinfo
+from threading import Lock, Thread
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from requests import RequestException, Response, Session
+from requests.adapters import HTTPAdapter
+
+from utils.config import configValue
+from utils.metrics import incrementCounter
+
+logger = getLogger(__name__)
+
+
+class UpstreamClient:
+    """The HTTP client shared by all the requests towards the upstream services (Google Places, Mapbox, OSRM).
+
+    Every host gets its own `Session`, whose keep-alive connections are reused by the following requests, so that only
+    the first request towards a host pays the TCP and TLS handshakes. Every request has a connect and a read timeout.
+
+    The requests are sent through this client by `AsyncUpstreamClient` when aiohttp is not installed. The coalescing of
+    the concurrent requests, the decoding and the projection of the responses are performed there.
+
+    Attributes
+    ----------
+    :attr:`__poolSizes` : dict
+        host -> maximum number of connections kept alive towards it
+    :attr:`__defaultPoolSize` : int
+        maximum number of connections kept alive towards the hosts not listed in `__poolSizes`
+    :attr:`__timeout` : tuple
+        (connect timeout, read timeout) in seconds of every request
+    :attr:`__sessions` : dict
+        host -> session used to contact it
+    """
+
+    # Query parameters carrying the API keys.
+    API_KEY_PARAMETERS = ("key", "access_token")
+
+    def __init__(self, poolSizes: dict, defaultPoolSize: int, timeout: tuple) -> None:
+        self.__poolSizes = poolSizes
+        self.__defaultPoolSize = defaultPoolSize
+        self.__timeout = timeout
+        self.__sessions: dict = {}
+        self.__lock = Lock()
+
+    def get(self, url: str, timeout: tuple = None) -> Response:
+        """Performs a GET request through the session of the url's host.
+
+        Args:
+            url (str): the url of the request
+            timeout (tuple, optional): (connect timeout, read timeout) in seconds. Defaults to the client's timeout.
+
+        Raises:
+            RequestException: raised when the request fails or times out.
+
+        Returns:
+            Response: the response received
+        """
+        host = urlsplit(url).hostname
+        incrementCounter(f"upstream.{host}.requests")
+        try:
+            return self.__session(host).get(
+                url, timeout=timeout if timeout != None else self.__timeout
+            )
+        except RequestException:
+            incrementCounter(f"upstream.{host}.errors")
+            raise
+
+    def warmUp(self, urls: list) -> None:
+        """Resolves the hosts of the given urls and opens a connection towards each of them, in a background thread.
+
+        Args:
+            urls (list): a url of each host to be warmed up. Any answer, even an error status, opens the connection.
+        """
+        Thread(
+            target=self.__warmUp, args=(urls,), name="upstream-warm-up", daemon=True
+        ).start()
+
+    def poolsSnapshot(self) -> dict:
+        """Returns, for each host contacted so far, the connections opened and the requests sent through its pool."""
+        with self.__lock:
+            sessions = dict(self.__sessions)
+
+        snapshot = {}
+        for host, session in sessions.items():
+            # The same adapter serves both http and https.
+            poolsByKey = session.get_adapter(f"https://{host}").poolmanager.pools
+            pools = [poolsByKey.get(poolKey) for poolKey in poolsByKey.keys()]
+            pools = [pool for pool in pools if pool != None]
+            snapshot[host] = {
+                "pool_size": self.__poolSizes.get(host, self.__defaultPoolSize),
+                "connections_opened": sum(pool.num_connections for pool in pools),
+                "requests": sum(pool.num_requests for pool in pools),
+            }
+
+        return snapshot
+
+    def __session(self, host: str) -> Session:
+        """Returns the session of the given host, creating it on the first request."""
+        with self.__lock:
+            session = self.__sessions.get(host)
+            if session == None:
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self.__poolSizes.get(host, self.__defaultPoolSize),
+                )
+                session = Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self.__sessions[host] = session
+
+        return session
+
+    @staticmethod
+    def requestKey(url: str) -> str:
+        """Returns the url with its query parameters sorted, so that the same request always has the same key.
+
+        The API keys are left out, so that the same request sent with different keys of a pool is coalesced as well.
+        """
+        splitUrl = urlsplit(url)
+
+        return urlunsplit(
+            splitUrl._replace(
+                query=urlencode(
+                    sorted(
+                        (name, value)
+                        for (name, value) in parse_qsl(
+                            splitUrl.query, keep_blank_values=True
+                        )
+                        if name not in UpstreamClient.API_KEY_PARAMETERS
+                    )
+                )
+            )
+        )
+
+    def __warmUp(self, urls: list) -> None:
+        for url in urls:
+            host = urlsplit(url).hostname
+            try:
+                getaddrinfo(host, 443)
+                self.get(url)
+            except (OSError, RequestException) as error:
+                logger.warning(
+                    f"Unable to warm up the connection towards {host}: {error}"
+                )
+
+
+def hostSizes(value: str) -> dict:
+    """Parses a `,` separated list of `host=size` pairs (e.g. `maps.googleapis.com=10,api.mapbox.com=10`).
+
+    Returns:
+        dict: host -> size
+    """
+    return {
+        host.strip(): int(size)
+        for (host, size) in (
+            hostSize.split("=")
+            for hostSize in value.split(",")
+            if hostSize.strip() != ""
+        )
+    }
+
+
+__upstreamClient: UpstreamClient = None
+__upstreamClientLock = Lock()
+
+
+def upstreamClient() -> UpstreamClient:
+    """Returns the HTTP client shared by all the upstream requests, creating it on the first call.
+
+    The pool sizes are read from `UPSTREAM_POOL_SIZES`, a `,` separated list of `host=size` pairs.
+    """
+    global __upstreamClient
+
+    with __upstreamClientLock:
+        if __upstreamClient == None:
+            __upstreamClient = UpstreamClient(
+                hostSizes(
+                    configValue(
+                        "UPSTREAM_POOL_SIZES",
+                        "maps.googleapis.com=10,api.mapbox.com=10",
+                    )
+                ),
+                configValue("UPSTREAM_DEFAULT_POOL_SIZE", 4),
+                (
+                    configValue("UPSTREAM_CONNECT_TIMEOUT_SECONDS", 3.05),
+                    configValue("UPSTREAM_READ_TIMEOUT_SECONDS", 10.0),
+                ),
+            )
+
+    return __upstreamClient
@@ -1,4 +1,9 @@
 from utils.api_key import ApiKey, Service
+from utils.config import configValue
+from utils.deadline import Deadline
+from utils.metrics import incrementCounter, countersSnapshot
+from utils.circuit_breaker import CircuitBreaker
+from utils.lru_cache import LRUCache
 from utils.conversation_utils import cancelConversation, notAvailableOption
 from utils.general_place import GeneralPlace
 from utils.research_info import ResearchInfo
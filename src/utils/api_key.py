@@ -41,6 +41,7 @@ class Service(Enum):
         * Add an ENV variable to your environment or .env file with the following convention:
                 * if the key you want insert is for dev use: DEV_`<SERVICE_NAME>`_KEY = `KEY_VALUE`
                 * otherwise if it's for public usage: `<SERVICE_NAME>`_KEY = `KEY_VALUE`.
+        * A pool of keys of the same service can be set as a `,` separated list: `<SERVICE_NAME>`_KEY = `KEY_1,KEY_2`.
     """
 
     TELEGRAM = auto()
@@ -62,7 +63,11 @@ class ApiKey:
     -------
     @property
     `value() -> str`
-        Returns the API key of the key service if it is available.\\
+        Returns the API key of the key service if it is available (the first one, if a pool of keys is set).\\
+        Throws a NoServiceFoundException if the service given is not available.
+    @property
+    `values() -> list`
+        Returns all the API keys of the key service.\\
         Throws a NoServiceFoundException if the service given is not available.
     """
 
@@ -78,8 +83,31 @@ class ApiKey:
             NoServiceFoundException: raised when the service given is not part of the available services.
 
         Returns:
-            str: the value of the current key
+            str: the value of the current key, the first one if a pool of keys is set
         """
+        keys = self.values
+
+        return keys[0] if len(keys) > 0 else None
+
+    @property
+    def values(self) -> list:
+        """The values of the pool of keys
+
+        Raises:
+            NoServiceFoundException: raised when the service given is not part of the available services.
+
+        Returns:
+            list: the values of the keys set, in the order they are listed. It is empty if no key is set.
+        """
+        rawValue = self.__rawValue()
+
+        return (
+            [key.strip() for key in rawValue.split(",") if key.strip() != ""]
+            if rawValue != None
+            else []
+        )
+
+    def __rawValue(self) -> str:
         if self.service in list(Service):
             if self.isDeveloperKey:
                 keyToSearch = "DEV_" + self.service.name + "_KEY"
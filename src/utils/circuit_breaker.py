@@ -0,0 +1,86 @@
+from threading import Lock
+from time import monotonic
+
+from utils.metrics import incrementCounter
+
+
+class CircuitBreaker:
+    """A circuit breaker protecting the bot from an upstream service which is failing.
+
+    The breaker starts `closed` and lets all the requests pass. After `failureThreshold` consecutive failures it becomes
+    `open` and the requests are refused without contacting the service. Once `resetTimeout` seconds have passed it becomes
+    `half_open`: a single trial request is let through, and its outcome closes or opens the breaker again. Every opening
+    is counted in the metrics as `circuit_breaker.<name>.opened`.
+
+    Attributes
+    ----------
+    :attr:`name` : str
+        name of the protected service, used in logs and metrics
+    :attr:`__failureThreshold` : int
+        number of consecutive failures which opens the breaker
+    :attr:`__resetTimeout` : float
+        seconds after which an open breaker lets a trial request through
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failureThreshold: int, resetTimeout: float) -> None:
+        self.name = name
+        self.__failureThreshold = failureThreshold
+        self.__resetTimeout = resetTimeout
+        self.__consecutiveFailures = 0
+        self.__openedAt = None
+        self.__isTrialRunning = False
+        self.__lock = Lock()
+
+    @property
+    def state(self) -> str:
+        with self.__lock:
+            return self.__state()
+
+    def allowRequest(self) -> bool:
+        """Returns true if a request to the service can be performed."""
+        with self.__lock:
+            state = self.__state()
+            if state == CircuitBreaker.CLOSED:
+                return True
+            elif state == CircuitBreaker.HALF_OPEN and not self.__isTrialRunning:
+                self.__isTrialRunning = True
+                return True
+            else:
+                return False
+
+    def recordSuccess(self) -> None:
+        """Records a successful request, closing the breaker."""
+        with self.__lock:
+            self.__consecutiveFailures = 0
+            self.__openedAt = None
+            self.__isTrialRunning = False
+
+    def recordFailure(self) -> None:
+        """Records a failed request, opening the breaker if the failures threshold is reached or if it was a trial request."""
+        with self.__lock:
+            self.__consecutiveFailures += 1
+            if (
+                self.__isTrialRunning
+                or self.__consecutiveFailures >= self.__failureThreshold
+            ):
+                if self.__state() != CircuitBreaker.OPEN:
+                    incrementCounter(f"circuit_breaker.{self.name}.opened")
+                self.__openedAt = monotonic()
+            self.__isTrialRunning = False
+
+    def recordCancellation(self) -> None:
+        """Records a request cancelled before its outcome was known: if it was the trial request, another one is let through."""
+        with self.__lock:
+            self.__isTrialRunning = False
+
+    def __state(self) -> str:
+        if self.__openedAt == None:
+            return CircuitBreaker.CLOSED
+        elif monotonic() - self.__openedAt < self.__resetTimeout:
+            return CircuitBreaker.OPEN
+        else:
+            return CircuitBreaker.HALF_OPEN
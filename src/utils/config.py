@@ -0,0 +1,33 @@
+from dotenv import dotenv_values
+from functools import lru_cache
+from os import getenv
+
+
+@lru_cache(maxsize=None)
+def __dotenvValues() -> dict:
+    # The .env file is parsed only once, since configuration values are read on every research.
+    return dotenv_values(".env")
+
+
+def configValue(name: str, default):
+    """Returns the value of a configuration parameter set in the os environment or in the .env file.
+
+    The os environment has priority over the .env file, as it happens for the API keys.
+
+    Args:
+        name (str): the name of the parameter (e.g. `ROUTING_DEADLINE_SECONDS`)
+        default: the value returned when the parameter is not set. Its type is used to convert the value found.
+
+    Returns:
+        the value of the parameter converted to the type of `default`, or `default` if the parameter is not set.
+    """
+    value = getenv(name)
+    if value == None:
+        value = __dotenvValues().get(name)
+
+    if value == None or default == None:
+        return value if value != None else default
+    elif isinstance(default, bool):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    else:
+        return type(default)(value)
@@ -27,7 +27,6 @@ from telegram.ext import CallbackContext, ConversationHandler
 from STRINGS_LIST import getString
 
 from tools.verify_bot_data import verifyChatData
-from bot_functionalities import SELECT_LANG
 
 
 def notAvailableOption(update: Update, context: CallbackContext) -> int:
@@ -0,0 +1,30 @@
+from time import monotonic
+
+
+class Deadline:
+    """The time by which the update of a user has to be answered, shared by all the stages serving it.
+
+    Every stage waits at most the remaining time (see `budget`), so that the whole pipeline ends in time. A stage which
+    runs out of time returns what it already has (partial or cached results) rather than waiting any longer.
+
+    Attributes
+    ----------
+    :attr:`__expiresAt` : float
+        the monotonic time at which the deadline expires
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.__expiresAt = monotonic() + seconds
+
+    @property
+    def remaining(self) -> float:
+        """Seconds left before the deadline, 0 if it has expired."""
+        return max(0.0, self.__expiresAt - monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining == 0
+
+    def budget(self, maximum: float) -> float:
+        """Returns the time a stage can wait: `maximum` seconds, or the remaining time if it is shorter."""
+        return min(maximum, self.remaining)
@@ -0,0 +1,185 @@
+from math import asin, cos, radians, sin, sqrt
+
+from geopy.distance import geodesic
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Mean radius of the Earth, used by the haversine formula.
+EARTH_RADIUS_METERS = 6371008.8
+
+# Length in meters of a degree of latitude (the smallest one, at the equator).
+__METERS_PER_LATITUDE_DEGREE = 110574.0
+
+# The haversine formula is off by at most ~0.5% with respect to the ellipsoidal distance computed by geopy.
+# Only the places whose haversine distance is this close to the radius are checked again with geopy.
+__HAVERSINE_RELATIVE_ERROR = 0.005
+
+# Below this number of points the overhead of NumPy is higher than the plain loop (see benchmarks/geo_prefilter.py).
+__NUMPY_MIN_POINTS = 64
+
+
+def haversineDistance(origin: tuple, destination: tuple) -> float:
+    """Returns the great-circle distance in meters between two (latitude, longitude) points."""
+    originLatitude, originLongitude = radians(origin[0]), radians(origin[1])
+    destinationLatitude, destinationLongitude = (
+        radians(destination[0]),
+        radians(destination[1]),
+    )
+
+    a = (
+        sin((destinationLatitude - originLatitude) / 2) ** 2
+        + cos(originLatitude)
+        * cos(destinationLatitude)
+        * sin((destinationLongitude - originLongitude) / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS_METERS * asin(sqrt(min(1.0, a)))
+
+
+def haversineDistances(origin: tuple, latitudes: list, longitudes: list) -> list:
+    """Returns the great-circle distances in meters between an origin and many points, in a single pass.
+
+    NumPy is used when it is installed and there are enough points, otherwise the distances are computed one by one.
+
+    Args:
+        origin (tuple): (latitude, longitude) of the origin
+        latitudes (list): the latitudes of the points
+        longitudes (list): the longitudes of the points
+
+    Returns:
+        list: the distance of each point from the origin, in the same order of the points
+    """
+    if numpy == None or len(latitudes) < __NUMPY_MIN_POINTS:
+        return [
+            haversineDistance(origin, (latitude, longitude))
+            for latitude, longitude in zip(latitudes, longitudes)
+        ]
+
+    originLatitude, originLongitude = numpy.radians(origin[0]), numpy.radians(origin[1])
+    latitudes = numpy.radians(numpy.asarray(latitudes, dtype=float))
+    longitudes = numpy.radians(numpy.asarray(longitudes, dtype=float))
+
+    a = (
+        numpy.sin((latitudes - originLatitude) / 2) ** 2
+        + numpy.cos(originLatitude)
+        * numpy.cos(latitudes)
+        * numpy.sin((longitudes - originLongitude) / 2) ** 2
+    )
+
+    return (
+        2 * EARTH_RADIUS_METERS * numpy.arcsin(numpy.sqrt(numpy.minimum(1.0, a)))
+    ).tolist()
+
+
+def boundingBox(origin: tuple, radius: float) -> tuple:
+    """Returns (min latitude, max latitude, min longitude, max longitude) of a box enclosing the circle given.
+
+    The longitudes are not wrapped around the antimeridian. Near the poles the box spans 180 degrees of longitude on each
+    side of the origin, i.e. every longitude.
+    """
+    latitudeDelta = radius / __METERS_PER_LATITUDE_DEGREE
+    longitudeDelta = (
+        latitudeDelta / cos(radians(abs(origin[0]) + latitudeDelta))
+        if abs(origin[0]) + latitudeDelta < 90
+        else 180
+    )
+
+    return (
+        origin[0] - latitudeDelta,
+        origin[0] + latitudeDelta,
+        origin[1] - longitudeDelta,
+        origin[1] + longitudeDelta,
+    )
+
+
+def filterWithinRadius(origin: tuple, coordinates: list, radius: float) -> list:
+    """Returns the indexes of the points which are within `radius` meters from the origin.
+
+    The points are filtered in three steps, from the cheapest to the most accurate:
+        * the points outside the bounding box of the circle are rejected;
+        * the haversine distance of the remaining points is computed in a single pass;
+        * only the points whose haversine distance is too close to the radius to be trusted are checked with geopy.
+
+    Args:
+        origin (tuple): (latitude, longitude) of the origin
+        coordinates (list): (latitude, longitude) of each point
+        radius (float): the radius in meters
+
+    Returns:
+        list: the indexes of the points within the radius, in ascending order
+    """
+    minLatitude, maxLatitude, minLongitude, maxLongitude = boundingBox(origin, radius)
+    longitudeDelta = (maxLongitude - minLongitude) / 2
+
+    # The longitudes are compared across the antimeridian.
+    candidates = [
+        index
+        for index, (latitude, longitude) in enumerate(coordinates)
+        if minLatitude <= latitude <= maxLatitude
+        and abs((longitude - origin[1] + 180) % 360 - 180) <= longitudeDelta
+    ]
+    distances = haversineDistances(
+        origin,
+        [coordinates[index][0] for index in candidates],
+        [coordinates[index][1] for index in candidates],
+    )
+
+    result = []
+    for index, distance in zip(candidates, distances):
+        if abs(distance - radius) <= radius * __HAVERSINE_RELATIVE_ERROR:
+            distance = geodesic(origin, coordinates[index]).meters
+        if distance <= radius:
+            result.append(index)
+
+    return result
+
+
+def filterWithinPolygon(polygon: list, coordinates: list) -> list:
+    """Returns the indexes of the points which fall inside a polygon.
+
+    Args:
+        polygon (list): the rings of the polygon, each one a list of (latitude, longitude) vertices. The first ring is the
+                        outer boundary, the following ones are holes.
+        coordinates (list): (latitude, longitude) of each point
+
+    Returns:
+        list: the indexes of the points inside the polygon, in ascending order
+    """
+    if len(polygon) == 0 or len(polygon[0]) == 0:
+        return []
+
+    # The bounding box of the outer ring rejects most of the points before the ray casting.
+    minLatitude = min(latitude for latitude, _ in polygon[0])
+    maxLatitude = max(latitude for latitude, _ in polygon[0])
+    minLongitude = min(longitude for _, longitude in polygon[0])
+    maxLongitude = max(longitude for _, longitude in polygon[0])
+
+    return [
+        index
+        for index, point in enumerate(coordinates)
+        if minLatitude <= point[0] <= maxLatitude
+        and minLongitude <= point[1] <= maxLongitude
+        and __isInsideRing(point, polygon[0])
+        and not any(__isInsideRing(point, hole) for hole in polygon[1:])
+    ]
+
+
+def __isInsideRing(point: tuple, ring: list) -> bool:
+    # Ray casting: a point is inside the ring if a ray starting from it crosses the ring an odd number of times.
+    (latitude, longitude) = point
+    isInside = False
+
+    previousLatitude, previousLongitude = ring[-1]
+    for vertexLatitude, vertexLongitude in ring:
+        if (vertexLatitude > latitude) != (previousLatitude > latitude) and longitude < (
+            previousLongitude - vertexLongitude
+        ) * (latitude - vertexLatitude) / (
+            previousLatitude - vertexLatitude
+        ) + vertexLongitude:
+            isInside = not isInside
+        previousLatitude, previousLongitude = vertexLatitude, vertexLongitude
+
+    return isInside
@@ -0,0 +1,78 @@
+class KeywordTrie:
+    """A prefix tree mapping keywords to values, which can be searched for the keyword closest to a misspelled one.
+
+    The closest keyword is the one with the smallest Levenshtein distance from the searched word. The distances of all
+    the keywords sharing a prefix are computed together, one row of the edit distance matrix per trie node, and the
+    branches whose row is already above the maximum distance are pruned.
+
+    Attributes
+    ----------
+    :attr:`__root` : dict
+        the root node: each node maps a character to its child node, and the value of the keyword ending in the node
+        is stored under the `None` key
+    :attr:`__size` : int
+        number of keywords stored
+    """
+
+    def __init__(self) -> None:
+        self.__root: dict = {}
+        self.__size: int = 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def insert(self, keyword: str, value) -> None:
+        """Stores `value` with the given keyword, replacing the value already stored with it."""
+        node = self.__root
+        for character in keyword:
+            node = node.setdefault(character, {})
+
+        if None not in node:
+            self.__size += 1
+        node[None] = value
+
+    def get(self, keyword: str, default=None):
+        """Returns the value stored with the given keyword, or `default` if it is not present."""
+        node = self.__root
+        for character in keyword:
+            node = node.get(character)
+            if node == None:
+                return default
+
+        return node.get(None, default)
+
+    def closest(self, word: str, maxDistance: int) -> tuple:
+        """Returns the value of the keyword closest to `word`.
+
+        Args:
+            word (str): the searched word
+            maxDistance (int): the maximum edit distance between `word` and the keyword
+
+        Returns:
+            tuple: (value, edit distance) of the closest keyword, None if no keyword is within `maxDistance`. Among
+                   keywords at the same distance, the first in alphabetical order is chosen.
+        """
+        best: list = [None, maxDistance + 1, None]
+
+        def visit(node: dict, prefix: str, previousRow: list) -> None:
+            for character in sorted(key for key in node if key != None):
+                # The row of the edit distances between the prefix extended by `character` and each prefix of `word`.
+                row = [previousRow[0] + 1]
+                for column in range(1, len(word) + 1):
+                    row.append(
+                        min(
+                            row[column - 1] + 1,
+                            previousRow[column] + 1,
+                            previousRow[column - 1] + (word[column - 1] != character),
+                        )
+                    )
+
+                child = node[character]
+                if None in child and row[-1] < best[1]:
+                    best[:] = [child[None], row[-1], prefix + character]
+                # No keyword below this node can be closer than the smallest distance of the row.
+                if min(row) < best[1]:
+                    visit(child, prefix + character, row)
+
+        visit(self.__root, "", list(range(len(word) + 1)))
+        return (best[0], best[1]) if best[2] != None else None
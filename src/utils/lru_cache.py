@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+from utils.metrics import incrementCounter
+
+
+class LRUCache:
+    """A thread-safe in-memory cache with a maximum size and a time to live for its entries.
+
+    When the cache is full, the least recently used entry is evicted. The expired entries are kept until they are
+    evicted, so that they can still be served through `getExpired` (e.g. while the upstream service is unavailable).
+    Hits and misses are counted in the metrics as `<name>.hits` and `<name>.misses`.
+
+    Attributes
+    ----------
+    :attr:`name` : str
+        the name of the cache, used in the metrics
+    :attr:`__maxSize` : int
+        maximum number of entries
+    :attr:`__timeToLive` : float
+        seconds after which an entry expires
+    """
+
+    def __init__(self, name: str, maxSize: int, timeToLive: float) -> None:
+        self.name = name
+        self.__maxSize = maxSize
+        self.__timeToLive = timeToLive
+        self.__entries: OrderedDict = OrderedDict()
+        self.__lock = Lock()
+
+    def get(self, key, default=None):
+        """Returns the value stored with the given key, or `default` if it is not present or expired."""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry != None and entry[1] > monotonic():
+                self.__entries.move_to_end(key)
+                incrementCounter(f"{self.name}.hits")
+                return entry[0]
+
+        incrementCounter(f"{self.name}.misses")
+        return default
+
+    def getExpired(self, key, default=None):
+        """Returns the value stored with the given key even if it is expired, or `default` if it is not present.
+
+        The values served after their expiration are counted in the metrics as `<name>.expired_hits`.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+
+        if entry == None:
+            return default
+        elif entry[1] <= monotonic():
+            incrementCounter(f"{self.name}.expired_hits")
+
+        return entry[0]
+
+    def put(self, key, value, timeToLive: float = None) -> None:
+        """Stores a value with the given key, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key: the key of the entry
+            value: the value of the entry
+            timeToLive (float, optional): seconds after which this entry expires. Defaults to the time to live of the cache.
+        """
+        expiresAt = monotonic() + (
+            timeToLive if timeToLive != None else self.__timeToLive
+        )
+
+        with self.__lock:
+            self.__entries[key] = (value, expiresAt)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__maxSize:
+                self.__entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return len(self.__entries)
@@ -0,0 +1,21 @@
+from threading import Lock
+
+__counters: dict = {}
+__countersLock = Lock()
+
+
+def incrementCounter(name: str, amount: int = 1) -> None:
+    """Increments the counter with the given name, creating it if needed.
+
+    Args:
+        name (str): the name of the counter (e.g. `route_cache.hits`)
+        amount (int, optional): the value added to the counter. Defaults to 1.
+    """
+    with __countersLock:
+        __counters[name] = __counters.get(name, 0) + amount
+
+
+def countersSnapshot() -> dict:
+    """Returns a copy of all the counters, sorted by name."""
+    with __countersLock:
+        return dict(sorted(__counters.items()))
@@ -13,7 +13,9 @@ class ResearchInfo:
     :attr:`__openNow` : bool, default False
         defines if you want fetch both closed and open restaurant at the time of the research or not (otherwise only open restaurants will be fetched)
     :attr:`__specifiedFood` : str
-        desired food chosen by the user
+        desired food chosen by the user, as typed (only displayed)
+    :attr:`__keyword` : str
+        canonical keyword of the desired food, sent to Google and used in the cache keys
     :attr:`__withinWalkingDistance` : int
         indicates whether the restaurant must be within the walking distance or not
     """
@@ -24,6 +26,7 @@ class ResearchInfo:
         self.__withinWalkingDistance: bool = True
         self.__openNow: bool = False
         self.__specifiedFood: str = None
+        self.__keyword: str = None
 
     @property
     def location(self):
@@ -65,6 +68,14 @@ class ResearchInfo:
     def food(self, newFood: str) -> None:
         self.__specifiedFood = newFood
 
+    @property
+    def keyword(self):
+        return self.__keyword
+
+    @keyword.setter
+    def keyword(self, newKeyword: str) -> None:
+        self.__keyword = newKeyword
+
     @property
     def walkingdistance(self) -> bool:
         return self.__withinWalkingDistance
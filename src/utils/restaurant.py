@@ -50,6 +50,8 @@ class Restaurant(GeneralPlace):
         self.__hasAlreadyFetchedDetails = False
         self.__distanceToReachInMeters = 0.0
         self.__timeToReachInSeconds = 0.0
+        self.__hasAlreadyComputedRoute = False
+        self.__isRouteEstimated = False
 
     @property
     def id(self) -> str:
@@ -139,6 +141,22 @@ class Restaurant(GeneralPlace):
     def reachtime(self, newReachTime: float) -> None:
         self.__timeToReachInSeconds = newReachTime
 
+    @property
+    def isrouted(self) -> bool:
+        return self.__hasAlreadyComputedRoute
+
+    @isrouted.setter
+    def isrouted(self, isRouted: bool) -> None:
+        self.__hasAlreadyComputedRoute = isRouted
+
+    @property
+    def reachestimated(self) -> bool:
+        return self.__isRouteEstimated
+
+    @reachestimated.setter
+    def reachestimated(self, isEstimated: bool) -> None:
+        self.__isRouteEstimated = isEstimated
+
     def clone(self):
         """Clones the restaurant object.
 
@@ -201,6 +219,14 @@ class RestaurantList(DoublyCircularArrayList):
     def size(self) -> int:
         return len(self.__listOfRestaurants)
 
+    @property
+    def remaining(self) -> int:
+        """The number of restaurants which follow the current one, before the list starts again from the first one."""
+        if self.__currentElement == None:
+            return 0
+
+        return self.size - 1 - self.__listOfRestaurants.index(self.__currentElement)
+
     def add(self, newElement: Restaurant) -> None:
         """Add a restaurant to the list as last element.
 
@@ -248,6 +274,27 @@ class RestaurantList(DoublyCircularArrayList):
             ((self.__listOfRestaurants.index(self.__currentElement) - 1) % self.size)
         ]
 
+    def neighbours(self, count: int, backwards: bool = False) -> list:
+        """Returns the restaurants which follow the current one, without moving the cursor.
+
+        Args:
+            `count` (int): the maximum number of restaurants returned
+            `backwards` (bool, optional): if true the restaurants which precede the current one are returned. Defaults to False.
+
+        Returns:
+            list: at most `count` restaurants, ordered starting from the closest to the current one
+        """
+        if self.__currentElement == None:
+            return []
+
+        currentIndex = self.__listOfRestaurants.index(self.__currentElement)
+        step = -1 if backwards else 1
+
+        return [
+            self.__listOfRestaurants[(currentIndex + step * i) % self.size]
+            for i in range(1, min(count, self.size - 1) + 1)
+        ]
+
     def clone(self):
         """Clones the restaurants list.
 
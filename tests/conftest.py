@@ -0,0 +1,5 @@
+import sys
+from os import path
+
+# The modules of the bot import each other from the `src` directory, which is the working directory of the bot.
+sys.path.insert(0, path.join(path.dirname(path.dirname(path.abspath(__file__))), "src"))
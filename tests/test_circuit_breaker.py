@@ -0,0 +1,66 @@
+from time import sleep
+
+from utils.circuit_breaker import CircuitBreaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", 3, 60.0)
+
+    breaker.recordFailure()
+    breaker.recordFailure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allowRequest()
+
+    breaker.recordFailure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allowRequest()
+
+
+def test_success_resets_the_failures():
+    breaker = CircuitBreaker("test", 2, 60.0)
+
+    breaker.recordFailure()
+    breaker.recordSuccess()
+    breaker.recordFailure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_lets_a_single_trial_through():
+    breaker = CircuitBreaker("test", 1, 0.0)
+    breaker.recordFailure()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allowRequest()
+    assert not breaker.allowRequest()
+
+
+def test_successful_trial_closes_the_breaker():
+    breaker = CircuitBreaker("test", 5, 0.0)
+    for _ in range(5):
+        breaker.recordFailure()
+
+    assert breaker.allowRequest()
+    breaker.recordSuccess()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_trial_opens_the_breaker_again():
+    breaker = CircuitBreaker("test", 5, 0.05)
+    for _ in range(5):
+        breaker.recordFailure()
+    sleep(0.06)
+
+    assert breaker.allowRequest()
+    # A single failure is enough, whatever the threshold.
+    breaker.recordFailure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_cancelled_trial_lets_another_one_through():
+    breaker = CircuitBreaker("test", 1, 0.0)
+    breaker.recordFailure()
+
+    assert breaker.allowRequest()
+    breaker.recordCancellation()
+    assert breaker.allowRequest()
@@ -0,0 +1,20 @@
+from time import sleep
+
+from utils.deadline import Deadline
+
+
+def test_budget_is_bounded_by_the_remaining_time():
+    deadline = Deadline(10.0)
+
+    assert deadline.budget(1.0) == 1.0
+    assert 9.0 < deadline.budget(60.0) <= 10.0
+    assert not deadline.expired
+
+
+def test_expired_deadline_has_no_time_left():
+    deadline = Deadline(0.01)
+    sleep(0.02)
+
+    assert deadline.expired
+    assert deadline.remaining == 0
+    assert deadline.budget(1.0) == 0
@@ -0,0 +1,52 @@
+from places.food_keywords import FoodKeywordCanonicalizer
+
+KEYWORDS = {
+    "it": {
+        "pizza": ["pizzeria", "pizza al taglio"],
+        "sushi": ["sushi bar"],
+        "poke": ["pokè"],
+        "hamburger": ["burger"],
+    }
+}
+
+
+def test_normalize():
+    assert FoodKeywordCanonicalizer.normalize("  Pokè-Bowl!! ") == "poke bowl"
+    assert FoodKeywordCanonicalizer.normalize("🍕") == ""
+
+
+def test_synonyms_map_to_the_canonical_keyword():
+    canonicalizer = FoodKeywordCanonicalizer(KEYWORDS, 2)
+
+    assert canonicalizer.canonical("Pizzeria", "it") == "pizza"
+    assert canonicalizer.canonical("pizza  AL taglio", "it") == "pizza"
+    assert canonicalizer.canonical("Pokè", "it") == "poke"
+
+
+def test_misspelled_keywords_are_matched():
+    canonicalizer = FoodKeywordCanonicalizer(KEYWORDS, 2)
+
+    assert canonicalizer.canonical("sushii", "it") == "sushi"
+    assert canonicalizer.canonical("hamburgher", "it") == "hamburger"
+    # Short words are not allowed any typo.
+    assert canonicalizer.canonical("pok", "it") == "pok"
+
+
+def test_max_edit_distance_is_respected():
+    canonicalizer = FoodKeywordCanonicalizer(KEYWORDS, 0)
+
+    assert canonicalizer.canonical("sushii", "it") == "sushii"
+
+
+def test_text_is_canonicalized_word_by_word():
+    canonicalizer = FoodKeywordCanonicalizer(KEYWORDS, 2)
+
+    assert canonicalizer.canonical("pizza pizzeria", "it") == "pizza"
+    assert canonicalizer.canonical("sushi fusion", "it") == "sushi fusion"
+
+
+def test_unknown_language_and_symbols():
+    canonicalizer = FoodKeywordCanonicalizer(KEYWORDS, 2)
+
+    assert canonicalizer.canonical("Pizzeria", "en") == "pizzeria"
+    assert canonicalizer.canonical(" 🍕 ", "it") == "🍕"
@@ -0,0 +1,42 @@
+from sqlite3 import OperationalError
+
+from pytest import fixture
+
+from data import setupTables
+from places.geocoding_cache import GeocodingCache
+from utils.lru_cache import LRUCache
+
+
+@fixture
+def geocodingCache(tmp_path, monkeypatch) -> GeocodingCache:
+    # The database is created in the working directory.
+    monkeypatch.chdir(tmp_path)
+    setupTables()
+    return GeocodingCache(LRUCache("test", 10, 3600.0), 3600.0, 60.0)
+
+
+def test_names_are_normalized():
+    assert GeocodingCache.normalize("  Piazza   DUOMO ") == "piazza duomo"
+
+
+def test_locations_are_shared_across_spellings(geocodingCache):
+    geocodingCache.put("Piazza Duomo", "Piazza del Duomo", 45.4641, 9.1919)
+
+    assert geocodingCache.get("piazza  duomo") == ("Piazza del Duomo", 45.4641, 9.1919)
+    assert geocodingCache.get("Duomo") == None
+
+
+def test_names_not_found_are_cached(geocodingCache):
+    geocodingCache.put("nowhere")
+
+    assert geocodingCache.get("Nowhere") == (None, None, None)
+
+
+def test_put_survives_a_locked_database(geocodingCache, monkeypatch):
+    def lockedDatabase(*args):
+        raise OperationalError("database is locked")
+
+    monkeypatch.setattr("places.geocoding_cache.insertCachedGeocoding", lockedDatabase)
+    geocodingCache.put("Piazza Duomo", "Piazza del Duomo", 45.4641, 9.1919)
+
+    assert geocodingCache.get("piazza duomo") == ("Piazza del Duomo", 45.4641, 9.1919)
@@ -0,0 +1,60 @@
+from utils.keyword_trie import KeywordTrie
+
+
+def trie(*keywords) -> KeywordTrie:
+    keywordTrie = KeywordTrie()
+    for keyword in keywords:
+        keywordTrie.insert(keyword, keyword.upper())
+    return keywordTrie
+
+
+def test_insert_and_get():
+    keywordTrie = trie("pizza", "pizzeria", "pasta")
+    keywordTrie.insert("pizza", "replaced")
+
+    assert len(keywordTrie) == 3
+    assert keywordTrie.get("pizza") == "replaced"
+    assert keywordTrie.get("pizzeria") == "PIZZERIA"
+    # A prefix of a keyword is not a keyword.
+    assert keywordTrie.get("pizz") == None
+    assert keywordTrie.get("sushi", "missing") == "missing"
+
+
+def test_closest_within_distance():
+    keywordTrie = trie("sushi", "pizza", "pasta")
+
+    assert keywordTrie.closest("sushii", 2) == ("SUSHI", 1)
+    assert keywordTrie.closest("piza", 1) == ("PIZZA", 1)
+    assert keywordTrie.closest("pizza", 2) == ("PIZZA", 0)
+    assert keywordTrie.closest("ramen", 2) == None
+
+
+def test_closest_ties_are_broken_alphabetically():
+    keywordTrie = trie("cat", "bat")
+
+    assert keywordTrie.closest("hat", 1) == ("BAT", 1)
+
+
+def test_closest_matches_the_edit_distance():
+    def levenshtein(first: str, second: str) -> int:
+        row = list(range(len(second) + 1))
+        for i, firstCharacter in enumerate(first, 1):
+            previousRow, row = row, [i]
+            for j, secondCharacter in enumerate(second, 1):
+                row.append(
+                    min(
+                        row[j - 1] + 1,
+                        previousRow[j] + 1,
+                        previousRow[j - 1] + (firstCharacter != secondCharacter),
+                    )
+                )
+        return row[-1]
+
+    keywords = ["kebab", "kebap", "ramen", "poke", "pokè", "brunch", "tapas"]
+    keywordTrie = trie(*keywords)
+    for word in ["keab", "rame", "pok", "branch", "tapaz", "xyz"]:
+        distance = min(levenshtein(word, keyword) for keyword in keywords)
+        closest = keywordTrie.closest(word, 2)
+        assert (closest[1] if closest != None else None) == (
+            distance if distance <= 2 else None
+        )
@@ -0,0 +1,35 @@
+from time import sleep
+
+from places.nearby_search_cache import NearbySearchCache
+from utils.lru_cache import LRUCache
+
+
+def nearbySearchCache(timeToLive: float = 3600.0) -> NearbySearchCache:
+    return NearbySearchCache(
+        LRUCache("test", 10, timeToLive), 0.002, 500, timeToLive, 300.0, 600.0
+    )
+
+
+def test_close_researches_share_the_key():
+    cache = nearbySearchCache()
+
+    assert cache.searchRadius(1200) == 1500
+    assert cache.key((45.4641, 9.1919), "pizza", 2, False, 1200, "it") == cache.key(
+        (45.4645, 9.1915), "pizza", 2, False, 1500, "it"
+    )
+    assert cache.key((45.4641, 9.1919), "pizza", 2, False, 1200, "it") != cache.key(
+        (45.4641, 9.1919), "pizza", 2, True, 1200, "it"
+    )
+
+
+def test_page_tokens_are_not_cached():
+    cache = nearbySearchCache(0.01)
+    key = cache.key((45.4641, 9.1919), "pizza", 2, False, 1000, "it")
+    response = {"status": "OK", "results": [], "next_page_token": "token"}
+    cache.put(key, response)
+
+    assert cache.get(key) == {"status": "OK", "results": []}
+    assert response.get("next_page_token") == "token"
+    sleep(0.02)
+    assert cache.get(key) == None
+    assert cache.getExpired(key) == {"status": "OK", "results": []}
@@ -0,0 +1,80 @@
+from sqlite3 import OperationalError
+
+from pytest import fixture
+
+from data import setupTables
+from routing.route_cache import RouteCache
+from routing.travel_mode import TravelMode
+
+
+@fixture
+def routeCache(tmp_path, monkeypatch) -> RouteCache:
+    # The database is created in the working directory.
+    monkeypatch.chdir(tmp_path)
+    setupTables()
+    return RouteCache(0.001, 3600.0, 100)
+
+
+def test_origin_cell():
+    routeCache = RouteCache(0.001, 3600.0, 100)
+
+    assert routeCache.originCell((45.4641, 9.1919)) == "45464:9192"
+    # Origins a few meters apart share the same cell.
+    assert routeCache.originCell((45.46412, 9.19188)) == "45464:9192"
+    assert routeCache.originCell((45.4651, 9.1919)) == "45465:9192"
+    assert routeCache.originCell((-45.4641, -9.1919)) == "-45464:-9192"
+
+
+def test_routes_are_shared_within_a_cell(routeCache):
+    routeCache.put((45.4641, 9.1919), {"a": (120.0, 90.0)}, TravelMode.WALKING)
+
+    assert routeCache.get((45.46412, 9.19188), ["a", "b"], TravelMode.WALKING) == {
+        "a": (120.0, 90.0)
+    }
+    assert routeCache.get((45.4651, 9.1919), ["a"], TravelMode.WALKING) == {}
+
+
+def test_routes_are_keyed_by_travel_mode(routeCache):
+    routeCache.put((45.4641, 9.1919), {"a": (120.0, 90.0)}, TravelMode.WALKING)
+    routeCache.put((45.4641, 9.1919), {"a": (150.0, 20.0)}, TravelMode.DRIVING)
+
+    assert routeCache.get((45.4641, 9.1919), ["a"], TravelMode.WALKING) == {
+        "a": (120.0, 90.0)
+    }
+    assert routeCache.get((45.4641, 9.1919), ["a"], TravelMode.DRIVING) == {
+        "a": (150.0, 20.0)
+    }
+
+
+def test_expired_routes_miss(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    setupTables()
+    routeCache = RouteCache(0.001, -1.0, 100)
+    routeCache.put((45.4641, 9.1919), {"a": (120.0, 90.0)}, TravelMode.WALKING)
+
+    assert routeCache.get((45.4641, 9.1919), ["a"], TravelMode.WALKING) == {}
+
+
+def test_put_survives_a_locked_database(routeCache, monkeypatch):
+    def lockedDatabase(*args):
+        raise OperationalError("database is locked")
+
+    monkeypatch.setattr("routing.route_cache.insertCachedRoutes", lockedDatabase)
+    routeCache.put((45.4641, 9.1919), {"a": (120.0, 90.0)}, TravelMode.WALKING)
+
+    assert routeCache.get((45.4641, 9.1919), ["a"], TravelMode.WALKING) == {}
+
+
+def test_evict_stale_keeps_the_most_recently_used_routes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    setupTables()
+    routeCache = RouteCache(0.001, 3600.0, 1)
+    routeCache.put((45.4641, 9.1919), {"a": (120.0, 90.0)}, TravelMode.WALKING)
+    routeCache.put((45.4641, 9.1919), {"b": (800.0, 600.0)}, TravelMode.WALKING)
+
+    assert len(routeCache.get((45.4641, 9.1919), ["a", "b"], TravelMode.WALKING)) == 2
+    routeCache.get((45.4641, 9.1919), ["a"], TravelMode.WALKING)
+    routeCache.evictStale()
+    assert routeCache.get((45.4641, 9.1919), ["a", "b"], TravelMode.WALKING) == {
+        "a": (120.0, 90.0)
+    }
@@ -0,0 +1,27 @@
+from pytest import approx
+
+from upstream.token_bucket import TokenBucket
+
+
+def test_burst_up_to_capacity():
+    bucket = TokenBucket("test", 1.0, 3)
+
+    assert [bucket.reserve(0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve(0.0) == None
+
+
+def test_refused_reservation_takes_no_token():
+    bucket = TokenBucket("test", 1.0, 1)
+    bucket.reserve(0.0)
+
+    assert bucket.reserve(0.5) == None
+    assert bucket.reserve(0.5) == None
+    assert bucket.reserve(2.0) == approx(1.0, abs=0.05)
+
+
+def test_reservations_queue_after_each_other():
+    bucket = TokenBucket("test", 10.0, 1)
+    bucket.reserve(0.0)
+
+    assert bucket.reserve(1.0) == approx(0.1, abs=0.01)
+    assert bucket.reserve(1.0) == approx(0.2, abs=0.01)
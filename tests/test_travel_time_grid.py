@@ -0,0 +1,65 @@
+from pytest import approx
+
+from routing.travel_mode import TravelMode
+from routing.travel_time_grid import TravelTimeGrid
+
+
+def test_cell_lookup():
+    grid = TravelTimeGrid("unused", 0.01)
+
+    assert grid.cell((45.4641, 9.1919)) == (4546, 919)
+    # Every origin within half a cell from the centre belongs to the cell.
+    assert grid.cell((45.4549, 9.1851)) == (4545, 919)
+    assert grid.cellCentre((4546, 919)) == approx((45.46, 9.19))
+    assert grid.cellKey((4546, 919), TravelMode.WALKING) == "4546:919:walking"
+
+
+def test_routes_are_visible_once_saved(tmp_path):
+    grid = TravelTimeGrid(str(tmp_path), 0.01)
+    cell = grid.cell((45.4641, 9.1919))
+    grid.store(
+        cell,
+        TravelMode.WALKING,
+        "0123456789abcdef0123",
+        [("a", 120.0, 90.0), ("b", 800.0, 600.0)],
+    )
+
+    reader = TravelTimeGrid(str(tmp_path), 0.01)
+    assert reader.get((45.4641, 9.1919), ["a"], TravelMode.WALKING) == {}
+
+    grid.save({grid.cellKey(cell, TravelMode.WALKING)})
+    assert reader.get((45.4641, 9.1919), ["a", "b", "c"], TravelMode.WALKING) == {
+        "a": (120.0, 90.0),
+        "b": (800.0, 600.0),
+    }
+    assert reader.fingerprint(cell, TravelMode.WALKING) == "0123456789abcdef0123"
+
+
+def test_uncovered_origins_and_profiles_miss(tmp_path):
+    grid = TravelTimeGrid(str(tmp_path), 0.01)
+    cell = grid.cell((45.4641, 9.1919))
+    grid.store(cell, TravelMode.WALKING, "f" * 20, [("a", 120.0, 90.0)])
+    grid.save({grid.cellKey(cell, TravelMode.WALKING)})
+
+    assert grid.get((45.4641, 9.1919), ["a"], TravelMode.DRIVING) == {}
+    assert grid.get((45.4841, 9.1919), ["a"], TravelMode.WALKING) == {}
+    assert grid.fingerprint((4548, 919), TravelMode.WALKING) == None
+
+
+def test_save_drops_the_cells_not_kept(tmp_path):
+    grid = TravelTimeGrid(str(tmp_path), 0.01)
+    grid.store((4546, 919), TravelMode.WALKING, "a" * 20, [("a", 1.0, 1.0)])
+    grid.store((4547, 919), TravelMode.WALKING, "b" * 20, [("a", 2.0, 2.0)])
+    grid.save({grid.cellKey((4547, 919), TravelMode.WALKING)})
+
+    assert grid.get((45.46, 9.19), ["a"], TravelMode.WALKING) == {}
+    assert grid.get((45.47, 9.19), ["a"], TravelMode.WALKING) == {"a": (2.0, 2.0)}
+    assert len([name for name in tmp_path.iterdir() if name.suffix == ".bin"]) == 1
+
+
+def test_cell_size_of_the_index_takes_precedence(tmp_path):
+    grid = TravelTimeGrid(str(tmp_path), 0.01)
+    grid.clear(0.02)
+    grid.save(set())
+
+    assert TravelTimeGrid(str(tmp_path), 0.01).cellsize == 0.02